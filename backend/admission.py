@@ -0,0 +1,132 @@
+from __future__ import annotations
+import asyncio, itertools
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Callable, Awaitable
+
+from .settings import RUN_WORKERS, RUN_USER_MAX, RUN_QUEUE_POLICY
+
+PositionFn = Callable[[int], Awaitable[None]]
+
+
+@dataclass
+class _Ticket:
+    run_id: str
+    user: str
+    priority: int
+    order: int
+    admitted: bool = False
+    withdrawn: bool = False
+    changed: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+class AdmissionController:
+    """
+    실행 수락 제어 (프로세스 내).
+    - 전체 동시 실행 max_global, 사용자별 동시 실행 max_per_user 상한
+    - 초과분은 대기열에서 기다린다: fifo(도착순) / priority(우선순위 높은 순, 같으면 도착순)
+    - 앞 사람이 사용자 상한에 걸려 있으면 건너뛰고 다음 사람을 수락(head-of-line blocking 방지)
+    과부하는 CPU/메모리 경쟁 대신 대기로 바뀐다.
+    """
+
+    def __init__(
+        self,
+        max_global: int = RUN_WORKERS,
+        max_per_user: int = RUN_USER_MAX,
+        policy: str = RUN_QUEUE_POLICY,
+    ):
+        self.max_global = max(1, max_global)
+        self.max_per_user = max(1, max_per_user)
+        self.policy = policy
+        self._queue: List[_Ticket] = []
+        self._running: Dict[str, _Ticket] = {}
+        self._per_user: Dict[str, int] = {}
+        self._order = itertools.count()
+
+    # ---------- 조회 ----------
+    def position(self, run_id: str) -> Optional[int]:
+        """대기 순번(1부터). 대기 중이 아니면 None."""
+        for i, t in enumerate(self._queue, start=1):
+            if t.run_id == run_id:
+                return i
+        return None
+
+    def stats(self) -> Dict[str, int]:
+        return {"running": len(self._running), "queued": len(self._queue)}
+
+    # ---------- 수락/반납 ----------
+    async def acquire(
+        self,
+        run_id: str,
+        user: str = "anonymous",
+        priority: int = 0,
+        on_position: Optional[PositionFn] = None,
+    ) -> bool:
+        """
+        실행 슬롯을 얻을 때까지 대기. 대기하는 동안 순번이 바뀔 때마다 on_position(순번) 호출.
+        슬롯을 얻으면 True, 대기 중 withdraw() 되면 False.
+        """
+        if run_id in self._running:
+            return True
+        t = _Ticket(run_id, user or "anonymous", int(priority or 0), next(self._order))
+        self._queue.append(t)
+        if self.policy == "priority":
+            self._queue.sort(key=lambda x: (-x.priority, x.order))
+        self._dispatch()
+        last = None
+        try:
+            while not t.admitted and not t.withdrawn:
+                pos = self.position(run_id)
+                if on_position and pos != last:
+                    last = pos
+                    await on_position(pos)
+                    if t.admitted or t.withdrawn:
+                        break
+                t.changed.clear()
+                await t.changed.wait()
+        except BaseException:
+            # 대기 중 취소: 대기열에서 빼거나, 이미 수락됐으면 반납
+            if t.admitted:
+                self.release(run_id)
+            elif t in self._queue:
+                self._queue.remove(t)
+                self._dispatch()
+            raise
+        return t.admitted
+
+    def withdraw(self, run_id: str) -> bool:
+        """대기열에서 제거(취소). 대기 중이던 acquire 는 False 를 반환한다."""
+        for t in self._queue:
+            if t.run_id == run_id:
+                self._queue.remove(t)
+                t.withdrawn = True
+                self._dispatch()
+                t.changed.set()
+                return True
+        return False
+
+    def release(self, run_id: str):
+        t = self._running.pop(run_id, None)
+        if t is None:
+            return
+        self._per_user[t.user] -= 1
+        if self._per_user[t.user] <= 0:
+            self._per_user.pop(t.user, None)
+        self._dispatch()
+
+    def _dispatch(self):
+        for t in list(self._queue):
+            if len(self._running) >= self.max_global:
+                break
+            if self._per_user.get(t.user, 0) >= self.max_per_user:
+                continue
+            self._queue.remove(t)
+            t.admitted = True
+            self._running[t.run_id] = t
+            self._per_user[t.user] = self._per_user.get(t.user, 0) + 1
+            t.changed.set()
+        # 남은 대기자 깨움: 순번이 바뀐 경우에만 on_position 이 호출된다
+        for t in self._queue:
+            t.changed.set()
+
+
+admission = AdmissionController()
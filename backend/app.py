@@ -2,9 +2,10 @@ from __future__ import annotations
 import os, io, json, asyncio
 from uuid import uuid4
 from datetime import datetime, timezone
+from email.utils import formatdate
 from typing import List, Dict, Any, Optional, Tuple
 
-from fastapi import FastAPI, UploadFile, File, HTTPException, Response, Body, Request
+from fastapi import FastAPI, UploadFile, File, HTTPException, Response, Body, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse, FileResponse
 from pydantic import BaseModel, Field
@@ -14,15 +15,53 @@ from .settings import (
     STORAGE,
     UPLOADS,
     WF_DIR,
-    RUN_DIR,
     ART_DIR,
     FILES_INDEX,
+    EVENT_PACING_S,
+    EVENT_PAYLOADS,
+    HITL_FALLBACK_S,
+    RUN_HEARTBEAT_S,
 )
 from .models import Workflow, GraphPatch
-from .engine import execute_stream, Ctx, now_iso, node_export_xlsx
-from .compact import compact_event
-from .engine_lg import execute_stream_lg
+from .engine import (
+    execute_stream,
+    Ctx,
+    CancelToken,
+    RunCancelled,
+    NodeMeter,
+    now_iso,
+    run_limited,
+    profile_label,
+)
+from .compact import encode_event
+from . import payloads
+from .artifacts import (
+    ARTIFACT_FORMATS,
+    ArtifactFileResponse,
+    artifact_path,
+    display_name,
+    ensure_format,
+    file_etag,
+    is_not_modified,
+    load_meta,
+    negotiate_format,
+)
+from .engine_lg import drop_checkpoints, execute_stream_lg
+from .profiling import PROFILE_KINDS, list_profiles, profile_path
 from .assistant_reply import generate_assistant_reply
+from .runner import RunChannel, read_event_log, runs
+from .wire import STREAM_FORMATS, StreamCompressor, negotiate, render
+from .runstore import run_store
+from .admission import admission
+from .metrics import (
+    REGISTRY,
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    RUNS_STARTED,
+    RUNS_FINISHED,
+    RUNS_WAITING_HITL,
+    SSE_EVENTS,
+    gauge,
+)
 
 app = FastAPI(
     title="Agentic PoC Backend",
@@ -34,6 +73,7 @@ app = FastAPI(
         {"name": "Workflows"},
         {"name": "Runs"},
         {"name": "Artifacts"},
+        {"name": "Ops"},
     ],
 )
 app.add_middleware(
@@ -93,19 +133,16 @@ def _select_latest_pdf() -> Optional[Dict[str, Any]]:
 
 
 def _autopatch_edges(wf: dict) -> dict:
-    """노드 간 필수 엣지가 빠졌을 때 PoC용으로 자동 보강."""
+    """
+    노드 간 필수 엣지가 빠졌을 때 PoC용으로 자동 보강.
+    (parse_pdf→embed_pdf 와 merge_xlsx 는 독립 분기이므로 서로 잇지 않는다 → 병렬 실행)
+    """
     nodes = {n["id"]: n for n in wf.get("nodes", [])}
     edges = list(wf.get("edges", []))
 
     def _has(frm, to):
         return any(e.get("from") == frm and e.get("to") == to for e in edges)
 
-    if (
-        "parse_pdf" in nodes
-        and "merge_xlsx" in nodes
-        and not _has("parse_pdf", "merge_xlsx")
-    ):
-        edges.append({"from": "parse_pdf", "to": "merge_xlsx"})
     if (
         "embed_pdf" in nodes
         and "validate" in nodes
@@ -351,6 +388,12 @@ class ChatTurnRes(BaseModel):
 
 class ExecReq(BaseModel):
     workflowId: str = Field(..., examples=["wf-2025-10-22"])
+    engine: Optional[str] = Field("lg", examples=["lg", "seq"])
+    # 수락 제어: 사용자별 동시 실행 상한 / priority 정책에서의 우선순위(클수록 먼저)
+    user: Optional[str] = Field(None, examples=["keehoon@example.com"])
+    priority: int = Field(0, examples=[0])
+    # 실행 전체를 노드별로 프로파일링(결과: GET /artifacts/profiles/{runId})
+    profile: bool = Field(False)
 
 
 class ContinueReq(BaseModel):
@@ -549,245 +592,554 @@ def wf_quickstart():
 
 # ---------- Runs ----------
 @app.post("/pipeline/execute", tags=["Runs"])
-def execute(req: ExecReq):
+async def execute(req: ExecReq, request: Request):
+    """
+    실행 레코드 생성 후 백그라운드 워커에 등록. SSE 연결 여부와 무관하게 실행된다.
+    동시 실행 상한을 넘으면 QUEUED 상태로 대기(순번은 이벤트로 전달).
+    """
     wpath = os.path.join(WF_DIR, f"{req.workflowId}.json")
     if not os.path.exists(wpath):
         raise HTTPException(404, "workflow not found")
     with open(wpath, "r", encoding="utf-8") as f:
         wf = json.load(f)
+    if req.profile:
+        wf["profile"] = True
     run_id = str(uuid4())
-    rpath = os.path.join(RUN_DIR, f"{run_id}.json")
     run = {
         "runId": run_id,
         "status": "PLANNING",
+        "engine": (req.engine or "lg").lower(),
         "workflow": wf,
         "startedAt": now_iso(),
         "endedAt": None,
         "artifactId": None,
         "checkpoint": None,
+        "user": req.user or request.cookies.get("session") or "anonymous",
+        "priority": req.priority,
     }
-    _save_json(rpath, run)
+    run_store.create(run)
+    runs.submit(run_id, _execute_run)
     return {"runId": run_id}
 
 
+@app.get("/runs", tags=["Runs"])
+def list_runs(
+    status: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+):
+    """실행 목록(최신순, workflow 본문 제외). nextCursor 를 cursor 로 넘기면 다음 페이지."""
+    items, nxt = run_store.list_runs(status=status, limit=limit, cursor=cursor)
+    return {"items": items, "nextCursor": nxt}
+
+
 @app.get("/runs/{run_id}", tags=["Runs"])
 def run_status(run_id: str):
-    rpath = os.path.join(RUN_DIR, f"{run_id}.json")
-    if not os.path.exists(rpath):
+    run = run_store.get(run_id)
+    if run is None:
         raise HTTPException(404, "run not found")
-    return _load_json(rpath, {})
+    return run
 
 
 @app.post("/runs/{run_id}/continue", tags=["Runs"])
-def run_continue(run_id: str, body: ContinueReq):
-    rpath = os.path.join(RUN_DIR, f"{run_id}.json")
-    if not os.path.exists(rpath):
+async def run_continue(run_id: str, body: ContinueReq):
+    to = "RUNNING" if body.approve else "CANCELLED"
+    # 조건부 전이: 동시에 여러 명이 눌러도 하나만 반영
+    if run_store.transition(run_id, to, from_=("WAITING_HITL",)):
+        # 같은 프로세스의 대기 실행은 즉시 재개(다른 프로세스는 HITL_FALLBACK_S 주기로 상태 확인)
+        runs.notify(run_id)
+        return {"status": to}
+    status = run_store.get_status(run_id)
+    if status is None:
         raise HTTPException(404, "run not found")
-    run = _load_json(rpath, {})
-    if run.get("status") == "WAITING_HITL":
-        run["status"] = "RUNNING" if body.approve else "CANCELLED"
-        _save_json(rpath, run)
-    return {"status": run.get("status")}
+    return {"status": status}
 
 
-# ---------- SSE: 실행 + HITL 대기 + 재개 + 어시스턴트 답장 ----------
-@app.get("/runs/{run_id}/events", tags=["Runs"])
-async def run_events(run_id: str, request: Request):
-    rpath = os.path.join(RUN_DIR, f"{run_id}.json")
-    if not os.path.exists(rpath):
+@app.post("/runs/{run_id}/resume", tags=["Runs"])
+async def run_resume(run_id: str):
+    """
+    실패했거나 서버 재시작으로 중단된 실행을 마지막 체크포인트부터 이어서 실행.
+    LangGraph 엔진은 성공한 노드를 건너뛰고, seq 엔진은 노드 메모이제이션으로 완료 노드를 재사용한다.
+    """
+    status = run_store.get_status(run_id)
+    if status is None:
+        raise HTTPException(404, "run not found")
+    if runs.is_active(run_id):
+        raise HTTPException(409, f"run is active ({status})")
+    # QUEUED/RUNNING/WAITING_HITL 은 하트비트가 RUN_STALE_S 넘게 끊긴 경우(워커 프로세스가 죽은 실행)만.
+    # 다른 워커가 살아서 실행 중이면 같은 UPDATE 조건에서 걸러져 중복 실행되지 않는다
+    if not run_store.transition(
+        run_id,
+        "RUNNING",
+        from_=("FAILED",),
+        stale_from=("QUEUED", "RUNNING", "WAITING_HITL"),
+        endedAt=None,
+    ):
+        raise HTTPException(409, f"run cannot be resumed ({status})")
+    runs.submit(run_id, lambda rid, ch: _execute_run(rid, ch, resume=True))
+    return {"runId": run_id, "status": "RUNNING"}
+
+
+# 실행 중인 run 의 취소 토큰 (같은 프로세스)
+_cancel_tokens: Dict[str, CancelToken] = {}
+
+
+@app.post("/runs/{run_id}/cancel", tags=["Runs"])
+async def run_cancel(run_id: str):
+    """
+    대기/실행/승인대기 중인 실행 취소. 진행 중인 노드는 다음 페이지/배치/파일 경계에서 중단되고
+    CPU/메모리를 반납한다. 다른 프로세스가 실행 중이면 상태만 바뀐다.
+    """
+    status = run_store.get_status(run_id)
+    if status is None:
         raise HTTPException(404, "run not found")
-    run = _load_json(rpath, {})
+    if not run_store.transition(
+        run_id,
+        "CANCELLED",
+        from_=("PLANNING", "QUEUED", "RUNNING", "WAITING_HITL"),
+        endedAt=now_iso(),
+    ):
+        raise HTTPException(409, f"run already finished ({status})")
+    tok = _cancel_tokens.get(run_id)
+    if tok is not None:
+        tok.cancel("사용자 요청")
+    admission.withdraw(run_id)  # 대기열에 있으면 제거
+    runs.notify(run_id)  # 승인 대기 중이면 즉시 깨움
+    return {"status": "CANCELLED"}
+
+
+async def _wait_hitl_decision(run_id: str) -> str:
+    """
+    HITL 결정(RUNNING/CANCELLED) 대기. /continue 신호로 즉시 깨어난다.
+    다중 워커 배포 대비로 HITL_FALLBACK_S 마다 상태 컬럼만 조회(PK 조회 1번).
+    """
+    while True:
+        await runs.wait_signal(run_id, HITL_FALLBACK_S or None)
+        status = run_store.get_status(run_id)
+        if status in ("RUNNING", "CANCELLED"):
+            return status
+
+
+# ---------- 실행 워커: 실행 + HITL 대기 + 재개 + 어시스턴트 답장 ----------
+async def _execute_run(run_id: str, ch: RunChannel, resume: bool = False):
+    run = run_store.get(run_id) or {}
     wf = run.get("workflow") or {}
     wf = _autopatch_edges(wf)
 
     use_lg = (
         True
-        if request.query_params.get("engine", "lg").lower() == "lg"
+        if (run.get("engine") or "lg") == "lg"
         or os.environ.get("USE_LANGGRAPH") == "1"
         else False
     )
 
-    async def gen():
-        seq = 1
-        buffer_events: List[Dict[str, Any]] = []
-        checkpoint_state: Dict[str, Any] | None = None
-        stream_active = True
-
-        def send(ev: Dict[str, Any], has_more: bool = True):
-            nonlocal seq
-            ev.setdefault("seq", seq)
-            seq += 1
-            ev["has_more"] = has_more
-            cev = compact_event(ev)
-            buffer_events.append(cev)
-            data = json.dumps(cev, ensure_ascii=False)
-            return f"id: {seq}\nevent: message\ndata: {data}\n\n".encode("utf-8")
-
-        run["status"] = "RUNNING"
-        _save_json(rpath, run)
-
-        ctx = Ctx(run_id=run_id, storage=STORAGE, art_dir=ART_DIR)
+    seq = ch.last_seq + 1
+    checkpoint_state: Dict[str, Any] | None = None
+    # 노드별 계측(SUMMARY.detail.metrics) → 실행 레코드 metrics 컬럼 (재개 시 이전 값 유지)
+    node_metrics: Dict[str, Any] = dict(run.get("metrics") or {})
+
+    async def send(ev: Dict[str, Any], has_more: bool = True):
+        nonlocal seq
+        ev.setdefault("seq", seq)
+        seq += 1
+        ev["has_more"] = has_more
+        SSE_EVENTS.inc(type=ev.get("type", ""))
+        m = (ev.get("detail") or {}).get("metrics") if ev.get("type") == "SUMMARY" else None
+        if m:
+            node_metrics[ev.get("nodeId")] = m
+            set_run(metrics=node_metrics)
+        pid = str(ev["seq"]) if EVENT_PAYLOADS else None
+        cev, data = encode_event(ev, payload_id=pid)
+        if pid is not None and "__compact__" in cev:
+            # 잘린 원본은 이벤트 로그 옆에 한 번만 기록 → GET /runs/{id}/payloads/{pid}
+            full = {"message": ev.get("message"), "detail": ev.get("detail")}
+            await asyncio.to_thread(payloads.put, run_id, pid, full)
+        await ch.publish(cev, data)
+
+    def set_run(**fields: Any):
+        # 메모리 사본(어시스턴트 답장용)과 DB 를 함께 갱신 — 바뀐 컬럼만 기록
+        run.update(fields)
+        run_store.update(run_id, **fields)
+        if fields.get("status") in ("SUCCEEDED", "FAILED", "CANCELLED"):
+            RUNS_FINISHED.inc(status=fields["status"])
+
+    async def on_queued(position: int):
+        set_run(status="QUEUED")
+        await send(
+            {
+                "type": "OBS",
+                "nodeId": "queue",
+                "message": "QUEUED",
+                "detail": {"position": position, **admission.stats()},
+            },
+            has_more=True,
+        )
 
-        try:
-            stream = execute_stream_lg(wf, ctx) if use_lg else execute_stream(wf, ctx)
-
-            async def stream_iter():
-                for ev in stream:
-                    yield ev
-                    await asyncio.sleep(0.8)
-
-            async for ev in stream_iter():
-                if ev.get("nodeId") == "hitl" and ev.get("message") == "HITL_SIGNAL":
-                    run["status"] = "WAITING_HITL"
-                    _save_json(rpath, run)
-                    yield send(
+    ctx = Ctx(run_id=run_id, storage=STORAGE, art_dir=ART_DIR, profile=bool(wf.get("profile")))
+    _cancel_tokens[run_id] = ctx.cancel
+
+    async def heartbeat():
+        # 이 워커가 실행을 가지고 있음을 기록(대기열/HITL 대기 중 포함) → 다른 워커의 재개/재등록 차단
+        while True:
+            run_store.heartbeat(run_id)
+            await asyncio.sleep(RUN_HEARTBEAT_S)
+
+    beat = asyncio.create_task(heartbeat())
+
+    async def admit():
+        # 동시 실행 상한(전체/사용자별)을 넘으면 여기서 대기. 대기 중 취소되면 False
+        admitted = await admission.acquire(
+            run_id, run.get("user") or "anonymous", run.get("priority") or 0, on_queued
+        )
+        ctx.cancel.check()
+        if not admitted:
+            raise RunCancelled(ctx.cancel.reason)
+        set_run(status="RUNNING")
+
+    try:
+        await admit()
+        RUNS_STARTED.inc(engine="lg" if use_lg else "seq")
+        stream = (
+            execute_stream_lg(wf, ctx, resume=resume)
+            if use_lg
+            else execute_stream(wf, ctx)
+        )
+
+        while True:
+            # 노드 실행(블로킹)은 스레드에서 → 이벤트 루프/다른 실행을 막지 않음
+            ev = await asyncio.to_thread(next, stream, None)
+            if ev is None:
+                break
+
+            if ev.get("nodeId") == "hitl" and ev.get("message") == "HITL_SIGNAL":
+                runs.arm(run_id)
+                set_run(status="WAITING_HITL")
+                await send(
+                    {
+                        "type": "OBS",
+                        "nodeId": "hitl",
+                        "message": "WAITING_HITL",
+                        "detail": {},
+                    },
+                    has_more=True,
+                )
+                # 승인 대기 중에는 실행 슬롯을 반납(다른 실행이 진행되도록)
+                admission.release(run_id)
+                RUNS_WAITING_HITL.inc()
+                try:
+                    decision = await _wait_hitl_decision(run_id)
+                finally:
+                    RUNS_WAITING_HITL.dec()
+                if decision == "CANCELLED":
+                    ctx.cancel.check()  # /cancel 로 취소된 경우는 아래 RunCancelled 처리로
+                    await send(
                         {
-                            "type": "OBS",
+                            "type": "SUMMARY",
                             "nodeId": "hitl",
-                            "message": "WAITING_HITL",
+                            "message": "사용자 거부로 취소",
                             "detail": {},
                         },
+                        has_more=False,
+                    )
+                    set_run(status="CANCELLED", endedAt=now_iso())
+                    drop_checkpoints(run_id)
+                    return
+                await admit()
+                export_node = next(
+                    (n for n in wf.get("nodes", []) if n.get("type") == "export_xlsx"),
+                    None,
+                )
+                if export_node:
+                    meter = NodeMeter()
+                    await send(
+                        {
+                            "type": "ACTION",
+                            "nodeId": "export",
+                            "message": "export_xlsx 시작",
+                            "detail": {"mono": round(meter.mono_start, 6)},
+                        },
                         has_more=True,
                     )
-                    while True:
-                        await asyncio.sleep(0.5)
-                        cur = _load_json(rpath, {})
-                        if cur.get("status") in ("RUNNING", "CANCELLED"):
-                            break
-                    if _load_json(rpath, {}).get("status") == "CANCELLED":
-                        yield send(
-                            {
-                                "type": "SUMMARY",
-                                "nodeId": "hitl",
-                                "message": "사용자 거부로 취소",
-                                "detail": {},
-                            },
-                            has_more=False,
-                        )
-                        run["status"] = "CANCELLED"
-                        run["endedAt"] = now_iso()
-                        _save_json(rpath, run)
-                        stream_active = False
-                        return
-                    export_node = next(
-                        (
-                            n
-                            for n in wf.get("nodes", [])
-                            if n.get("type") == "export_xlsx"
-                        ),
-                        None,
+                    export_cfg = export_node.get("config", {}) or {}
+                    out, limits = await asyncio.to_thread(
+                        run_limited,
+                        "export_xlsx",
+                        export_cfg,
+                        {
+                            "merge_xlsx.merged_table": (checkpoint_state or {}).get(
+                                "merged_path"
+                            )
+                        },
+                        ctx,
+                        meter.usage,
+                        profile_label(ctx, export_node.get("id") or "export", export_cfg),
                     )
-                    if export_node:
-                        yield send(
-                            {
-                                "type": "ACTION",
-                                "nodeId": "export",
-                                "message": "export_xlsx 시작",
-                                "detail": {},
-                            },
-                            has_more=True,
-                        )
-                        out = node_export_xlsx(
-                            export_node.get("config", {}),
-                            {
-                                "merge_xlsx.merged_table": (checkpoint_state or {}).get(
-                                    "merged_path"
-                                )
-                            },
-                            ctx,
-                        )
-                        yield send(
-                            {
-                                "type": "OBS",
-                                "nodeId": "export",
-                                "message": "산출물 생성",
-                                "detail": {"artifact_id": out.get("artifact_id")},
+                    await send(
+                        {
+                            "type": "OBS",
+                            "nodeId": "export",
+                            "message": "산출물 생성",
+                            "detail": {
+                                "artifact_id": out.get("artifact_id"),
+                                "reused": out.get("artifact_reused", False),
                             },
-                            has_more=True,
-                        )
-                        yield send(
-                            {
-                                "type": "SUMMARY",
-                                "nodeId": "export",
-                                "message": "export_xlsx 완료",
-                                "detail": {"keys": list(out.keys())},
+                        },
+                        has_more=True,
+                    )
+                    await send(
+                        {
+                            "type": "SUMMARY",
+                            "nodeId": "export",
+                            "message": "export_xlsx 완료",
+                            "detail": {
+                                "keys": list(out.keys()),
+                                "metrics": meter.finish("export_xlsx", out),
+                                **({"limits": limits} if limits else {}),
                             },
-                            has_more=True,
-                        )
-                    continue
+                        },
+                        has_more=True,
+                    )
+                continue
 
-                if (
-                    ev.get("nodeId") == "hitl"
-                    and ev.get("message") == "STATE_CHECKPOINT"
-                ):
-                    checkpoint_state = ev.get("detail", {}).get("state")
+            if ev.get("nodeId") == "hitl" and ev.get("message") == "STATE_CHECKPOINT":
+                checkpoint_state = ev.get("detail", {}).get("state")
 
-                yield send(ev, has_more=True)
+            await send(ev, has_more=True)
+            if EVENT_PACING_S > 0:
+                await asyncio.sleep(EVENT_PACING_S)
+            ctx.cancel.check()
 
-            run["status"] = "SUCCEEDED"
-            run["endedAt"] = now_iso()
+        ctx.cancel.check()
+        # 산출물은 blob 에 저장되고 실행별로는 별칭(meta)만 남으므로 별칭으로 확인
+        art_id = f"art-{run_id[:8]}"
+        if not os.path.exists(artifact_path(art_id, "xlsx")):
             art_id = None
-            for fn in os.listdir(ART_DIR):
-                if fn.endswith(".xlsx") and run_id[:8] in fn:
-                    art_id = fn.split(".")[0]
-                    break
-            run["artifactId"] = art_id
-            _save_json(rpath, run)
-
-            reply = _assistant_reply(
-                run, buffer_events, (checkpoint_state or {}).get("validation_report")
-            )
-            yield send(
-                {
-                    "type": "SUMMARY",
-                    "nodeId": "assistant",
-                    "message": "ASSISTANT_REPLY",
-                    "detail": {"text": reply},
-                },
-                has_more=False,
-            )
-            stream_active = False
+        set_run(status="SUCCEEDED", endedAt=now_iso(), artifactId=art_id)
+        drop_checkpoints(run_id)
+
+        reply = await asyncio.to_thread(
+            _assistant_reply,
+            run,
+            ch.events,
+            (checkpoint_state or {}).get("validation_report"),
+        )
+        await send(
+            {
+                "type": "SUMMARY",
+                "nodeId": "assistant",
+                "message": "ASSISTANT_REPLY",
+                "detail": {"text": reply},
+            },
+            has_more=False,
+        )
 
-        except Exception as e:
-            run["status"] = "FAILED"
-            run["endedAt"] = now_iso()
-            _save_json(rpath, run)
-            yield send(
+    except RunCancelled as e:
+        # /runs/{id}/cancel: 진행 중 노드는 다음 페이지/배치/파일 경계에서 중단됨
+        set_run(status="CANCELLED", endedAt=now_iso())
+        drop_checkpoints(run_id)
+        await send(
+            {
+                "type": "SUMMARY",
+                "nodeId": "runtime",
+                "message": f"실행 취소: {e}",
+                "detail": {},
+            },
+            has_more=False,
+        )
+    except Exception as e:
+        set_run(status="FAILED", endedAt=now_iso())
+        await send(
+            {
+                "type": "SUMMARY",
+                "nodeId": "runtime",
+                "message": f"실패: {e}",
+                "detail": {"limits": e.limits} if getattr(e, "limits", None) else {},
+            },
+            has_more=False,
+        )
+    finally:
+        beat.cancel()
+        admission.release(run_id)
+        _cancel_tokens.pop(run_id, None)
+
+
+# ---------- 운영 지표 (Prometheus 텍스트 포맷) ----------
+# 수집 시점에 읽는 값: 실행 중/대기 중 run 수, 열린 채널과 SSE 구독자 수
+gauge("runs_in_flight", "Runs holding an execution slot", fn=lambda: admission.stats()["running"])
+gauge("runs_queued", "Runs waiting for an execution slot", fn=lambda: admission.stats()["queued"])
+gauge("run_channels_open", "Run event channels held in memory", fn=lambda: len(runs.channels))
+gauge(
+    "sse_subscribers",
+    "Connected SSE subscribers across all runs",
+    fn=lambda: sum(ch.subscriber_count for ch in list(runs.channels.values())),
+)
+
+
+@app.get("/metrics", tags=["Ops"])
+def metrics():
+    return Response(REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+# ---------- SSE: 실행 이벤트 구독(실행은 워커가 담당) ----------
+@app.get("/runs/{run_id}/events", tags=["Runs"])
+async def run_events(run_id: str, request: Request):
+    """
+    실행 이벤트 구독. 재접속 시 Last-Event-ID(헤더 또는 ?lastEventId=) 이후 이벤트만 재생 후 실시간 추종.
+    형식: text/event-stream(기본) | application/x-msgpack(Accept 또는 ?format=msgpack, 길이 접두 프레임).
+    압축: Accept-Encoding(또는 ?encoding=gzip|deflate|identity) 협상, 이벤트마다 flush.
+    """
+    run = run_store.get(run_id, with_workflow=False)
+    if run is None:
+        raise HTTPException(404, "run not found")
+    try:
+        last_id = int(
+            request.headers.get("last-event-id")
+            or request.query_params.get("lastEventId")
+            or 0
+        )
+    except ValueError:
+        last_id = 0
+
+    ch = runs.channel(run_id)
+    if ch is None:
+        if run_store.claim(run_id, stale_from=("PLANNING", "QUEUED")):
+            # 하트비트가 끊긴 대기 실행(예: 서버 재시작): 여기서 워커에 등록.
+            # 다른 워커가 가진 실행이면 아래에서 로그만 재생
+            if not run.get("engine"):
+                run_store.update(
+                    run_id, engine=request.query_params.get("engine", "lg").lower()
+                )
+            ch = runs.submit(run_id, _execute_run)
+
+    fmt, encoding = negotiate(
+        request.headers.get("accept"),
+        request.headers.get("accept-encoding"),
+        request.query_params.get("format"),
+        request.query_params.get("encoding"),
+    )
+
+    async def frames():
+        if ch is not None:
+            async for frame in ch.subscribe(after_seq=last_id, fmt=fmt):
+                yield frame
+            return
+        # 메모리에서 해제된(끝난) 실행: append-only 로그에서 재생
+        logged = await asyncio.to_thread(read_event_log, run_id, last_id)
+        for cev in logged:
+            yield render(fmt, cev)
+        if not logged and last_id == 0:
+            yield render(
+                fmt,
                 {
+                    "seq": 1,
                     "type": "SUMMARY",
                     "nodeId": "runtime",
-                    "message": f"실패: {e}",
-                    "detail": {},
+                    "message": f"RUN_{run.get('status')}",
+                    "detail": {"artifactId": run.get("artifactId")},
+                    "ts": now_iso(),
+                    "has_more": False,
                 },
-                has_more=False,
             )
-            stream_active = False
+
+    async def gen():
+        z = StreamCompressor(encoding)
+        async for frame in frames():
+            yield z.feed(frame)
+        tail = z.finish()
+        if tail:
+            yield tail
 
     headers = {
-        "Content-Type": "text/event-stream",
-        "Cache-Control": "no-cache",
+        "Content-Type": STREAM_FORMATS[fmt],
+        "Cache-Control": "no-cache, no-transform",
         "Connection": "keep-alive",
+        "Vary": "Accept, Accept-Encoding",
+        # nginx 등 리버스 프록시가 압축 스트림을 모아 두지 않도록
+        "X-Accel-Buffering": "no",
     }
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
     return StreamingResponse(gen(), headers=headers)
 
 
+@app.get("/runs/{run_id}/payloads/{payload_id}", tags=["Runs"])
+async def run_payload(
+    run_id: str,
+    payload_id: str,
+    path: str = Query("", description="예: detail.state.pdf_chunks (__compact__.notes 의 경로)"),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    """
+    축약된 이벤트(__compact__.payloadId)의 원본 {message, detail}.
+    path 가 배열이면 offset/limit 페이지, 아니면 값 전체(안쪽 긴 배열은 limit 개 + pages 안내).
+    """
+    value = await asyncio.to_thread(payloads.load, run_id, payload_id)
+    if value is None:
+        raise HTTPException(404, "payload not found")
+    found, target = payloads.resolve(value, path)
+    if not found:
+        raise HTTPException(404, f"path not found: {path}")
+    return {"runId": run_id, "payloadId": payload_id, **payloads.paginate(target, path, offset, limit)}
+
+
 # ---------- Artifacts ----------
+@app.get("/artifacts/profiles/{run_id}", tags=["Artifacts"])
+def get_run_profiles(run_id: str):
+    """profile 실행의 노드별 프로파일 목록(.pstats / .txt 요약 / .collapsed flamegraph 스택)."""
+    items = list_profiles(run_id)
+    if not items:
+        raise HTTPException(404, "no profiles for run")
+    return {"runId": run_id, "items": items}
+
+
+@app.get("/artifacts/profiles/{run_id}/{name}", tags=["Artifacts"])
+def get_run_profile(run_id: str, name: str):
+    path = profile_path(run_id, name)
+    if not path:
+        raise HTTPException(404, "profile not found")
+    return FileResponse(
+        path, media_type=PROFILE_KINDS[os.path.splitext(name)[1]], filename=name
+    )
+
+
 @app.get("/artifacts/{artifact_id}", tags=["Artifacts"])
-def get_artifact(artifact_id: str):
-    xlsx_path = os.path.join(ART_DIR, f"{artifact_id}.xlsx")
-    if not os.path.exists(xlsx_path):
+def get_artifact(artifact_id: str, request: Request, format: Optional[str] = None):
+    """?format=xlsx|parquet|csv 또는 Accept 헤더로 포맷 선택. xlsx 외 포맷은 최초 요청 시 생성 후 캐시."""
+    if os.path.basename(artifact_id) != artifact_id:
         raise HTTPException(404, "artifact not found")
-    display_name = f"{artifact_id}.xlsx"
-    meta_path = os.path.join(ART_DIR, f"{artifact_id}.meta.json")
-    if os.path.exists(meta_path):
-        try:
-            dn = _load_json(meta_path, {}).get("display_name")
-            if isinstance(dn, str) and dn.strip():
-                display_name = dn
-        except Exception:
-            pass
-    return FileResponse(
-        xlsx_path,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        filename=display_name,
+    if not os.path.exists(artifact_path(artifact_id, "xlsx")):
+        raise HTTPException(404, "artifact not found")
+    fmt = negotiate_format(format, request.headers.get("accept"))
+    if fmt is None:
+        raise HTTPException(
+            406, f"지원 포맷: {', '.join(ARTIFACT_FORMATS)} (?format= 또는 Accept)"
+        )
+    path = ensure_format(artifact_id, fmt)
+    if not path:
+        raise HTTPException(404, "artifact not found")
+    _, media_type = ARTIFACT_FORMATS[fmt]
+    filename = display_name(artifact_id, fmt, load_meta(artifact_id))
+
+    # 검증자: 내용 기반 strong ETag + Last-Modified → 304. 단일 Range(이어받기)/If-Range/416 은 ArtifactFileResponse
+    st = os.stat(path)
+    etag = file_etag(path, st)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(st.st_mtime, usegmt=True),
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, no-cache",
+        "Vary": "Accept",
+    }
+    if is_not_modified(request.headers, etag, st.st_mtime):
+        return Response(status_code=304, headers=headers)
+
+    return ArtifactFileResponse(
+        path,
+        st.st_size,
+        media_type=media_type,
+        filename=filename,
+        headers=headers,
+        range_header=request.headers.get("range"),
+        if_range=request.headers.get("if-range"),
     )
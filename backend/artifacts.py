@@ -0,0 +1,400 @@
+from __future__ import annotations
+import os, json, gzip, shutil, hashlib, threading
+from typing import Dict, Any, Callable, Iterable, List, Optional, Tuple
+from urllib.parse import quote
+
+from starlette.responses import StreamingResponse
+
+from .settings import ART_DIR
+
+# ---- 포맷 정의: format -> (확장자, media type) ----
+ARTIFACT_FORMATS: Dict[str, Tuple[str, str]] = {
+    "xlsx": (
+        ".xlsx",
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ),
+    "parquet": (".parquet", "application/vnd.apache.parquet"),
+    "csv": (".csv.gz", "application/gzip"),
+}
+
+# Accept 헤더 media type -> format
+_ACCEPT_MAP: Dict[str, str] = {
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": "xlsx",
+    "application/vnd.apache.parquet": "parquet",
+    "application/x-parquet": "parquet",
+    "application/parquet": "parquet",
+    "text/csv": "csv",
+    "application/gzip": "csv",
+}
+
+CSV_BATCH_ROWS = 50_000
+
+_gen_locks: Dict[str, threading.Lock] = {}
+_gen_locks_guard = threading.Lock()
+
+
+# ---- 저장 구조 ----
+# art_dir/blobs/{content_hash}{ext} : 실제 산출물 (병합 데이터 + export 설정 해시로 content-addressed)
+# art_dir/{art_id}.meta.json        : 실행별 별칭 {display_name, content_hash, formats}
+# art_dir/{art_id}{ext}             : (구버전) 별칭 없이 직접 저장된 산출물
+def blob_path(content_hash: str, fmt: str = "xlsx", art_dir: str = ART_DIR) -> str:
+    ext, _ = ARTIFACT_FORMATS[fmt]
+    return os.path.join(art_dir, "blobs", f"{content_hash}{ext}")
+
+
+def artifact_path(
+    art_id: str,
+    fmt: str = "xlsx",
+    art_dir: str = ART_DIR,
+    meta: Optional[Dict[str, Any]] = None,
+) -> str:
+    """별칭(meta.content_hash)이 있으면 blob 경로, 없으면 구버전 직접 경로."""
+    if meta is None:
+        meta = load_meta(art_id, art_dir)
+    h = meta.get("content_hash")
+    if isinstance(h, str) and h:
+        return blob_path(h, fmt, art_dir)
+    ext, _ = ARTIFACT_FORMATS[fmt]
+    return os.path.join(art_dir, f"{art_id}{ext}")
+
+
+def meta_path(art_id: str, art_dir: str = ART_DIR) -> str:
+    return os.path.join(art_dir, f"{art_id}.meta.json")
+
+
+def load_meta(art_id: str, art_dir: str = ART_DIR) -> Dict[str, Any]:
+    p = meta_path(art_id, art_dir)
+    if not os.path.exists(p):
+        return {}
+    try:
+        with open(p, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def save_meta(art_id: str, meta: Dict[str, Any], art_dir: str = ART_DIR):
+    with open(meta_path(art_id, art_dir), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+
+def display_name(art_id: str, fmt: str, meta: Dict[str, Any]) -> str:
+    """meta.display_name(.xlsx 기준)의 확장자를 포맷에 맞게 교체."""
+    ext, _ = ARTIFACT_FORMATS[fmt]
+    dn = meta.get("display_name")
+    if not (isinstance(dn, str) and dn.strip()):
+        return f"{art_id}{ext}"
+    stem = dn[:-5] if dn.lower().endswith(".xlsx") else dn
+    return f"{stem}{ext}"
+
+
+# ---------- 포맷 변환 ----------
+def _write_parquet(table_ref, dest: str):
+    import pandas as pd
+
+    if isinstance(table_ref, str) and table_ref.lower().endswith(".parquet"):
+        shutil.copyfile(table_ref, dest)
+        return
+    df = table_ref if isinstance(table_ref, pd.DataFrame) else _read_table(table_ref)
+    write_frame_parquet(df, dest)
+
+
+def write_frame_parquet(df, dest: str):
+    try:
+        df.to_parquet(dest, index=False)
+    except (ValueError, TypeError, ImportError):
+        # 부서별 시트 병합 결과처럼 한 컬럼에 숫자/문자가 섞이면 Arrow 변환 실패 → 혼합 컬럼만 문자열로
+        fixed = df.copy()
+        for c in fixed.columns[fixed.dtypes == object]:
+            fixed[c] = fixed[c].map(lambda v: None if v is None or v != v else str(v))
+        fixed.to_parquet(dest, index=False)
+
+
+def _write_csv_gz(table_ref, dest: str):
+    import pandas as pd
+
+    with gzip.open(dest, "wt", encoding="utf-8", newline="") as f:
+        if isinstance(table_ref, str) and table_ref.lower().endswith(".parquet"):
+            import pyarrow.parquet as pq
+
+            # row group 배치 단위로 기록 (전체 로딩 없음)
+            pf = pq.ParquetFile(table_ref)
+            header = True
+            for rb in pf.iter_batches(batch_size=CSV_BATCH_ROWS):
+                rb.to_pandas().to_csv(f, index=False, header=header)
+                header = False
+            if header:
+                pd.DataFrame(columns=pf.schema_arrow.names).to_csv(f, index=False)
+            return
+        df = table_ref if isinstance(table_ref, pd.DataFrame) else _read_table(table_ref)
+        df.to_csv(f, index=False)
+
+
+def _read_table(path: str):
+    import pandas as pd
+
+    low = path.lower()
+    if low.endswith(".parquet"):
+        return pd.read_parquet(path)
+    if low.endswith(".csv"):
+        return pd.read_csv(path)
+    return pd.read_excel(path, engine="openpyxl")
+
+
+def atomic_write(dest: str, fmt: str, write: Callable[[str], Any]):
+    """write(tmp) 로 임시파일 작성 후 rename(원자적). 동시 생성 시 마지막 rename 이 이긴다(내용 동일)."""
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    ext, _ = ARTIFACT_FORMATS[fmt]
+    # 확장자를 유지해야 ExcelWriter 등이 엔진을 추론할 수 있음
+    tmp = f"{dest[: -len(ext)]}.tmp-{os.getpid()}-{threading.get_ident()}{ext}"
+    try:
+        write(tmp)
+        os.replace(tmp, dest)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def write_format(table_ref, dest: str, fmt: str):
+    """table_ref(DataFrame 또는 parquet/csv/xlsx 경로)를 fmt 로 기록."""
+    if fmt == "parquet":
+        atomic_write(dest, fmt, lambda tmp: _write_parquet(table_ref, tmp))
+    elif fmt == "csv":
+        atomic_write(dest, fmt, lambda tmp: _write_csv_gz(table_ref, tmp))
+    else:
+        raise ValueError(f"unsupported artifact format: {fmt}")
+
+
+# ---------- 콘텐츠 해시 ----------
+def _canon_cell(v, isna) -> Optional[str]:
+    if v is None:
+        return None
+    try:
+        if isna(v):  # NaN/NaT/pd.NA
+            return None
+    except (TypeError, ValueError):
+        pass
+    return str(v)
+
+
+def content_hash(columns: List[str], batches: Iterable[List[tuple]], export_cfg: Dict[str, Any]) -> str:
+    """
+    내보낼 표 + export 설정의 sha256.
+    표는 원천 형태와 무관한 정규형으로 해시: 컬럼 이름 + 행마다 셀 문자열 목록(NULL 은 null).
+    → 같은 데이터면 DataFrame(seq 엔진)이든 parquet 경로(lg 엔진)든 같은 값. 배치 단위로 흘려 읽는다.
+    """
+    import pandas as pd
+
+    h = hashlib.sha256(b"artifact-v2\0")
+    h.update(json.dumps(export_cfg, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+    h.update(b"\0")
+    h.update(json.dumps([str(c) for c in columns], ensure_ascii=False).encode("utf-8"))
+    enc = json.JSONEncoder(ensure_ascii=False).encode
+    for batch in batches:
+        h.update(b"".join(b"\n" + enc([_canon_cell(v, pd.isna) for v in row]).encode("utf-8") for row in batch))
+    return h.hexdigest()
+
+
+def ensure_format(art_id: str, fmt: str, art_dir: str = ART_DIR) -> Optional[str]:
+    """
+    요청 포맷 파일 경로를 반환. 없으면 최초 요청 시 생성 후 캐시(같은 파일 재사용).
+    - 원천: blob parquet(EXPORT_FORMATS 로 즉시 생성한 경우) → meta.source_path(병합 테이블 파일) → xlsx 산출물
+    """
+    meta = load_meta(art_id, art_dir)
+    dest = artifact_path(art_id, fmt, art_dir, meta)
+    if os.path.exists(dest):
+        return dest
+    xlsx = artifact_path(art_id, "xlsx", art_dir, meta)
+    if fmt == "xlsx" or not os.path.exists(xlsx):
+        return None
+
+    with _gen_locks_guard:
+        lock = _gen_locks.setdefault(dest, threading.Lock())
+    with lock:
+        if os.path.exists(dest):  # 다른 요청이 먼저 생성
+            return dest
+        src = artifact_path(art_id, "parquet", art_dir, meta)
+        if not os.path.exists(src):
+            src = meta.get("source_path")
+        if not (isinstance(src, str) and os.path.exists(src)):
+            src = xlsx
+        write_format(src, dest, fmt)
+    return dest
+
+
+# ---------- 검증자(ETag/Last-Modified) & Range(If-Range) ----------
+_etag_cache: Dict[Tuple[str, int, int], str] = {}
+_etag_guard = threading.Lock()
+
+
+def file_etag(path: str, st: Optional[os.stat_result] = None) -> str:
+    """파일 내용 sha256 기반 strong ETag. (경로, 크기, mtime) 단위로 메모리 캐시."""
+    st = st or os.stat(path)
+    key = (path, st.st_size, st.st_mtime_ns)
+    with _etag_guard:
+        cached = _etag_cache.get(key)
+    if cached:
+        return cached
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    etag = f'"{h.hexdigest()}"'
+    with _etag_guard:
+        if len(_etag_cache) > 1024:
+            _etag_cache.clear()
+        _etag_cache[key] = etag
+    return etag
+
+
+def _etag_list(header: str) -> List[str]:
+    return [t.strip() for t in header.split(",") if t.strip()]
+
+
+def is_not_modified(
+    headers: Dict[str, str] | Any, etag: str, last_modified: float
+) -> bool:
+    """If-None-Match(약한 비교) 우선, 없을 때만 If-Modified-Since(초 단위) 평가."""
+    inm = headers.get("if-none-match")
+    if inm is not None:
+        tags = _etag_list(inm)
+        return "*" in tags or any(t.removeprefix("W/") == etag for t in tags)
+    ims = headers.get("if-modified-since")
+    if ims:
+        try:
+            from email.utils import parsedate_to_datetime
+
+            return int(last_modified) <= parsedate_to_datetime(ims).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def if_range_matches(if_range: Optional[str], etag: str, last_modified_http: str) -> bool:
+    """If-Range 없으면 True. strong ETag 또는 Last-Modified 가 정확히 같을 때만 부분 응답."""
+    if if_range is None:
+        return True
+    if_range = if_range.strip()
+    return if_range == etag or if_range == last_modified_http
+
+
+class RangeNotSatisfiable(Exception):
+    """요청 범위가 파일 밖(416)."""
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Range 헤더 → (시작, 끝) (끝 포함). 단일 'bytes=' 범위만 처리한다.
+    없음·다른 단위·형식 오류·다중 범위는 None(무시하고 전체 200, RFC 9110 14.2).
+    시작이 크기 이상이거나 길이 0 인 접미사 범위는 RangeNotSatisfiable.
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = (x.strip() for x in spec.partition("-"))
+    if not sep or (first and not first.isdigit()) or (last and not last.isdigit()) or not (first or last):
+        return None
+    if not first:  # bytes=-N: 끝에서 N 바이트
+        n = int(last)
+        if n == 0 or size == 0:
+            raise RangeNotSatisfiable()
+        return max(0, size - n), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable()
+    end = min(int(last), size - 1) if last else size - 1
+    return start, end
+
+
+def iter_file_range(path: str, start: int, length: int, chunk: int = 64 * 1024) -> Iterable[bytes]:
+    with open(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            block = f.read(min(chunk, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+
+
+def content_disposition(filename: str) -> str:
+    """다운로드 파일 이름(비 ASCII 는 RFC 5987 filename*)."""
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
+class ArtifactFileResponse(StreamingResponse):
+    """
+    산출물 파일 응답(Starlette 공개 API 인 StreamingResponse 만 사용).
+    - Range 가 단일 바이트 범위면 206 + Content-Range, 파일 밖이면 416 (Content-Range: bytes */크기)
+    - If-Range 는 headers 의 strong ETag / Last-Modified 와 비교, 다르면 범위를 무시하고 전체 200
+    - 다중·형식 오류 범위도 무시하고 전체 200
+    """
+
+    def __init__(
+        self,
+        path: str,
+        size: int,
+        media_type: str,
+        filename: str,
+        headers: Dict[str, str],
+        range_header: Optional[str] = None,
+        if_range: Optional[str] = None,
+    ):
+        headers = {**headers, "Content-Disposition": content_disposition(filename)}
+        rng: Optional[Tuple[int, int]] = None
+        if range_header and if_range_matches(
+            if_range, headers.get("ETag", ""), headers.get("Last-Modified", "")
+        ):
+            try:
+                rng = parse_range(range_header, size)
+            except RangeNotSatisfiable:
+                headers.update({"Content-Range": f"bytes */{size}", "Content-Length": "0"})
+                super().__init__(iter(()), status_code=416, headers=headers)
+                return
+        start, end = rng or (0, size - 1)
+        headers["Content-Length"] = str(end - start + 1)
+        if rng:
+            headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        super().__init__(
+            iter_file_range(path, start, end - start + 1),
+            status_code=206 if rng else 200,
+            media_type=media_type,
+            headers=headers,
+        )
+
+
+# ---------- 콘텐츠 협상 ----------
+def negotiate_format(fmt: Optional[str], accept: Optional[str]) -> Optional[str]:
+    """?format= 우선, 없으면 Accept(q값 순). 알 수 없는 포맷이면 None, 지정 없음은 xlsx."""
+    if fmt:
+        fmt = fmt.lower().strip()
+        if fmt in ("csv.gz", "gz"):
+            fmt = "csv"
+        return fmt if fmt in ARTIFACT_FORMATS else None
+    if not accept:
+        return "xlsx"
+    prefs: List[Tuple[float, int, str]] = []
+    for i, part in enumerate(accept.split(",")):
+        fields = [x.strip() for x in part.split(";")]
+        mt, q = fields[0].lower(), 1.0
+        for p in fields[1:]:
+            if p.startswith("q="):
+                try:
+                    q = float(p[2:])
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            prefs.append((-q, i, mt))
+    for _, _, mt in sorted(prefs):
+        if mt in _ACCEPT_MAP:
+            return _ACCEPT_MAP[mt]
+        if mt in ("*/*", "application/*"):
+            return "xlsx"
+    return "xlsx" if not prefs else None
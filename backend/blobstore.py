@@ -0,0 +1,53 @@
+from __future__ import annotations
+import os, json, shutil
+from typing import Dict, Any, Optional
+
+from .settings import RUN_BLOB_DIR
+
+# LangGraph state/체크포인트에는 큰 중간값(청크 목록 등) 대신 이 핸들만 싣는다.
+#   {"$blob": "<run_id>/<name>.json", "count": 1234, "bytes": 5678901}
+HANDLE_KEY = "$blob"
+
+
+def _safe(name: str) -> str:
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
+
+
+def run_blob_dir(run_id: str) -> str:
+    return os.path.join(RUN_BLOB_DIR, _safe(run_id))
+
+
+def is_handle(v: Any) -> bool:
+    return isinstance(v, dict) and HANDLE_KEY in v
+
+
+def put(run_id: str, name: str, value: Any) -> Dict[str, Any]:
+    """값을 실행 전용 디렉터리에 저장하고 핸들 반환. 같은 이름이면 덮어씀(재실행/재개 시 동일 핸들)."""
+    d = run_blob_dir(run_id)
+    os.makedirs(d, exist_ok=True)
+    rel = f"{_safe(run_id)}/{_safe(name)}.json"
+    path = os.path.join(RUN_BLOB_DIR, rel)
+    tmp = f"{path}.tmp-{os.getpid()}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(value, f, ensure_ascii=False)
+    os.replace(tmp, path)
+    handle: Dict[str, Any] = {HANDLE_KEY: rel, "bytes": os.path.getsize(path)}
+    if isinstance(value, (list, dict)):
+        handle["count"] = len(value)
+    return handle
+
+
+def get(handle: Optional[Dict[str, Any]], default: Any = None) -> Any:
+    """핸들이 가리키는 값. 핸들이 없거나 파일이 정리됐으면 default."""
+    if not is_handle(handle):
+        return default
+    path = os.path.join(RUN_BLOB_DIR, handle[HANDLE_KEY])
+    if not os.path.exists(path):
+        return default
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def drop_run(run_id: str):
+    """실행 종료(더 이상 재개하지 않음) 시 실행 전용 blob 정리."""
+    shutil.rmtree(run_blob_dir(run_id), ignore_errors=True)
@@ -1,14 +1,25 @@
 from __future__ import annotations
-from typing import Any, Dict, List, Tuple, Union
+import json
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 # ====== 기본 한도 (원하면 settings.py로 빼서 환경변수화 가능) ======
 MAX_EVENT_TEXT_CHARS = 800  # 이벤트 내 단일 텍스트 최대 길이
 MAX_SNIPPET_CHARS = 180  # 스니펫 미리보기 길이
 MAX_ARRAY_ITEMS = 6  # 배열은 앞쪽 N개만 노출
-MAX_STATE_BYTES = 32_000  # state 전체 직렬화 바이트 상한(거칠게)
+MAX_STATE_BYTES = 32_000  # detail.state 직렬화 바이트 상한(거칠게)
+MAX_EVENT_BYTES = 64_000  # 이벤트 1건 직렬화 바이트 상한(거칠게)
+# state 상한을 넘어도 남길 핵심 키 (먼저 기록)
+STATE_CORE_KEYS = ("merged_path", "validation_report", "artifact_id", "__pdf_chunks_meta__")
 
 TextLike = Union[str, bytes]
 
+# json.dumps 와 같은 출력(구분자 ", " / ": ") → 재생(read_event_log→sse_frame) 프레임과 동일
+_ENC = json.JSONEncoder(ensure_ascii=False, default=str)
+
+
+def _dumps(v: Any) -> bytes:
+    return _ENC.encode(v).encode("utf-8")
+
 
 def _shorten_text(s: TextLike, limit: int = MAX_EVENT_TEXT_CHARS) -> Tuple[str, bool]:
     if isinstance(s, bytes):
@@ -23,148 +34,208 @@ def _shorten_text(s: TextLike, limit: int = MAX_EVENT_TEXT_CHARS) -> Tuple[str,
     return s[:head] + "…", True
 
 
-def _short_snippet(s: TextLike, limit: int = MAX_SNIPPET_CHARS) -> str:
-    t, _ = _shorten_text(s, limit)
+class _Budget:
+    """
+    직렬화 조각(bytes) + 누적 크기. 누적이 limit 을 넘으면 이후 키/항목은 내려가지 않고 생략한다.
+    (이미 연 괄호는 닫으므로 limit 을 조금 넘을 수 있음)
+    """
+
+    __slots__ = ("parts", "size", "limit", "notes")
+
+    def __init__(self, limit: int):
+        self.parts: List[bytes] = []
+        self.size = 0
+        self.limit = limit
+        self.notes: List[str] = []
+
+    def put(self, b: bytes):
+        self.parts.append(b)
+        self.size += len(b)
+
+    @property
+    def spent(self) -> bool:
+        return self.size >= self.limit
+
+    def key(self, first: bool, k: Any):
+        self.put((b"" if first else b", ") + _dumps(str(k)) + b": ")
+
+
+def _put_text(b: _Budget, s: TextLike, limit: int, path: Optional[str] = None) -> str:
+    t, trunc = _shorten_text(s, limit)
+    if trunc and path:
+        b.notes.append(f"{path} text truncated")
+    b.put(_dumps(t))
     return t
 
 
-def _compact_list(
+def _put_raw(b: _Budget, v: Any) -> Any:
+    """값을 그대로(축약 규칙 없이) 기록. 컨테이너는 예산이 남은 동안만 내려간다."""
+    if isinstance(v, dict):
+        out: Dict[str, Any] = {}
+        b.put(b"{")
+        for k, x in v.items():
+            if b.spent:
+                break
+            b.key(not out, k)
+            out[str(k)] = _put_raw(b, x)
+        b.put(b"}")
+        return out
+    if isinstance(v, (list, tuple)):
+        arr: List[Any] = []
+        b.put(b"[")
+        for x in v:
+            if b.spent:
+                break
+            if arr:
+                b.put(b", ")
+            arr.append(_put_raw(b, x))
+        b.put(b"]")
+        return arr
+    b.put(_dumps(v))
+    return v
+
+
+def _put_list(
+    b: _Budget,
     lst: List[Any],
     item_limit: int = MAX_ARRAY_ITEMS,
     per_text_limit: int = MAX_SNIPPET_CHARS,
-):
-    """리스트는 앞쪽 N개만 유지, 텍스트 필드는 스니펫으로 축약."""
-    truncated = False
-    out = []
-    for i, it in enumerate(lst):
-        if i >= item_limit:
-            truncated = True
+) -> Tuple[List[Any], Dict[str, Any]]:
+    """리스트는 앞쪽 N개만(예산이 남은 동안), 항목의 텍스트 필드는 스니펫으로 축약."""
+    out: List[Any] = []
+    b.put(b"[")
+    for it in lst:
+        if len(out) >= item_limit or b.spent:
             break
+        if out:
+            b.put(b", ")
         if isinstance(it, dict):
-            d2 = {}
+            d2: Dict[str, Any] = {}
+            b.put(b"{")
             for k, v in it.items():
+                if b.spent:
+                    break
+                b.key(not d2, k)
                 if isinstance(v, (str, bytes)):
-                    d2[k] = _short_snippet(v, per_text_limit)
+                    d2[k] = _put_text(b, v, per_text_limit)
                 elif isinstance(v, list):
-                    d2[k], _ = _compact_list(
-                        v, item_limit=item_limit, per_text_limit=per_text_limit
-                    )
+                    d2[k], _ = _put_list(b, v, item_limit, per_text_limit)
                 else:
-                    d2[k] = v
+                    d2[k] = _put_raw(b, v)
+            b.put(b"}")
             out.append(d2)
         elif isinstance(it, (str, bytes)):
-            out.append(_short_snippet(it, per_text_limit))
+            out.append(_put_text(b, it, per_text_limit))
         else:
-            out.append(it)
-    meta = {
-        "total": len(lst),
-        "shown": len(out),
-        "truncated": truncated or (len(lst) > len(out)),
-    }
+            out.append(_put_raw(b, it))
+    b.put(b"]")
+    meta = {"total": len(lst), "shown": len(out), "truncated": len(lst) > len(out)}
     return out, meta
 
 
-def _sizeof(obj: Any) -> int:
-    try:
-        import json
-
-        return len(json.dumps(obj, ensure_ascii=False).encode("utf-8"))
-    except Exception:
-        return 0
+def _put_member(b: _Budget, d: Dict[str, Any], k: str, out: Dict[str, Any], path: str):
+    """detail 축약 규칙: 문자열은 상한, 배열은 앞쪽 N개 + __{키}_meta__, dict 는 재귀."""
+    v = d[k]
+    b.key(not out, k)
+    p = f"{path}.{k}"
+    if isinstance(v, (str, bytes)):
+        out[k] = _put_text(b, v, MAX_EVENT_TEXT_CHARS, p)
+    elif isinstance(v, list):
+        out[k], meta = _put_list(b, v)
+        if meta["truncated"]:
+            b.notes.append(f"{p} list truncated: {meta}")
+        mk = f"__{k}_meta__"
+        if mk not in d:  # 상위에서 이미 붙인 메타가 있으면 그쪽을 쓴다
+            b.key(False, mk)
+            b.put(_dumps(meta))
+            out[mk] = meta
+    elif isinstance(v, dict):
+        out[k] = _put_state(b, v, p) if p == "detail.state" else _put_walk(b, v, p)
+    else:
+        out[k] = _put_raw(b, v)
+
+
+def _put_walk(b: _Budget, d: Dict[str, Any], path: str) -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    b.put(b"{")
+    for k in d:
+        if b.spent:
+            b.key(not out, "__truncated__")
+            b.put(b"true")
+            out["__truncated__"] = True
+            b.notes.append(f"{path} byte budget -> remaining keys omitted")
+            break
+        _put_member(b, d, k, out, path)
+    b.put(b"}")
+    return out
 
 
-def compact_event(ev: Dict[str, Any]) -> Dict[str, Any]:
+def _put_state(b: _Budget, st: Dict[str, Any], path: str) -> Dict[str, Any]:
+    """
+    state 는 핵심 키를 먼저 쓰고 나머지를 이어 쓴다. MAX_STATE_BYTES 를 다 쓰면
+    핵심 키 뒤에 쓴 조각을 버리고(다시 직렬화하지 않고 잘라냄) 핵심 키만 남긴다.
     """
-    거대한 이벤트(detail/state/pdf_chunks/텍스트 배열 등)를
-    프리뷰 중심으로 '요약/자르기' 하여 전송 크기를 제한한다.
-    - 원본을 클라이언트에 모두 보내지 않는다(요구사항: "시간 없으니 자르거나 요약").
-    - UI가 '확장' 버튼을 그릴 수 있도록 __compact 메타 정보 동봉.
+    chunks = st.get("pdf_chunks")
+    if isinstance(chunks, list) and "__pdf_chunks_meta__" not in st:
+        # pdf_chunks 메타는 핵심 키(상한 초과로 청크를 버려도 전체 개수는 남김)
+        shown = min(len(chunks), MAX_ARRAY_ITEMS)
+        st = {**st, "__pdf_chunks_meta__": {"total": len(chunks), "shown": shown, "truncated": len(chunks) > shown}}
+    outer = b.limit
+    b.limit = min(outer, b.size + MAX_STATE_BYTES)
+    out: Dict[str, Any] = {}
+    b.put(b"{")
+    try:
+        for k in STATE_CORE_KEYS:
+            if k in st:
+                _put_member(b, st, k, out, path)
+        mark = (len(b.parts), b.size, len(b.notes), dict(out))
+        for k in st:
+            if b.spent:
+                break
+            if k not in out and k not in STATE_CORE_KEYS:
+                _put_member(b, st, k, out, path)
+        if b.spent:
+            n_parts, b.size, n_notes, out = mark
+            del b.parts[n_parts:], b.notes[n_notes:]
+            b.key(not out, "__state_truncated__")
+            b.put(b"true")
+            out["__state_truncated__"] = True
+            b.notes.append("state size limit -> kept core keys")
+    finally:
+        b.limit = outer
+    b.put(b"}")
+    return out
+
+
+def encode_event(ev: Dict[str, Any], payload_id: Optional[str] = None) -> Tuple[Dict[str, Any], bytes]:
+    """
+    거대한 이벤트(detail/state/pdf_chunks/텍스트 배열 등)를 한 번만 순회하며
+    축약본(dict)과 최종 JSON bytes 를 함께 만든다 — 전체 직렬화로 크기를 재는 단계 없음.
+    - 텍스트/배열은 만나는 즉시 자르고, 바이트 예산(state: MAX_STATE_BYTES, 이벤트: MAX_EVENT_BYTES)을
+      다 쓰면 더 내려가지 않고 남은 키/항목을 생략한다.
+    - UI가 '확장' 버튼을 그릴 수 있도록 __compact__ 메타 정보 동봉.
+      payload_id 를 주면 축약이 적용된 경우에만 __compact__.payloadId 로 싣는다(원본 저장은 호출 측).
+    원본 ev 는 바꾸지 않는다.
     """
     if not isinstance(ev, dict):
-        return ev
-    e = dict(ev)  # shallow copy
-
-    detail = e.get("detail")
-    compact_meta = {"applied": False, "notes": []}
-
-    # 1) detail.state 가 거대하면 요약
-    if isinstance(detail, dict) and "state" in detail:
-        st = detail["state"]
-        if isinstance(st, dict):
-            st_size = _sizeof(st)
-            # 대표적으로 pdf_chunks 폭주 방지
-            if "pdf_chunks" in st and isinstance(st["pdf_chunks"], list):
-                chunks = st["pdf_chunks"]
-                compacted, meta = _compact_list(
-                    chunks, item_limit=MAX_ARRAY_ITEMS, per_text_limit=MAX_SNIPPET_CHARS
-                )
-                st_preview = dict(st)
-                st_preview["pdf_chunks"] = compacted
-                st_preview["__pdf_chunks_meta__"] = meta
-                compact_meta["applied"] = True
-                compact_meta["notes"].append(f"state.pdf_chunks truncated: {meta}")
-                detail["state"] = st_preview
-
-            # state 전체 크기 상한
-            if _sizeof(detail["state"]) > MAX_STATE_BYTES:
-                # 핵심 키만 남기고 나머지는 제거
-                keep_keys = [
-                    "merged_path",
-                    "validation_report",
-                    "artifact_id",
-                    "__pdf_chunks_meta__",
-                ]
-                new_state = {k: v for k, v in detail["state"].items() if k in keep_keys}
-                new_state["__state_truncated__"] = True
-                compact_meta["applied"] = True
-                compact_meta["notes"].append("state size limit -> kept core keys")
-                detail["state"] = new_state
-
-    # 2) detail 내 문자열/배열 일반 축약
-    def _walk(obj):
-        if isinstance(obj, dict):
-            out = {}
-            for k, v in obj.items():
-                if isinstance(v, (str, bytes)):
-                    t, trunc = _shorten_text(v, MAX_EVENT_TEXT_CHARS)
-                    if trunc:
-                        compact_meta["applied"] = True
-                        compact_meta["notes"].append(f"detail.{k} text truncated")
-                    out[k] = t
-                elif isinstance(v, list):
-                    arr, meta = _compact_list(v, MAX_ARRAY_ITEMS, MAX_SNIPPET_CHARS)
-                    if meta.get("truncated"):
-                        compact_meta["applied"] = True
-                        compact_meta["notes"].append(
-                            f"detail.{k} list truncated: {meta}"
-                        )
-                    out[k] = arr
-                    out[f"__{k}_meta__"] = meta
-                else:
-                    out[k] = _walk(v)
-            return out
-        elif isinstance(obj, list):
-            arr, meta = _compact_list(obj, MAX_ARRAY_ITEMS, MAX_SNIPPET_CHARS)
-            if meta.get("truncated"):
-                compact_meta["applied"] = True
-                compact_meta["notes"].append(f"list truncated: {meta}")
-            return arr
+        return ev, _dumps(ev)
+    b = _Budget(MAX_EVENT_BYTES)
+    out: Dict[str, Any] = {}
+    b.put(b"{")
+    for k, v in ev.items():
+        b.key(not out, k)
+        if k == "detail" and isinstance(v, dict):
+            out[k] = _put_walk(b, v, "detail")
+        elif k == "message" and isinstance(v, (str, bytes)):
+            out[k] = _put_text(b, v, MAX_EVENT_TEXT_CHARS, "message")
         else:
-            return obj
-
-    if isinstance(detail, dict):
-        e["detail"] = _walk(detail)
-
-    # 3) message 문자열도 상한
-    if isinstance(e.get("message"), (str, bytes)):
-        t, trunc = _shorten_text(e["message"], MAX_EVENT_TEXT_CHARS)
-        e["message"] = t
-        if trunc:
-            compact_meta["applied"] = True
-            compact_meta["notes"].append("message truncated")
-
-    # 4) 메타 부착
-    if compact_meta["applied"]:
-        e.setdefault("__compact__", compact_meta)
-
-    return e
+            out[k] = _put_raw(b, v)
+    if b.notes and "__compact__" not in out:
+        meta: Dict[str, Any] = {"applied": True, "notes": b.notes}
+        if payload_id is not None:
+            meta["payloadId"] = payload_id
+        b.key(False, "__compact__")
+        b.put(_dumps(meta))
+        out["__compact__"] = meta
+    b.put(b"}")
+    return out, b"".join(b.parts)
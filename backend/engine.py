@@ -1,14 +1,47 @@
 from __future__ import annotations
-import os, re, json, io
+import os, re, io, math, time, threading
 from typing import Dict, Any, List, Tuple, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 
 import numpy as np
 import pandas as pd
 
-from .settings import TMP_DIR, ART_DIR
-from .vectorstore import ChromaVS, VSDoc, new_id
+from .settings import (
+    TMP_DIR,
+    ART_DIR,
+    EXPORT_WRITER,
+    EXPORT_BATCH_ROWS,
+    EXPORT_FORMATS,
+    NODE_WORKERS,
+    EMBED_BATCH,
+    CHROMA_MAX_COLLECTIONS,
+    NODE_TIMEOUT_S,
+    NODE_MAX_RETRIES,
+    NODE_RETRY_BACKOFF_S,
+    NODE_TIMEOUT_GRACE_S,
+)
+from .vectorstore import (
+    REF_PREFIX,
+    ChromaVS,
+    VSDoc,
+    build_lock,
+    collection_for,
+    prune_collections,
+    ref_collection,
+)
+from .memo import run_memoized
+from .profiling import profiled
+from .metrics import NODE_SECONDS, NODE_RETRIES, NODE_TIMEOUTS
+from .artifacts import (
+    ARTIFACT_FORMATS,
+    atomic_write,
+    blob_path,
+    content_hash,
+    save_meta,
+    write_format,
+    write_frame_parquet,
+)
 
 KST = timezone.utc  # 간소화: 표시는 클라이언트에서
 
@@ -17,11 +50,60 @@ def now_iso():
     return datetime.now(KST).isoformat()
 
 
+class RunCancelled(Exception):
+    """취소 요청으로 노드 작업을 중단."""
+
+
+class CancelToken:
+    """
+    실행 단위 취소 플래그(스레드 간 공유).
+    노드 구현은 페이지/배치/파일 사이마다 check() → 취소되었으면 RunCancelled.
+    """
+
+    def __init__(self, parent: Optional["CancelToken"] = None):
+        self._ev = threading.Event()
+        self.reason = "cancelled"
+        # parent 가 취소되면 이 토큰도 취소된 것으로 본다(노드 시도 단위 토큰 → 실행 토큰)
+        self.parent = parent
+
+    def cancel(self, reason: str = "cancelled"):
+        self.reason = reason
+        self._ev.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._ev.is_set() or (self.parent is not None and self.parent.cancelled)
+
+    def check(self):
+        if self.parent is not None:
+            self.parent.check()
+        if self._ev.is_set():
+            raise RunCancelled(self.reason)
+
+    def wait(self, timeout: float) -> bool:
+        """최대 timeout 초 대기. 그 사이 취소되면 True."""
+        deadline = time.monotonic() + timeout
+        while not self.cancelled:
+            left = deadline - time.monotonic()
+            if left <= 0:
+                return False
+            self._ev.wait(min(left, 0.1))
+        return True
+
+
 @dataclass
 class Ctx:
     run_id: str
     storage: str
     art_dir: str
+    cancel: CancelToken = field(default_factory=CancelToken)
+    # 실행 전체 프로파일링(workflow.profile / execute 요청의 profile). 노드별은 config.profile
+    profile: bool = False
+
+
+def _check_cancel(ctx: Optional[Ctx]):
+    if ctx is not None:
+        ctx.cancel.check()
 
 
 # ---------- Helpers ----------
@@ -78,7 +160,7 @@ except Exception:
     from pypdf import PdfReader  # lazy fallback
 
 
-def node_parse_pdf(cfg: Dict[str, Any]) -> Dict[str, Any]:
+def node_parse_pdf(cfg: Dict[str, Any], ctx: Optional[Ctx] = None) -> Dict[str, Any]:
     path = cfg["pdf_path"]
     chunk_size = int(cfg.get("chunk_size", 1200))
     overlap = int(cfg.get("overlap", 200))
@@ -87,6 +169,7 @@ def node_parse_pdf(cfg: Dict[str, Any]) -> Dict[str, Any]:
     if USE_FITZ:
         doc = fitz.open(path)
         for i, page in enumerate(doc, start=1):
+            _check_cancel(ctx)
             text = page.get_text("text") or ""
             text = re.sub(r"\s+", " ", text)
             start = 0
@@ -100,6 +183,7 @@ def node_parse_pdf(cfg: Dict[str, Any]) -> Dict[str, Any]:
     else:
         reader = PdfReader(path)
         for i, page in enumerate(reader.pages, start=1):
+            _check_cancel(ctx)
             try:
                 text = page.extract_text() or ""
             except Exception:
@@ -121,30 +205,41 @@ def node_parse_pdf(cfg: Dict[str, Any]) -> Dict[str, Any]:
 
 # ---------- VectorStore(Chroma) ----------
 def node_embed_pdf_to_chroma(
-    cfg: Dict[str, Any], inputs: Dict[str, Any]
+    cfg: Dict[str, Any], inputs: Dict[str, Any], ctx: Optional[Ctx] = None
 ) -> Dict[str, Any]:
     key = cfg.get("chunks_in", "parse_pdf.pdf_chunks")
     chunks: List[Dict[str, Any]] = _dig(inputs, key) or []
     if not chunks:
         return {"vs_ref": None, "vs_count": 0}
 
-    vs = ChromaVS()
-    # 리셋 여부 옵션(기본: 덮어쓰기 방지 위해 새 id 부여)
-    reset = bool(cfg.get("reset", True))
-    if reset:
-        vs.reset()
-
     docs: List[VSDoc] = []
     for idx, ch in enumerate(chunks, start=1):
         docs.append(
             VSDoc(
-                id=new_id("pdf"),
+                id=f"pdf-{idx}",
                 text=ch.get("text", "")[:4000],
                 metadata={"page": int(ch.get("page", 1)), "chunk_index": idx},
             )
         )
-    vs.upsert(docs)
-    return {"vs_ref": "chroma://", "vs_count": len(docs)}
+    # 컬렉션은 청크 내용 + 임베딩 모델 해시별(공유 컬렉션 reset 없음 → 동시 실행이 서로의 벡터를 지우지 않음).
+    # cfg["reset"] 은 하위 호환용으로만 남는다: 불완전한 컬렉션은 항상 비우고 다시 만든다.
+    vs = ChromaVS()
+    name = collection_for(docs, vs.embedder)
+    built = False
+    with build_lock(name):
+        vs.use(name)
+        if vs.collection.count() != len(docs):
+            vs.reset()
+            built = True
+            # 임베딩 요청을 배치로 나눠 배치 사이마다 취소 확인
+            batch = int(cfg.get("batch", EMBED_BATCH))
+            for start in range(0, len(docs), batch):
+                _check_cancel(ctx)
+                vs.upsert(docs[start : start + batch])
+    if built:
+        # 내용별 컬렉션은 계속 쌓이므로 CHROMA_MAX_COLLECTIONS 를 넘으면 오래된 것부터 정리
+        prune_collections(CHROMA_MAX_COLLECTIONS, protect=(name,))
+    return {"vs_ref": f"{REF_PREFIX}{name}", "vs_count": len(docs)}
 
 
 # ---------- XLSX 병합 ----------
@@ -168,19 +263,20 @@ def node_merge_xlsx(
     paths = cfg.get("xlsx_paths") or []
     frames: List[pd.DataFrame] = []
     for xp in paths:
+        _check_cancel(ctx)
         frames.extend(read_one(xp))
 
     merged = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
     merged.columns = [str(c).strip() for c in merged.columns]
 
-    # 저장(Parquet->CSV 폴백)
+    # 저장(Parquet(혼합 컬럼은 문자열)->CSV 폴백)
     from .settings import TMP_DIR
 
     parquet_path = os.path.join(TMP_DIR, f"{ctx.run_id[:8]}_merged.parquet")
     csv_path = os.path.join(TMP_DIR, f"{ctx.run_id[:8]}_merged.csv")
     out_path = None
     try:
-        merged.to_parquet(parquet_path, index=False)
+        write_frame_parquet(merged, parquet_path)
         out_path = parquet_path
     except Exception:
         merged.to_csv(csv_path, index=False)
@@ -212,10 +308,9 @@ def _auto_detect_columns(df: pd.DataFrame) -> Tuple[str, str]:
 
 
 def node_validate_with_pdf(
-    cfg: Dict[str, Any], inputs: Dict[str, Any]
+    cfg: Dict[str, Any], inputs: Dict[str, Any], ctx: Optional[Ctx] = None
 ) -> Dict[str, Any]:
     import pandas as pd
-    from .vectorstore import ChromaVS
 
     table_ref = _dig(inputs, cfg.get("table_in", "merge_xlsx.merged_table"))
     df = _ensure_df(table_ref)
@@ -244,11 +339,27 @@ def node_validate_with_pdf(
 
     grouped = df.groupby(dept_col)["_amt_"].sum(numeric_only=True).fillna(0)
 
-    vs = ChromaVS()
+    vs_ref = _dig(inputs, cfg.get("vs_in", "embed_pdf.vs_ref"))
+    collection = ref_collection(vs_ref)
+    if collection is None:
+        # 색인 없음(청크 0개, 호환용 더미 ref): 다른 컬렉션을 조회하지 않고 전 부서를 miss 로 명시
+        items = [
+            {"policy": "exists", "dept": str(d).strip(), "status": "miss", "evidence": []}
+            for d in grouped.index
+        ]
+        return {
+            "validation_report": {
+                "summary": {"ok": 0, "warn": 0, "fail": len(items)},
+                "items": items,
+                "error": f"no vector index (vs_ref={vs_ref!r})",
+            }
+        }
+    vs = ChromaVS(collection)
     items = []
     ok = warn = fail = 0
 
     for dept, expected in grouped.items():
+        _check_cancel(ctx)
         dept_str = str(dept).strip()
         # exists: 벡터 질의
         q = f"{dept_str} 부서 예산 총괄 표 또는 조직 표기"
@@ -325,33 +436,155 @@ def node_validate_with_pdf(
 
 
 # ---------- Export (검증결과는 포함하지 않음) ----------
+def _cell(v):
+    # NaN/NaT/pd.NA 는 빈 셀로 (pandas to_excel 과 동일)
+    if v is None:
+        return None
+    try:
+        if pd.isna(v):
+            return None
+    except (TypeError, ValueError):
+        pass
+    return v
+
+
+def _iter_row_batches(table_ref, batch_rows: int):
+    """
+    (columns, batches) 반환. batches 는 행 튜플 리스트를 배치 단위로 내보낸다.
+    - parquet 경로: row group 단위로 읽어 전체 테이블을 메모리에 올리지 않음
+    - csv 경로: chunksize 로 분할 읽기
+    - DataFrame/기타: 슬라이스 단위 순회
+    """
+    if isinstance(table_ref, str) and os.path.exists(table_ref):
+        low = table_ref.lower()
+        if low.endswith(".parquet"):
+            import pyarrow.parquet as pq
+
+            pf = pq.ParquetFile(table_ref)
+            columns = [str(c) for c in pf.schema_arrow.names]
+
+            def _pq_batches():
+                for rb in pf.iter_batches(batch_size=batch_rows):
+                    cols = [rb.column(i).to_pylist() for i in range(rb.num_columns)]
+                    yield list(zip(*cols))
+
+            return columns, _pq_batches()
+        if low.endswith(".csv"):
+            reader = pd.read_csv(table_ref, chunksize=batch_rows)
+            first = next(reader, None)
+            if first is None:
+                return [], iter(())
+            columns = [str(c) for c in first.columns]
+
+            def _csv_batches():
+                for chunk in (first, *reader):
+                    yield list(chunk.itertuples(index=False, name=None))
+
+            return columns, _csv_batches()
+
+    df = _ensure_df(table_ref)
+    columns = [str(c) for c in df.columns]
+
+    def _df_batches():
+        for start in range(0, len(df), batch_rows):
+            part = df.iloc[start : start + batch_rows]
+            yield list(part.itertuples(index=False, name=None))
+
+    return columns, _df_batches()
+
+
+def _write_xlsx_streaming(
+    table_ref,
+    path: str,
+    sheet_name: str = "merged",
+    batch_rows: int = 5000,
+    cancel: Optional[CancelToken] = None,
+) -> int:
+    """openpyxl write-only 워크북으로 행을 순차 기록(상수 메모리). 기록한 행 수 반환."""
+    from openpyxl import Workbook
+
+    columns, batches = _iter_row_batches(table_ref, batch_rows)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=sheet_name)
+    ws.append(columns)
+    rows = 0
+    try:
+        for batch in batches:
+            if cancel is not None:
+                cancel.check()
+            for row in batch:
+                ws.append([_cell(v) for v in row])
+            rows += len(batch)
+    except BaseException:
+        ws.close()  # 취소/오류: 시트 임시 파일 스트림을 닫고 포기(저장하지 않은 행 생성기가 열린 채 남지 않게)
+        raise
+    wb.save(path)
+    return rows
+
+
+def _write_xlsx_pandas(table_ref, path: str, sheet_name: str = "merged") -> int:
+    """기존 경로: DataFrame 전체 로딩 후 ExcelWriter 로 기록."""
+    df = _ensure_df(table_ref)
+    with pd.ExcelWriter(path) as w:
+        df.to_excel(w, index=False, sheet_name=sheet_name)
+    return int(len(df))
+
+
 def node_export_xlsx(
     cfg: Dict[str, Any], inputs: Dict[str, Any], ctx: Ctx
 ) -> Dict[str, Any]:
-    df = _ensure_df(_dig(inputs, cfg.get("table_in", "merge_xlsx.merged_table")))
+    table_ref = _dig(inputs, cfg.get("table_in", "merge_xlsx.merged_table"))
     name = cfg.get(
         "filename",
         "2025년도 제3회 일반 및 기타특별회계 추가경정예산서(세출-검색용).xlsx",
     )
 
     art_id = f"art-{ctx.run_id[:8]}"
-    path = os.path.join(ctx.art_dir, f"{art_id}.xlsx")
-    with pd.ExcelWriter(path) as w:
-        df.to_excel(w, index=False, sheet_name="merged")
+    writer = cfg.get("writer", EXPORT_WRITER)
+    # 데이터/설정이 같으면 같은 blob 을 공유 (실행별 art_id 는 meta 별칭만 기록)
+    chash = content_hash(
+        *_iter_row_batches(table_ref, EXPORT_BATCH_ROWS), {"writer": writer, "sheet_name": "merged"}
+    )
+    path = blob_path(chash, "xlsx", ctx.art_dir)
+    reused = os.path.exists(path)
+    if not reused:
+        _check_cancel(ctx)
+        if writer == "pandas":
+            atomic_write(path, "xlsx", lambda tmp: _write_xlsx_pandas(table_ref, tmp))
+        else:
+            batch_rows = int(cfg.get("batch_rows", EXPORT_BATCH_ROWS))
+            atomic_write(
+                path,
+                "xlsx",
+                lambda tmp: _write_xlsx_streaming(
+                    table_ref, tmp, batch_rows=batch_rows, cancel=ctx.cancel
+                ),
+            )
 
-    meta_path = os.path.join(ctx.art_dir, f"{art_id}.meta.json")
-    with open(meta_path, "w", encoding="utf-8") as f:
-        json.dump({"display_name": name}, f, ensure_ascii=False, indent=2)
+    # xlsx 외 포맷은 지정분(cfg.formats / EXPORT_FORMATS)만 즉시 생성, 나머지는 다운로드 시 ensure_format 이 생성
+    formats = ["xlsx"]
+    for fmt in cfg.get("formats") or EXPORT_FORMATS:
+        if fmt not in ARTIFACT_FORMATS or fmt in formats:
+            continue
+        dest = blob_path(chash, fmt, ctx.art_dir)
+        if not os.path.exists(dest):
+            write_format(table_ref, dest, fmt)
+        formats.append(fmt)
 
-    return {"artifact_path": path, "artifact_id": art_id}
+    meta = {"display_name": name, "content_hash": chash, "formats": formats}
+    if isinstance(table_ref, str) and os.path.exists(table_ref):
+        meta["source_path"] = table_ref  # 지연 생성 원천(없어지면 xlsx 에서 생성)
+    save_meta(art_id, meta, ctx.art_dir)
 
+    return {"artifact_path": path, "artifact_id": art_id, "artifact_reused": reused}
 
-# ---------- 순차 실행기 (OBS 세분화) ----------
+
+# ---------- DAG 실행기 (edges 기반 위상 정렬 + 병렬 워커, OBS 세분화) ----------
 NODE_IMPLS = {
     "parse_pdf": node_parse_pdf,
     "embed_pdf": node_embed_pdf_to_chroma,
     "build_vectorstore": lambda cfg, inputs, ctx: {
-        "vs_ref": "chroma://"
+        "vs_ref": REF_PREFIX
     },  # 호환용 더미
     "merge_xlsx": node_merge_xlsx,
     "validate_with_pdf": node_validate_with_pdf,
@@ -359,7 +592,491 @@ NODE_IMPLS = {
 }
 
 
-def execute_stream(workflow: Dict[str, Any], ctx: Ctx):
+def node_deps(workflow: Dict[str, Any]) -> Dict[str, List[str]]:
+    """
+    노드별 선행 노드 목록. edges + 데이터 참조('in', config의 *_in: "node.key")를 합친다.
+    (참조만 있고 edge 가 빠진 워크플로우도 올바른 순서로 실행되도록)
+    """
+    nodes = workflow.get("nodes", [])
+    ids = [n["id"] for n in nodes]
+    deps: Dict[str, List[str]] = {nid: [] for nid in ids}
+
+    def _add(frm: str, to: str):
+        if frm in deps and to in deps and frm != to and frm not in deps[to]:
+            deps[to].append(frm)
+
+    for e in workflow.get("edges", []):
+        _add(e.get("from"), e.get("to"))
+    for n in nodes:
+        cfg = n.get("config", {}) or {}
+        refs = list(n.get("in") or []) + [
+            v for k, v in cfg.items() if k.endswith("_in") and isinstance(v, str)
+        ]
+        for ref in refs:
+            if "." in ref:
+                _add(ref.split(".", 1)[0], n["id"])
+    return deps
+
+
+def topo_order(workflow: Dict[str, Any]) -> List[str]:
+    """Kahn 위상 정렬(동률은 nodes 선언 순). 순환이 있으면 ValueError."""
+    deps = node_deps(workflow)
+    order: List[str] = []
+    remaining = {nid: set(d) for nid, d in deps.items()}
+    while remaining:
+        ready = [nid for nid, d in remaining.items() if not d]
+        if not ready:
+            raise ValueError(f"workflow has a cycle: {sorted(remaining)}")
+        for nid in ready:
+            order.append(nid)
+            del remaining[nid]
+        for d in remaining.values():
+            d.difference_update(ready)
+    return order
+
+
+def _call_node(impl, ntype: str, cfg: Dict[str, Any], inputs: Dict[str, Any], ctx: Ctx):
+    ctx.cancel.check()
+    if ntype == "parse_pdf":
+        return impl(cfg, ctx)
+    if ntype in ("validate_with_pdf", "merge_xlsx", "export_xlsx"):
+        return impl(cfg, inputs, ctx)
+    if ntype in ("embed_pdf", "build_vectorstore"):
+        return (
+            impl(cfg, inputs, ctx)
+            if impl.__code__.co_argcount >= 3
+            else impl(cfg, inputs)
+        )
+    return impl(cfg)
+
+
+# ---------- 노드 실행 제한 (timeout / retry / 메모리·CPU 예산) ----------
+# 노드 config 로 선언(없으면 NODE_TIMEOUT_S / NODE_MAX_RETRIES / NODE_RETRY_BACKOFF_S):
+#   timeout_s        시도 1회 제한 시간(초)
+#   max_retries      실패 시 재시도 횟수(취소는 재시도하지 않음)
+#   retry_backoff_s  첫 재시도 전 대기(초), 이후 2배씩(최대 RETRY_BACKOFF_MAX_S)
+#   memory_mb        워커 프로세스 메모리 예산(MB, 기동 직후 주소 공간 + 예산 → RLIMIT_AS)
+#   cpu_s            워커 프로세스 CPU 시간 예산(초, RLIMIT_CPU)
+#   isolate          true 면 예산 없이도 전용 프로세스에서 실행
+#   timeout_grace_s  (스레드 실행) 시간 초과 후 시도가 멈추기를 기다리는 시간(초)
+# 예산/isolate 가 있으면 시도마다 전용 자식 프로세스에서 실행 → 시간 초과·취소 시 즉시 kill.
+# 없으면 스레드에서 실행하고, 시간 초과 시 시도 토큰을 취소(다음 페이지/배치 경계에서 중단)한 뒤
+# 그 스레드가 끝날 때까지 최대 timeout_grace_s 초 기다렸다가 실패 처리한다(실제 대기는 timeout_s + 최대 grace).
+# 그래도 끝나지 않은 시도가 있으면 재시도하지 않는다(같은 노드 두 벌이 동시에 돌며 같은 컬렉션/파일에 쓰는 것 방지).
+RETRY_BACKOFF_MAX_S = 30.0
+
+
+class NodeTimeout(Exception):
+    """노드 시도가 timeout_s 를 넘김. abandoned=True 면 시도 스레드가 아직 살아 있음(재시도 금지)."""
+
+    def __init__(self, message: str, abandoned: bool = False):
+        super().__init__(message)
+        self.abandoned = abandoned
+
+
+class NodeBudgetExceeded(Exception):
+    """노드 워커가 메모리/CPU 예산을 넘겨 중단됨."""
+
+
+@dataclass
+class NodeLimits:
+    timeout_s: float = 0.0
+    max_retries: int = 0
+    backoff_s: float = NODE_RETRY_BACKOFF_S
+    memory_mb: int = 0
+    cpu_s: float = 0.0
+    isolate: bool = False
+    grace_s: float = NODE_TIMEOUT_GRACE_S
+
+    @classmethod
+    def from_config(cls, cfg: Dict[str, Any]) -> "NodeLimits":
+        memory_mb = int(cfg.get("memory_mb") or 0)
+        cpu_s = float(cfg.get("cpu_s") or 0)
+        return cls(
+            timeout_s=float(cfg.get("timeout_s", NODE_TIMEOUT_S) or 0),
+            max_retries=max(0, int(cfg.get("max_retries", NODE_MAX_RETRIES) or 0)),
+            backoff_s=max(0.0, float(cfg.get("retry_backoff_s", NODE_RETRY_BACKOFF_S) or 0)),
+            memory_mb=memory_mb,
+            cpu_s=cpu_s,
+            isolate=bool(cfg.get("isolate")) or memory_mb > 0 or cpu_s > 0,
+            grace_s=max(0.0, float(cfg.get("timeout_grace_s", NODE_TIMEOUT_GRACE_S) or 0)),
+        )
+
+    def report(self, attempts: int, errors: List[str]) -> Dict[str, Any]:
+        """SUMMARY.detail.limits. 제한이 없고 1번에 성공했으면 빈 dict."""
+        d: Dict[str, Any] = {
+            k: v
+            for k, v in (
+                ("timeout_s", self.timeout_s),
+                ("max_retries", self.max_retries),
+                ("memory_mb", self.memory_mb),
+                ("cpu_s", self.cpu_s),
+            )
+            if v
+        }
+        if not d and not self.isolate and attempts == 1:
+            return {}
+        if self.timeout_s and not self.isolate:
+            d["timeout_grace_s"] = self.grace_s  # 스레드 실행: 시간 초과 후 최대 이만큼 더 기다림
+        d.update(isolated=self.isolate, attempts=attempts)
+        if errors:
+            d["errors"] = errors[-3:]
+        return d
+
+
+_mp_lock = threading.Lock()
+_mp_ctx = None
+
+
+def _mp_context():
+    """노드 워커용 multiprocessing 컨텍스트. forkserver(이 모듈 미리 import) → 시도당 기동 비용 최소화."""
+    global _mp_ctx
+    with _mp_lock:
+        if _mp_ctx is None:
+            import multiprocessing as mp
+
+            if "forkserver" in mp.get_all_start_methods():
+                _mp_ctx = mp.get_context("forkserver")
+                _mp_ctx.set_forkserver_preload([__name__])
+            else:
+                _mp_ctx = mp.get_context("spawn")
+        return _mp_ctx
+
+
+def _address_space_bytes() -> int:
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _limited_child(conn, ntype, cfg, inputs, ctx_args, memory_mb, cpu_s, profile_as=None):
+    """자식 프로세스: 예산(rlimit) 설정 후 노드 1회 실행 → (ok, 출력|예외, 사용량) 을 파이프로 전송."""
+    import resource
+
+    ru0 = resource.getrusage(resource.RUSAGE_SELF)
+
+    def usage() -> Dict[str, float]:
+        ru = resource.getrusage(resource.RUSAGE_SELF)
+        return {
+            "cpu_s": ru.ru_utime + ru.ru_stime - ru0.ru_utime - ru0.ru_stime,
+            "peak_rss_kb": max(0, ru.ru_maxrss - ru0.ru_maxrss),
+        }
+
+    try:
+
+        if memory_mb:
+            lim = _address_space_bytes() + memory_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (lim, lim))
+        if cpu_s:
+            ru = resource.getrusage(resource.RUSAGE_SELF)
+            soft = int(math.ceil(ru.ru_utime + ru.ru_stime + cpu_s))
+            resource.setrlimit(resource.RLIMIT_CPU, (soft, soft + 1))
+    except (ImportError, ValueError, OSError):
+        pass  # rlimit 미지원 플랫폼: 시간 제한/kill 만 적용
+    try:
+        with profiled(ctx_args[0], profile_as):
+            out = _call_node(NODE_IMPLS[ntype], ntype, cfg, inputs, Ctx(*ctx_args))
+        conn.send((True, out, usage()))
+    except MemoryError:
+        conn.send((False, NodeBudgetExceeded(f"memory budget exceeded ({memory_mb}MB)"), usage()))
+    except BaseException as e:
+        try:
+            conn.send((False, e, usage()))
+        except Exception:  # 직렬화 불가 예외
+            conn.send((False, RuntimeError(f"{e.__class__.__name__}: {e}"), usage()))
+    finally:
+        conn.close()
+
+
+def _worker_died(exitcode: Optional[int], lim: NodeLimits) -> Exception:
+    import signal
+
+    if lim.cpu_s and exitcode in (-signal.SIGXCPU, -signal.SIGKILL):
+        return NodeBudgetExceeded(f"cpu budget exceeded ({lim.cpu_s:g}s)")
+    if lim.memory_mb and exitcode == -signal.SIGKILL:
+        return NodeBudgetExceeded(f"worker killed (memory budget {lim.memory_mb}MB)")
+    return RuntimeError(f"node worker exited with code {exitcode}")
+
+
+def _run_isolated(
+    ntype: str,
+    cfg: Dict[str, Any],
+    inputs: Dict[str, Any],
+    ctx: Ctx,
+    lim: NodeLimits,
+    usage: Optional[Dict[str, float]] = None,
+    profile_as: Optional[str] = None,
+):
+    mp = _mp_context()
+    recv, send = mp.Pipe(duplex=False)
+    p = mp.Process(
+        target=_limited_child,
+        args=(
+            send,
+            ntype,
+            cfg,
+            inputs,
+            (ctx.run_id, ctx.storage, ctx.art_dir),
+            lim.memory_mb,
+            lim.cpu_s,
+            profile_as,
+        ),
+        name=f"node-{ntype}",
+        daemon=True,
+    )
+    p.start()
+    send.close()
+    deadline = time.monotonic() + lim.timeout_s if lim.timeout_s else None
+    try:
+        while True:
+            if recv.poll(0.05):  # 결과 도착 또는 자식 종료(EOF)
+                try:
+                    ok, payload, used = recv.recv()
+                except EOFError:
+                    p.join(1)
+                    raise _worker_died(p.exitcode, lim)
+                break
+            ctx.cancel.check()
+            if deadline is not None and time.monotonic() >= deadline:
+                raise NodeTimeout(f"{ntype} exceeded {lim.timeout_s:g}s")
+    finally:
+        recv.close()
+        if p.is_alive():
+            p.kill()
+        p.join(1)
+    _add_usage(usage, **used)
+    if ok:
+        return payload
+    raise payload
+
+
+def _run_with_deadline(call, ntype: str, ctx: Ctx, timeout_s: float, grace_s: float = NODE_TIMEOUT_GRACE_S):
+    box: Dict[str, Any] = {}
+    finished = threading.Event()
+
+    def target():
+        try:
+            box["out"] = call(ctx)
+        except BaseException as e:
+            box["err"] = e
+        finally:
+            finished.set()
+
+    threading.Thread(target=target, name=f"node-{ntype}", daemon=True).start()
+    deadline = time.monotonic() + timeout_s
+    while not finished.wait(0.05):
+        if ctx.cancel.parent is not None:
+            ctx.cancel.parent.check()
+        if time.monotonic() >= deadline:
+            ctx.cancel.cancel("timeout")
+            # 재시도가 이전 시도와 겹치지 않도록 취소 경계에서 끝날 때까지 기다림
+            stopped = finished.wait(grace_s) if grace_s > 0 else finished.is_set()
+            raise NodeTimeout(
+                f"{ntype} exceeded {timeout_s:g}s" + ("" if stopped else " (attempt still running)"),
+                abandoned=not stopped,
+            )
+    if "err" in box:
+        raise box["err"]
+    return box["out"]
+
+
+def _add_usage(usage: Optional[Dict[str, float]], cpu_s: float = 0.0, peak_rss_kb: float = 0):
+    if usage is not None:
+        usage["cpu_s"] = usage.get("cpu_s", 0.0) + cpu_s
+        usage["peak_rss_kb"] = max(usage.get("peak_rss_kb", 0), peak_rss_kb)
+
+
+def _thread_metered(call, usage: Optional[Dict[str, float]], profile_as: Optional[str] = None):
+    """call(ctx) 를 실행한 스레드의 CPU 시간을 usage 에 누적(profile_as 가 있으면 그 스레드를 프로파일링)."""
+
+    def run(c: Ctx):
+        cpu0 = time.thread_time()
+        try:
+            with profiled(c.run_id, profile_as):
+                return call(c)
+        finally:
+            _add_usage(usage, cpu_s=time.thread_time() - cpu0)
+
+    return run
+
+
+def run_limited(
+    ntype: str,
+    cfg: Dict[str, Any],
+    inputs: Dict[str, Any],
+    ctx: Ctx,
+    usage: Optional[Dict[str, float]] = None,
+    profile_as: Optional[str] = None,
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    노드 실행(제한 적용). (출력, SUMMARY 용 limits 보고) 반환.
+    최종 실패 시 마지막 예외에 .limits(보고) 를 붙여 그대로 올린다.
+    usage 를 넘기면 실제로 노드를 돌린 스레드/워커의 CPU 시간·최대 RSS 증가를 (모든 시도 합산) 기록.
+    profile_as(보통 노드 id)를 넘기면 시도마다 프로파일을 ART_DIR/profiles/{run_id}/ 에 저장.
+    """
+    from dataclasses import replace
+
+    lim = NodeLimits.from_config(cfg)
+    impl = NODE_IMPLS[ntype]
+    errors: List[str] = []
+    attempt = 0
+    while True:
+        attempt += 1
+        # 시도별 토큰: 시간 초과는 이 시도만, 실행 취소는 부모 토큰으로 전파
+        actx = replace(ctx, cancel=CancelToken(parent=ctx.cancel))
+        try:
+            call = _thread_metered(lambda c: _call_node(impl, ntype, cfg, inputs, c), usage, profile_as)
+            if lim.isolate:
+                out = _run_isolated(ntype, cfg, inputs, actx, lim, usage, profile_as)
+            elif lim.timeout_s:
+                out = _run_with_deadline(call, ntype, actx, lim.timeout_s, lim.grace_s)
+            else:
+                out = call(actx)
+            return out, lim.report(attempt, errors)
+        except RunCancelled:
+            raise
+        except Exception as e:
+            errors.append(f"{e.__class__.__name__}: {e}")
+            if isinstance(e, NodeTimeout):
+                NODE_TIMEOUTS.inc(type=ntype)
+            if attempt > lim.max_retries or getattr(e, "abandoned", False):
+                try:
+                    e.limits = lim.report(attempt, errors)
+                except AttributeError:
+                    pass
+                raise
+        NODE_RETRIES.inc(type=ntype)
+        if ctx.cancel.wait(min(lim.backoff_s * 2 ** (attempt - 1), RETRY_BACKOFF_MAX_S)):
+            ctx.cancel.check()
+
+
+# ---------- 노드 계측 (단조 시각, 소요/CPU 시간, 최대 RSS 증가, 처리량) ----------
+def _peak_rss_kb() -> int:
+    try:
+        import resource
+
+        return int(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)  # Linux: KB
+    except ImportError:
+        return 0
+
+
+def _items_for(ntype: str, out: Dict[str, Any]) -> Dict[str, int]:
+    """노드 출력 → 처리 항목 수(처리량 계산용)."""
+    if ntype == "parse_pdf":
+        return {"pages": int(out.get("pdf_pages", 0)), "chunks": len(out.get("pdf_chunks") or [])}
+    if ntype == "embed_pdf":
+        return {"chunks": int(out.get("vs_count", 0))}
+    if ntype == "merge_xlsx":
+        return {"rows": int(out.get("merged_rows", 0))}
+    if ntype == "validate_with_pdf":
+        return {"rows": len((out.get("validation_report") or {}).get("items") or [])}
+    return {}
+
+
+class NodeMeter:
+    """
+    노드 1회 실행 계측. 시작 시 생성 → finish() 가 SUMMARY.detail.metrics 를 만든다.
+    - mono_start/mono_end: time.monotonic() (같은 호스트의 프로세스 간 비교 가능)
+    - cpu_ms: 노드를 실제로 돌린 스레드/워커 프로세스의 CPU 시간(모든 시도 합), 메모 적중 시 조회 비용
+    - peak_rss_delta_kb: 프로세스 최대 RSS 증가(동시 실행 노드와 공유) 또는 워커 프로세스의 최대 RSS 증가
+    """
+
+    def __init__(self):
+        self.mono_start = time.monotonic()
+        self._cpu0 = time.thread_time()
+        self._rss0 = _peak_rss_kb()
+        self.usage: Dict[str, float] = {}  # run_limited(usage=...) 가 채움
+
+    def finish(
+        self, ntype: str, out: Optional[Dict[str, Any]] = None, outcome: str = "ok"
+    ) -> Dict[str, Any]:
+        end = time.monotonic()
+        dur = end - self.mono_start
+        NODE_SECONDS.observe(dur, type=ntype, outcome=outcome)
+        # 실제 실행 스레드/워커 사용량 우선. 없으면(메모 적중) 이 스레드의 조회 비용
+        cpu = self.usage["cpu_s"] if "cpu_s" in self.usage else time.thread_time() - self._cpu0
+        m: Dict[str, Any] = {
+            "mono_start": round(self.mono_start, 6),
+            "mono_end": round(end, 6),
+            "duration_ms": round(dur * 1000, 2),
+            "cpu_ms": round(cpu * 1000, 2),
+            "peak_rss_delta_kb": int(max(_peak_rss_kb() - self._rss0, self.usage.get("peak_rss_kb", 0))),
+        }
+        items = _items_for(ntype, out or {})
+        if items:
+            m["items"] = items
+            m["throughput"] = {
+                f"{k}_per_s": round(v / dur, 1) if dur > 0 else None for k, v in items.items()
+            }
+        return m
+
+
+def profile_label(ctx: Ctx, nid: str, cfg: Dict[str, Any]) -> Optional[str]:
+    """프로파일링 대상이면 파일 이름으로 쓸 노드 id, 아니면 None."""
+    return nid if ctx.profile or cfg.get("profile") else None
+
+
+def _limits_detail(report: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    return {"limits": report} if report else {}
+
+
+def _obs_for(ntype: str, out: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+    """노드 출력 → OBS (message, detail) 목록."""
+    if ntype == "parse_pdf":
+        return [
+            (
+                "PDF 청킹 완료",
+                {
+                    "chunks": len(out.get("pdf_chunks", [])),
+                    "pages": out.get("pdf_pages", 0),
+                },
+            )
+        ]
+    if ntype == "embed_pdf":
+        return [("임베딩/색인 완료", {"count": out.get("vs_count", 0)})]
+    if ntype == "merge_xlsx":
+        return [("XLSX 병합 완료", {"rows": out.get("merged_rows", 0)})]
+    if ntype == "validate_with_pdf":
+        report = out.get("validation_report", {})
+        s = report.get("summary", {})
+        detail = {
+            "ok": s.get("ok", 0),
+            "warn": s.get("warn", 0),
+            "fail": s.get("fail", 0),
+        }
+        if report.get("error"):
+            detail["error"] = report["error"]
+        return [("검증 요약", detail)]
+    if ntype == "export_xlsx":
+        return [
+            (
+                "산출물 경로",
+                {
+                    "artifact_id": out.get("artifact_id"),
+                    "reused": out.get("artifact_reused", False),
+                },
+            )
+        ]
+    return []
+
+
+def execute_stream(
+    workflow: Dict[str, Any], ctx: Ctx, max_workers: Optional[int] = None
+):
+    """
+    edges 로 위상 정렬한 뒤, 선행 노드가 모두 끝난 노드를 워커 풀에서 동시에 실행.
+    - ACTION: 제출 시점 / OBS·SUMMARY: 해당 노드 완료 시점 (nodeId 로 귀속)
+    - 전체 지연 = 노드 합이 아니라 임계 경로
+    - 타입/config/입력 지문/선행 키가 같으면 이전 실행 결과 재사용(SUMMARY.detail.cached)
+    """
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+    from dataclasses import replace
+
+    # 이 실행의 노드들이 보는 토큰. 한 노드가 실패하면 이것만 취소해 형제 노드를 멈춘다
+    # (실행 토큰은 그대로 → 실행 상태는 CANCELLED 가 아니라 FAILED). /cancel 은 parent 로 전파
+    ctx = replace(ctx, cancel=CancelToken(parent=ctx.cancel))
     outputs: Dict[str, Any] = {}
 
     def ev(
@@ -373,81 +1090,114 @@ def execute_stream(workflow: Dict[str, Any], ctx: Ctx):
             "ts": now_iso(),
         }
 
+    node_map = {n["id"]: n for n in workflow.get("nodes", [])}
+    order = topo_order(workflow)
+    deps = node_deps(workflow)
+
     yield ev(
         "PLAN",
         "plan",
-        f"총 {len(workflow.get('nodes', []))}개 노드 실행 계획 수립",
-        {"nodes": len(workflow.get("nodes", []))},
+        f"총 {len(node_map)}개 노드 실행 계획 수립",
+        {"nodes": len(node_map), "order": order},
     )
 
-    for node in workflow.get("nodes", []):
-        nid, ntype = node["id"], node["type"]
-        cfg = node.get("config", {}) or {}
-        yield ev("ACTION", nid, f"{nid}({ntype}) 시작")
-
-        impl = NODE_IMPLS.get(ntype)
-        if not impl:
+    for nid in order:
+        ntype = node_map[nid]["type"]
+        if ntype not in NODE_IMPLS:
             yield ev("SUMMARY", nid, f"{nid} 실패: no impl for {ntype}")
             raise RuntimeError(f"no impl for {ntype}")
 
+    done: set = set()
+    submitted: set = set()
+    keys: Dict[str, str] = {}  # 노드별 메모 키 (후행 노드 키에 포함)
+    limits: Dict[str, Dict[str, Any]] = {}  # 노드별 실행 제한 보고 (SUMMARY.detail.limits)
+    metrics: Dict[str, Dict[str, Any]] = {}  # 노드별 계측 (SUMMARY.detail.metrics)
+
+    def run_node(nid: str, ntype: str, cfg: Dict[str, Any], upstream: List[str], inputs: Dict[str, Any]):
+        meter = NodeMeter()
+        out, outcome = None, "error"
         try:
-            if ntype in ("validate_with_pdf",):
-                out = impl(cfg, {**outputs})
-            elif ntype in ("merge_xlsx", "export_xlsx"):
-                out = impl(cfg, {**outputs}, ctx)
-            elif ntype in ("embed_pdf", "build_vectorstore"):
-                out = (
-                    impl(cfg, {**outputs}, ctx)
-                    if impl.__code__.co_argcount >= 3
-                    else impl(cfg, {**outputs})
-                )
-            else:
-                out = impl(cfg)
+            res = run_memoized(ntype, cfg, upstream, lambda: call_limited(nid, ntype, cfg, inputs, meter.usage))
+            out, outcome = res[0], "ok"
+            return res
+        except RunCancelled:
+            outcome = "cancelled"
+            raise
+        finally:
+            metrics[nid] = meter.finish(ntype, out, outcome)
+
+    def call_limited(nid: str, ntype: str, cfg: Dict[str, Any], inputs: Dict[str, Any], usage):
+        out, limits[nid] = run_limited(ntype, cfg, inputs, ctx, usage, profile_label(ctx, nid, cfg))
+        return out
+
+    pool = ThreadPoolExecutor(max_workers=max_workers or NODE_WORKERS)
+    running: Dict[Any, str] = {}
+
+    def stop_running(reason: str):
+        # 남은 노드 중단: 토큰 취소 → 대기 중 future 취소 → 실행 중 노드가 경계에서 끝날 때까지 대기
+        ctx.cancel.cancel(reason)
+        pool.shutdown(wait=True, cancel_futures=True)
+        running.clear()
+
+    try:
+        while len(done) < len(order):
+            # 준비된 노드 제출 (선언 순서 유지)
+            ctx.cancel.check()
+            for nid in order:
+                if nid in submitted or any(d not in done for d in deps[nid]):
+                    continue
+                node = node_map[nid]
+                ntype = node["type"]
+                cfg = node.get("config", {}) or {}
+                yield ev("ACTION", nid, f"{nid}({ntype}) 시작", {"mono": round(time.monotonic(), 6)})
+                inputs = {**outputs}
+                fut = pool.submit(run_node, nid, ntype, cfg, [keys[d] for d in deps[nid]], inputs)
+                running[fut] = nid
+                submitted.add(nid)
+
+            finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for fut in sorted(finished, key=lambda f: order.index(running[f])):
+                nid = running.pop(fut)
+                ntype = node_map[nid]["type"]
+                try:
+                    out, keys[nid], cached = fut.result()
+                except RunCancelled as e:
+                    stop_running(str(e))
+                    yield ev("SUMMARY", nid, f"{nid} 취소", {"metrics": metrics.get(nid)})
+                    raise
+                except Exception as e:
+                    stop_running(f"{nid} 실패")
+                    yield ev(
+                        "SUMMARY",
+                        nid,
+                        f"{nid} 실패: {e.__class__.__name__}: {e}",
+                        {"metrics": metrics.get(nid), **_limits_detail(getattr(e, "limits", None))},
+                    )
+                    raise
+
+                for message, detail in _obs_for(ntype, out):
+                    yield ev("OBS", nid, message, detail)
+
+                for k, v in out.items():
+                    outputs[k] = v
+                    outputs[f"{nid}.{k}"] = v
+                done.add(nid)
 
-            # OBS 세분화
-            if ntype == "parse_pdf":
-                yield ev(
-                    "OBS",
-                    nid,
-                    "PDF 청킹 완료",
-                    {
-                        "chunks": len(out.get("pdf_chunks", [])),
-                        "pages": out.get("pdf_pages", 0),
-                    },
-                )
-            if ntype == "embed_pdf":
-                yield ev(
-                    "OBS", nid, "임베딩/색인 완료", {"count": out.get("vs_count", 0)}
-                )
-            if ntype == "merge_xlsx":
-                yield ev(
-                    "OBS", nid, "XLSX 병합 완료", {"rows": out.get("merged_rows", 0)}
-                )
-            if ntype == "validate_with_pdf":
-                s = out.get("validation_report", {}).get("summary", {})
                 yield ev(
-                    "OBS",
+                    "SUMMARY",
                     nid,
-                    "검증 요약",
+                    f"{nid} 완료" + (" (cached)" if cached else ""),
                     {
-                        "ok": s.get("ok", 0),
-                        "warn": s.get("warn", 0),
-                        "fail": s.get("fail", 0),
+                        "keys": list(out.keys()),
+                        "cached": cached,
+                        "metrics": metrics.get(nid),
+                        **_limits_detail(limits.get(nid)),
                     },
                 )
-            if ntype == "export_xlsx":
-                yield ev(
-                    "OBS", nid, "산출물 경로", {"artifact_id": out.get("artifact_id")}
-                )
-
-            for k, v in out.items():
-                outputs[k] = v
-                outputs[f"{nid}.{k}"] = v
-
-            yield ev("SUMMARY", nid, f"{nid} 완료", {"keys": list(out.keys())})
-        except Exception as e:
-            yield ev("SUMMARY", nid, f"{nid} 실패: {e.__class__.__name__}: {e}")
-            raise
+    finally:
+        if running:  # 루프 밖 취소·소비 중단으로 빠져나온 경우
+            stop_running("cancelled")
+        pool.shutdown(wait=False, cancel_futures=True)
 
     art = outputs.get("artifact_id") or outputs.get("export.artifact_id")
     yield ev("SUMMARY", "export", "산출물 생성", {"artifactId": art})
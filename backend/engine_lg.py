@@ -1,25 +1,35 @@
 from __future__ import annotations
+import json, sqlite3, hashlib, threading
+from collections import OrderedDict
 from typing import Dict, Any, List, TypedDict, Callable
 
-from langgraph.graph import StateGraph
+from langchain_core.runnables import RunnableConfig
+from langgraph.graph import StateGraph, START, END
 from langgraph.checkpoint.memory import MemorySaver
 
 # engine.py 에 정의된 실제 노드 구현들
 from .engine import (
     Ctx,
     now_iso,
-    node_parse_pdf,
-    node_embed_pdf_to_chroma,  # 임베딩 + Chroma 색인
-    node_merge_xlsx,
-    node_validate_with_pdf,
+    node_deps,
+    topo_order,
+    NodeMeter,
+    RunCancelled,
+    profile_label,
+    run_limited,  # 노드 구현 호출(timeout/retry/예산 적용)
     # export_xlsx 는 HITL 승인 후 main에서 실행하므로 LG 내부에선 건드리지 않음
 )
+from .memo import node_key, run_memoized
+from . import blobstore
+from .settings import LG_CHECKPOINT_DB, GRAPH_CACHE_SIZE
+from .metrics import GRAPH_CACHE
 
 
 # ---- LangGraph 상태 (체크포인트 친화: 경로/스칼라/소형 dict 위주) ----
+# 큰 중간값은 실행 전용 blob 저장소에 두고 핸들만 보관 → PDF 크기와 무관하게 체크포인트 크기 일정
 class LGState(TypedDict, total=False):
-    pdf_chunks: list  # [{page:int, text:str}, ...]
-    vs_ref: str  # "chroma://"
+    pdf_chunks_ref: dict  # blobstore 핸들 → [{page:int, text:str}, ...]
+    vs_ref: str  # "chroma://{내용별 컬렉션}"
     merged_path: str  # parquet/csv 경로
     validation_report: dict  # 검증 결과(요약)
     # artifact_id 는 LG 내에서는 만들지 않음 (HITL 승인 후 메인에서 export)
@@ -28,6 +38,37 @@ class LGState(TypedDict, total=False):
 EventSink = Callable[[Dict[str, Any]], None]
 
 
+# ---- 체크포인터: thread_id=run_id 로 노드 단위 상태를 SQLite 에 영속 (프로세스 재시작 후 재개) ----
+_saver = None
+_saver_lock = threading.Lock()
+
+
+def get_checkpointer():
+    global _saver
+    with _saver_lock:
+        if _saver is None:
+            try:
+                from langgraph.checkpoint.sqlite import SqliteSaver
+            except Exception:
+                # langgraph-checkpoint-sqlite 미설치: 프로세스 메모리에만 보관(재개는 같은 프로세스 내에서만)
+                _saver = MemorySaver()
+            else:
+                conn = sqlite3.connect(LG_CHECKPOINT_DB, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                _saver = SqliteSaver(conn)
+                _saver.setup()
+        return _saver
+
+
+def drop_checkpoints(run_id: str):
+    """성공 종료 등 더 이상 재개할 일이 없는 실행의 체크포인트(+실행 전용 blob) 삭제."""
+    try:
+        get_checkpointer().delete_thread(run_id)
+    except Exception:
+        pass
+    blobstore.drop_run(run_id)
+
+
 def _ev(_type: str, node_id: str, message: str, detail: Dict[str, Any] | None = None):
     return {
         "type": _type,
@@ -38,27 +79,82 @@ def _ev(_type: str, node_id: str, message: str, detail: Dict[str, Any] | None =
     }
 
 
-def build_langgraph(wf: Dict[str, Any], ctx: Ctx, on_event: EventSink | None = None):
+def memo_keys(wf: Dict[str, Any]) -> Dict[str, str]:
     """
-    Workflow(JSON) -> LangGraph.
+    노드별 메모 키 (후행 노드 키에 포함). 입력 파일 지문이 들어가므로 실행마다 계산하고,
+    체크포인트 재개 시 건너뛴 노드의 키도 필요하므로 미리 전부 계산해 둔다.
+    """
+    node_map = {n["id"]: n for n in wf.get("nodes", [])}
+    deps = node_deps(wf)
+    keys: Dict[str, str] = {}
+    for nid in topo_order(wf):
+        keys[nid] = node_key(
+            node_map[nid]["type"],
+            node_map[nid].get("config", {}) or {},
+            [keys[d] for d in deps[nid]],
+        )
+    return keys
+
+
+def build_langgraph(wf: Dict[str, Any]):
+    """
+    Workflow(JSON) -> 컴파일된 LangGraph.
+    실행별 값(ctx, on_event, memo_keys)은 invoke 시 config["configurable"] 로 주입 → 그래프 재사용 가능.
     ⚠️ 각 노드는 'delta(변경분) dict'만 return 해야 함 (전체 state 금지).
     """
     g = StateGraph(LGState)
     node_map: Dict[str, Dict[str, Any]] = {n["id"]: n for n in wf.get("nodes", [])}
-    edges: List[Dict[str, str]] = wf.get("edges", [])
+    deps = node_deps(wf)
 
     def add(nid: str):
         spec = node_map[nid]
         ntype = spec["type"]
         cfg = spec.get("config", {}) or {}
 
-        def run(state: LGState) -> LGState:
+        def run(state: LGState, config: RunnableConfig) -> LGState:
+            conf = config["configurable"]
+            ctx: Ctx = conf["ctx"]
+            on_event: EventSink | None = conf.get("on_event")
+            keys: Dict[str, str] = conf["memo_keys"]
+            ctx.cancel.check()
+            meter = NodeMeter()
             if on_event:
-                on_event(_ev("ACTION", nid, f"{nid}({ntype}) 시작"))
+                on_event(_ev("ACTION", nid, f"{nid}({ntype}) 시작", {"mono": round(meter.mono_start, 6)}))
+            upstream = [keys[d] for d in deps[nid] if d in keys]
+            cached = False
+            out: Dict[str, Any] = {}
+            limits: Dict[str, Any] = {}
+
+            def call(inputs: Dict[str, Any]) -> Dict[str, Any]:
+                try:
+                    res, report = run_limited(
+                        ntype, cfg, inputs, ctx, meter.usage, profile_label(ctx, nid, cfg)
+                    )
+                except RunCancelled:
+                    raise
+                except Exception as e:
+                    lim = getattr(e, "limits", None)
+                    if on_event:
+                        on_event(
+                            _ev(
+                                "SUMMARY",
+                                nid,
+                                f"{nid} 실패: {e.__class__.__name__}: {e}",
+                                {
+                                    "metrics": meter.finish(ntype, outcome="error"),
+                                    **({"limits": lim} if lim else {}),
+                                },
+                            )
+                        )
+                    raise
+                limits.update(report)
+                return res
 
             # ----- 각 노드별 실행 (delta만 리턴) -----
             if ntype == "parse_pdf":
-                out = node_parse_pdf(cfg)
+                out, keys[nid], cached = run_memoized(
+                    ntype, cfg, upstream, lambda: call({})
+                )
                 pdf_chunks = out.get("pdf_chunks", [])
                 if on_event:
                     on_event(
@@ -72,12 +168,22 @@ def build_langgraph(wf: Dict[str, Any], ctx: Ctx, on_event: EventSink | None = N
                             },
                         )
                     )
-                delta: LGState = {"pdf_chunks": pdf_chunks}
+                ref = blobstore.put(ctx.run_id, f"{nid}.pdf_chunks", pdf_chunks)
+                delta: LGState = {"pdf_chunks_ref": ref}
 
             elif ntype == "embed_pdf":
                 # 입력은 기존 state에서 읽기만 함 (수정 금지)
-                out = node_embed_pdf_to_chroma(
-                    cfg, {"parse_pdf.pdf_chunks": state.get("pdf_chunks", [])}
+                out, keys[nid], cached = run_memoized(
+                    ntype,
+                    cfg,
+                    upstream,
+                    lambda: call(
+                        {
+                            "parse_pdf.pdf_chunks": blobstore.get(
+                                state.get("pdf_chunks_ref"), []
+                            )
+                        }
+                    ),
                 )
                 if on_event:
                     on_event(
@@ -91,7 +197,9 @@ def build_langgraph(wf: Dict[str, Any], ctx: Ctx, on_event: EventSink | None = N
                 delta = {"vs_ref": out.get("vs_ref")}
 
             elif ntype == "merge_xlsx":
-                out = node_merge_xlsx(cfg, {}, ctx)
+                out, keys[nid], cached = run_memoized(
+                    ntype, cfg, upstream, lambda: call({})
+                )
                 if on_event:
                     on_event(
                         _ev(
@@ -105,8 +213,16 @@ def build_langgraph(wf: Dict[str, Any], ctx: Ctx, on_event: EventSink | None = N
 
             elif ntype == "validate_with_pdf":
                 # table_in 은 경로를 넘기면 engine 쪽이 DF 로딩
-                out = node_validate_with_pdf(
-                    cfg, {"merge_xlsx.merged_table": state.get("merged_path")}
+                out, keys[nid], cached = run_memoized(
+                    ntype,
+                    cfg,
+                    upstream,
+                    lambda: call(
+                        {
+                            "merge_xlsx.merged_table": state.get("merged_path"),
+                            "embed_pdf.vs_ref": state.get("vs_ref"),
+                        }
+                    ),
                 )
                 vr = out.get("validation_report", {})
                 if on_event:
@@ -158,57 +274,163 @@ def build_langgraph(wf: Dict[str, Any], ctx: Ctx, on_event: EventSink | None = N
                 raise RuntimeError(f"unsupported node: {ntype}")
 
             if on_event:
-                keys = list(delta.keys())
-                on_event(_ev("SUMMARY", nid, f"{nid} 완료", {"keys": keys}))
+                on_event(
+                    _ev(
+                        "SUMMARY",
+                        nid,
+                        f"{nid} 완료" + (" (cached)" if cached else ""),
+                        {
+                            "keys": list(delta.keys()),
+                            "cached": cached,
+                            "metrics": meter.finish(
+                                ntype, out, "deferred" if ntype == "export_xlsx" else "ok"
+                            ),
+                            **({"limits": limits} if limits else {}),
+                        },
+                    )
+                )
             return delta  # ✅ delta만 반환 (전체 state 금지)
 
         g.add_node(nid, run)
 
-    # 노드/엣지 등록
+    # 노드/엣지 등록: 선행 노드가 여럿이면 모두 끝난 뒤 실행(join), 루트는 START 에서 병렬 시작
     for n in wf.get("nodes", []):
         add(n["id"])
-    for e in edges:
-        g.add_edge(e["from"], e["to"])
+    for nid, preds in deps.items():
+        if not preds:
+            g.add_edge(START, nid)
+        elif len(preds) == 1:
+            g.add_edge(preds[0], nid)
+        else:
+            g.add_edge(preds, nid)
+    has_succ = {p for preds in deps.values() for p in preds}
+    for nid in deps:
+        if nid not in has_succ:
+            g.add_edge(nid, END)
+
+    app = g.compile(checkpointer=get_checkpointer())
+    return app
+
+
+# ---- 컴파일 그래프 캐시: nodes/edges 정규화 해시 → 컴파일 결과 (LRU) ----
+_graph_cache: "OrderedDict[str, Any]" = OrderedDict()
+_graph_cache_lock = threading.Lock()
+
+
+def graph_hash(wf: Dict[str, Any]) -> str:
+    """그래프 구조에 영향을 주는 필드만(id/type/config/in + edges) 정규화해 해시. 라벨/시각 등은 무시."""
+    canon = {
+        "nodes": sorted(
+            (
+                {
+                    "id": n["id"],
+                    "type": n.get("type"),
+                    "config": n.get("config") or {},
+                    "in": n.get("in") or [],
+                }
+                for n in wf.get("nodes", [])
+            ),
+            key=lambda n: n["id"],
+        ),
+        "edges": sorted(
+            [e.get("from"), e.get("to")] for e in wf.get("edges", [])
+        ),
+    }
+    raw = json.dumps(canon, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
 
-    # 시작/종료 지정
-    if wf.get("nodes"):
-        g.set_entry_point(wf["nodes"][0]["id"])
-        g.set_finish_point(wf["nodes"][-1]["id"])
 
-    app = g.compile(checkpointer=MemorySaver())
+def get_compiled_graph(wf: Dict[str, Any]):
+    h = graph_hash(wf)
+    with _graph_cache_lock:
+        app = _graph_cache.get(h)
+        if app is not None:
+            _graph_cache.move_to_end(h)
+            GRAPH_CACHE.inc(result="hit")
+            return app
+    GRAPH_CACHE.inc(result="miss")
+    app = build_langgraph(wf)
+    with _graph_cache_lock:
+        _graph_cache[h] = app
+        _graph_cache.move_to_end(h)
+        while len(_graph_cache) > GRAPH_CACHE_SIZE:
+            _graph_cache.popitem(last=False)
     return app
 
 
-def execute_stream_lg(wf: Dict[str, Any], ctx: Ctx):
+def execute_stream_lg(wf: Dict[str, Any], ctx: Ctx, resume: bool = False):
     """
     LangGraph 실행 → 이벤트 순차 방출.
     - PLAN 선방출
-    - MemorySaver가 요구하는 thread_id를 config로 지정
+    - thread_id=run_id 로 체크포인트 기록
+    - resume=True: 마지막 체크포인트에서 남은 노드만 실행 (성공한 노드는 다시 돌지 않음)
     """
     events: List[Dict[str, Any]] = []
 
     def sink(ev: Dict[str, Any]):
         events.append(ev)
 
-    # 계획 이벤트
-    sink(
-        _ev(
-            "PLAN",
-            "plan",
-            f"총 {len(wf.get('nodes', []))}개 노드 실행 계획 수립",
-            {"nodes": len(wf.get("nodes", []))},
-        )
-    )
-
-    app = build_langgraph(wf, ctx, on_event=sink)
+    app = get_compiled_graph(wf)
+    config = {
+        "configurable": {
+            "thread_id": ctx.run_id,
+            "ctx": ctx,
+            "on_event": sink,
+            "memo_keys": memo_keys(wf),
+        }
+    }
+    failed: Exception | None = None
+    try:
+        snap = app.get_state(config) if resume else None
 
-    # thread_id 필수
-    final_state: LGState = app.invoke(
-        {}, config={"configurable": {"thread_id": ctx.run_id}}
-    )  # type: ignore
+        if snap is not None and snap.created_at is not None:
+            pending = list(snap.next)
+            sink(
+                _ev(
+                    "PLAN",
+                    "plan",
+                    f"체크포인트에서 재개: 남은 노드 {len(pending)}개",
+                    {"nodes": len(wf.get("nodes", [])), "resume": True, "next": pending},
+                )
+            )
+            if pending:
+                app.invoke(None, config=config)
+            elif "validation_report" in (snap.values or {}):
+                # 그래프는 끝났고 HITL/export 단계에서 중단된 경우: 승인 대기부터 다시
+                vals = snap.values
+                sink(
+                    _ev(
+                        "OBS",
+                        "hitl",
+                        "STATE_CHECKPOINT",
+                        {
+                            "state": {
+                                "merged_path": vals.get("merged_path"),
+                                "validation_report": vals.get("validation_report"),
+                            }
+                        },
+                    )
+                )
+                sink(_ev("OBS", "hitl", "HITL_SIGNAL", {"state": "WAITING"}))
+        else:
+            # 계획 이벤트
+            sink(
+                _ev(
+                    "PLAN",
+                    "plan",
+                    f"총 {len(wf.get('nodes', []))}개 노드 실행 계획 수립",
+                    {"nodes": len(wf.get("nodes", []))},
+                )
+            )
+            app.invoke({}, config=config)
+    except Exception as e:
+        # 실패 노드의 SUMMARY(limits 포함)까지 방출한 뒤 다시 올린다
+        failed = e
 
     # (여기서는 추가 STATE_CHECKPOINT 불필요 — validate 시점에서 이미 방출)
 
     # 순서대로 방출
     for ev in events:
         yield ev
+    if failed is not None:
+        raise failed
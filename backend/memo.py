@@ -0,0 +1,174 @@
+from __future__ import annotations
+import os, json, shutil, hashlib, logging, threading
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+from .settings import MEMO_DIR, MEMO_ENABLED
+from .metrics import NODE_CACHE
+
+log = logging.getLogger(__name__)
+
+# 노드 구현이 바뀌어 이전 결과를 무효화해야 하면 올린다
+MEMO_VERSION = "1"
+
+# 실행별 산출물이 필요한 노드(export: art_id 별칭)는 메모하지 않음
+NON_MEMOIZABLE = {"export_xlsx", "build_vectorstore"}
+
+# 실행 방식만 바꾸는 config 키(결과에 영향 없음): 키 계산에서 제외
+LIMIT_KEYS = ("timeout_s", "max_retries", "retry_backoff_s", "memory_mb", "cpu_s", "isolate")
+EXEC_ONLY_KEYS = LIMIT_KEYS + ("profile",)
+
+
+# ---------- 키 계산 ----------
+def _fingerprint(v: Any) -> Any:
+    """config 값 정규화. 존재하는 파일 경로는 (경로, 크기, mtime) 으로 치환해 내용 변경을 반영."""
+    if isinstance(v, str) and v and os.path.isfile(v):
+        st = os.stat(v)
+        return {"path": v, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    if isinstance(v, dict):
+        return {str(k): _fingerprint(x) for k, x in sorted(v.items())}
+    if isinstance(v, (list, tuple)):
+        return [_fingerprint(x) for x in v]
+    return v
+
+
+def node_key(ntype: str, cfg: Dict[str, Any], upstream_keys: List[str]) -> str:
+    """
+    노드 타입 + 정규화 config(입력 파일 지문 포함) + 선행 노드 키 → sha256.
+    선행 노드의 출력 내용 대신 키를 잇는다: 노드 출력은 (타입, config, 입력)으로 정해지므로
+    키가 같으면 출력도 같다(외부 상태를 남기는 노드는 _SIDE_EFFECT_PROBES 로 따로 확인).
+    """
+    payload = {
+        "v": MEMO_VERSION,
+        "type": ntype,
+        "config": _fingerprint({k: v for k, v in (cfg or {}).items() if k not in EXEC_ONLY_KEYS}),
+        "upstream": list(upstream_keys),
+    }
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def is_memoizable(ntype: str, cfg: Dict[str, Any]) -> bool:
+    return MEMO_ENABLED and ntype not in NON_MEMOIZABLE and cfg.get("memo", True)
+
+
+# ---------- 부수효과 확인 ----------
+def _chroma_state(out: Dict[str, Any]) -> Any:
+    from .vectorstore import collection_state, ref_collection
+
+    return collection_state(ref_collection(out.get("vs_ref")))
+
+
+# 외부 상태에 결과를 남기는 노드: 저장 시점 상태와 조회 시점 상태가 같아야 캐시 적중 (probe(출력))
+_SIDE_EFFECT_PROBES: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "embed_pdf": _chroma_state,
+}
+
+
+# ---------- 저장/조회 (값은 파일 단위 참조로 보관) ----------
+def _entry_dir(key: str) -> str:
+    return os.path.join(MEMO_DIR, key[:2], key)
+
+
+def _dump_values(out: Dict[str, Any], d: str) -> Dict[str, Any]:
+    import pandas as pd
+
+    refs: Dict[str, Any] = {}
+    for i, (k, v) in enumerate(out.items()):
+        if isinstance(v, pd.DataFrame):
+            fn = f"v{i}.parquet"
+            try:
+                v.to_parquet(os.path.join(d, fn), index=False)
+                refs[k] = {"kind": "frame", "file": fn}
+            except (ValueError, TypeError, ImportError):
+                # 부서별 시트 병합처럼 한 컬럼에 숫자/문자가 섞이면 Arrow 변환 실패 → pickle.
+                # (문자열로 바꾸면 캐시 적중 시 셀 타입이 달라져 export 결과가 바뀌므로 원본 타입 그대로)
+                fn = f"v{i}.pkl"
+                v.to_pickle(os.path.join(d, fn))
+                refs[k] = {"kind": "pickle", "file": fn}
+        else:
+            fn = f"v{i}.json"
+            with open(os.path.join(d, fn), "w", encoding="utf-8") as f:
+                json.dump(v, f, ensure_ascii=False)
+            refs[k] = {"kind": "json", "file": fn}
+    return refs
+
+
+def _load_values(refs: Dict[str, Any], d: str) -> Dict[str, Any]:
+    import pandas as pd
+
+    out: Dict[str, Any] = {}
+    for k, ref in refs.items():
+        p = os.path.join(d, ref["file"])
+        if ref["kind"] == "frame":
+            out[k] = pd.read_parquet(p)
+        elif ref["kind"] == "pickle":
+            out[k] = pd.read_pickle(p)
+        else:
+            with open(p, "r", encoding="utf-8") as f:
+                out[k] = json.load(f)
+    return out
+
+
+def lookup(key: str, ntype: str) -> Optional[Dict[str, Any]]:
+    d = _entry_dir(key)
+    mpath = os.path.join(d, "manifest.json")
+    if not os.path.exists(mpath):
+        return None
+    try:
+        with open(mpath, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        out = _load_values(manifest.get("values", {}), d)
+        probe = _SIDE_EFFECT_PROBES.get(ntype)
+        if probe and manifest.get("side_effect") != probe(out):
+            return None
+    except Exception:
+        log.warning("memo lookup failed for %s (%s)", ntype, key[:12], exc_info=True)
+        return None
+    # 경로 출력(merged_path 등)이 정리되었으면 무효
+    for k, v in out.items():
+        if k.endswith("_path") and isinstance(v, str) and not os.path.exists(v):
+            return None
+    return out
+
+
+def store(key: str, ntype: str, out: Dict[str, Any]):
+    d = _entry_dir(key)
+    if os.path.exists(os.path.join(d, "manifest.json")):
+        return
+    tmp = f"{d}.tmp-{os.getpid()}-{threading.get_ident()}"
+    os.makedirs(tmp, exist_ok=True)
+    try:
+        manifest = {"type": ntype, "values": _dump_values(out, tmp)}
+        probe = _SIDE_EFFECT_PROBES.get(ntype)
+        if probe:
+            manifest["side_effect"] = probe(out)
+        with open(os.path.join(tmp, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        if os.path.exists(d):  # 이전 실패/무효 항목 교체
+            shutil.rmtree(d, ignore_errors=True)
+        os.replace(tmp, d)
+    except Exception:
+        # 직렬화 불가 값 등: 메모만 포기하고 실행 결과는 그대로 사용
+        NODE_CACHE.inc(type=ntype, result="store_error")
+        log.warning("memo store failed for %s (%s)", ntype, key[:12], exc_info=True)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def run_memoized(
+    ntype: str,
+    cfg: Dict[str, Any],
+    upstream_keys: List[str],
+    fn: Callable[[], Dict[str, Any]],
+) -> Tuple[Dict[str, Any], str, bool]:
+    """(출력, 키, 캐시적중 여부). 메모 불가 노드는 항상 fn() 실행."""
+    key = node_key(ntype, cfg, upstream_keys)
+    if not is_memoizable(ntype, cfg):
+        return fn(), key, False
+    hit = lookup(key, ntype)
+    NODE_CACHE.inc(type=ntype, result="hit" if hit is not None else "miss")
+    if hit is not None:
+        return hit, key, True
+    out = fn()
+    store(key, ntype, out)
+    return out, key, False
@@ -0,0 +1,224 @@
+from __future__ import annotations
+import bisect, math, threading, time
+from contextlib import contextmanager
+from typing import Dict, List, Tuple, Callable, Optional, Iterable
+
+# Prometheus 텍스트 포맷(0.0.4) 최소 구현 — 외부 의존성 없이 /metrics 노출.
+# 핫패스 비용: 라벨 튜플 조회 + 잠금 1회. 수집 시점 값(큐 길이 등)은 Gauge 콜백으로 읽는다.
+PREFIX = "agentic_"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 노드/외부 호출 지연용 기본 버킷(초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+LabelKey = Tuple[str, ...]
+
+
+def _escape(v: str) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt(v: float) -> str:
+    if v == math.inf:
+        return "+Inf"
+    if float(v).is_integer():
+        return str(int(v))
+    return repr(float(v))
+
+
+def _labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = PREFIX + name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelKey:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        head = f"# HELP {self.name} {self.help}\n# TYPE {self.name} {self.kind}\n"
+        return head + "".join(line + "\n" for line in self.samples())
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelKey, float] = {} if self.labelnames else {(): 0.0}
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, k)} {_fmt(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    """set/inc/dec 또는 fn(수집 시점 콜백, 라벨 없음)."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Iterable[str] = (),
+        fn: Optional[Callable[[], float]] = None,
+    ):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[LabelKey, float] = {} if self.labelnames else {(): 0.0}
+        self.fn = fn
+
+    def set(self, value: float, **labels: str):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1, **labels: str):
+        self.inc(-amount, **labels)
+
+    def samples(self) -> List[str]:
+        if self.fn is not None:
+            try:
+                return [f"{self.name} {_fmt(float(self.fn()))}"]
+            except Exception:
+                return []
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_labels(self.labelnames, k)} {_fmt(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 라벨별 [버킷별 개수(누적 아님)..., +Inf], 합계
+        self._counts: Dict[LabelKey, List[int]] = {}
+        self._sums: Dict[LabelKey, float] = {}
+        if not self.labelnames:
+            self._counts[()] = [0] * (len(self.buckets) + 1)
+            self._sums[()] = 0.0
+
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+            counts[i] += 1
+            self._sums[key] = self._sums.get(key, 0.0) + value
+
+    @contextmanager
+    def time(self, **labels: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, **labels)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = [(k, list(c), self._sums[k]) for k, c in self._counts.items()]
+        out: List[str] = []
+        for key, counts, total in items:
+            acc = 0
+            for bound, c in zip(self.buckets + (math.inf,), counts):
+                acc += c
+                le = f'le="{_fmt(bound)}"'
+                out.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {acc}")
+            out.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_fmt(total)}")
+            out.append(f"{self.name}_count{_labels(self.labelnames, key)} {acc}")
+        return out
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        return "".join(m.render() for m in list(self._metrics.values()))
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, help: str, labelnames: Iterable[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, help, labelnames))
+
+
+def gauge(
+    name: str,
+    help: str,
+    labelnames: Iterable[str] = (),
+    fn: Optional[Callable[[], float]] = None,
+) -> Gauge:
+    return REGISTRY.register(Gauge(name, help, labelnames, fn))
+
+
+def histogram(
+    name: str,
+    help: str,
+    labelnames: Iterable[str] = (),
+    buckets: Iterable[float] = DEFAULT_BUCKETS,
+) -> Histogram:
+    return REGISTRY.register(Histogram(name, help, labelnames, buckets))
+
+
+# ---------- 공용 지표 (계측 지점: engine / engine_lg / vectorstore / app) ----------
+# 실행/대기열 (app)
+RUNS_STARTED = counter("runs_started_total", "Runs admitted to execution", ["engine"])
+RUNS_FINISHED = counter("runs_finished_total", "Runs reaching a terminal state", ["status"])
+RUNS_WAITING_HITL = gauge("runs_waiting_hitl", "Runs paused at the HITL approval step")
+SSE_EVENTS = counter("sse_events_total", "Events published to run channels", ["type"])
+# 노드 (engine, engine_lg)
+NODE_SECONDS = histogram(
+    "node_duration_seconds", "Node wall time including memo lookup", ["type", "outcome"]
+)
+NODE_CACHE = counter("node_memo_total", "Node memo lookups by result", ["type", "result"])
+NODE_RETRIES = counter("node_retries_total", "Node attempts retried after a failure", ["type"])
+NODE_TIMEOUTS = counter("node_timeouts_total", "Node attempts killed or abandoned on timeout", ["type"])
+GRAPH_CACHE = counter("graph_cache_total", "Compiled LangGraph cache lookups by result", ["result"])
+# 임베딩/벡터 검색 (vectorstore)
+EMBED_REQUESTS = counter("embed_requests_total", "Embedding API calls", ["outcome"])
+EMBED_TEXTS = counter("embed_texts_total", "Texts sent for embedding")
+EMBED_TOKENS = counter("embed_tokens_total", "Tokens billed by the embedding API")
+EMBED_SECONDS = histogram("embed_request_seconds", "Embedding API call latency")
+CHROMA_SECONDS = histogram("chroma_op_seconds", "Chroma operation latency (excluding embedding)", ["op"])
@@ -0,0 +1,103 @@
+from __future__ import annotations
+import os, json, threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from .settings import RUN_DIR
+
+# 축약된 이벤트의 원본 detail/message 를 이벤트 로그 옆에 한 번만 기록(out-of-band).
+#   RUN_DIR/{run_id}.payloads/{payload_id}.json  = {"message": ..., "detail": ...}
+# 이벤트에는 __compact__.payloadId 만 실리고, 원본은 GET /runs/{id}/payloads/{pid} 로 요청 시에만 읽는다.
+_CACHE_MAX = 4  # 최근 읽은 payload (같은 payload 의 페이지를 연달아 읽는 경우)
+_cache: "OrderedDict[Tuple[str, float], Any]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def _safe(name: str) -> str:
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
+
+
+def payload_dir(run_id: str) -> str:
+    return os.path.join(RUN_DIR, f"{_safe(run_id)}.payloads")
+
+
+def payload_path(run_id: str, payload_id: str) -> str:
+    return os.path.join(payload_dir(run_id), f"{_safe(payload_id)}.json")
+
+
+def put(run_id: str, payload_id: str, value: Any) -> None:
+    """원본 저장(같은 id 면 덮어씀: 재개 시 같은 seq)."""
+    os.makedirs(payload_dir(run_id), exist_ok=True)
+    path = payload_path(run_id, payload_id)
+    tmp = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(value, f, ensure_ascii=False, default=str)
+    os.replace(tmp, path)
+
+
+def load(run_id: str, payload_id: str) -> Optional[Any]:
+    path = payload_path(run_id, payload_id)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    key = (path, mtime)
+    with _lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    with open(path, "r", encoding="utf-8") as f:
+        value = json.load(f)
+    with _lock:
+        _cache[key] = value
+        while len(_cache) > _CACHE_MAX:
+            _cache.popitem(last=False)
+    return value
+
+
+def resolve(value: Any, path: str) -> Tuple[bool, Any]:
+    """'detail.state.pdf_chunks' / 'detail.items.3' 같은 경로. (찾았는지, 값)."""
+    cur = value
+    for part in [p for p in (path or "").split(".") if p]:
+        if isinstance(cur, dict) and part in cur:
+            cur = cur[part]
+        elif isinstance(cur, list) and part.lstrip("-").isdigit() and -len(cur) <= int(part) < len(cur):
+            cur = cur[int(part)]
+        else:
+            return False, None
+    return True, cur
+
+
+def paginate(value: Any, path: str, offset: int, limit: int) -> Dict[str, Any]:
+    """
+    path 가 배열이면 [offset, offset+limit) 페이지.
+    그 외에는 값 전체를 주되, 안쪽의 limit 보다 긴 배열은 앞쪽 limit 개로 자르고
+    pages[경로] = {total, nextOffset} 로 이어 받을 위치를 알려준다.
+    """
+    if isinstance(value, list):
+        end = offset + limit
+        return {
+            "path": path,
+            "total": len(value),
+            "offset": offset,
+            "limit": limit,
+            "items": value[offset:end],
+            "nextOffset": end if end < len(value) else None,
+        }
+    pages: Dict[str, Dict[str, Any]] = {}
+
+    def cut(v: Any, p: str) -> Any:
+        if isinstance(v, dict):
+            return {k: cut(x, f"{p}.{k}" if p else str(k)) for k, x in v.items()}
+        if isinstance(v, list):
+            if len(v) > limit:
+                pages[p] = {"total": len(v), "nextOffset": limit}
+                v = v[:limit]
+            return [cut(x, f"{p}.{i}") for i, x in enumerate(v)]
+        return v
+
+    out: Dict[str, Any] = {"path": path, "value": cut(value, path)}
+    if pages:
+        out["pages"] = pages
+    return out
+
@@ -0,0 +1,116 @@
+from __future__ import annotations
+import os, io, sys, cProfile, pstats, threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
+
+from .settings import ART_DIR, PROFILE_SAMPLE_MS
+
+# 실행별 프로파일: ART_DIR/profiles/{run_id}/{node}.{pstats|txt|collapsed}
+#   .pstats    : cProfile 원본 (python -m pstats / snakeviz 로 열기)
+#   .txt       : 누적 시간 상위 함수 요약
+#   .collapsed : 샘플링 스택(“a;b;c 개수”) → flamegraph.pl / speedscope 입력
+PROFILE_KINDS = {
+    ".pstats": "application/octet-stream",
+    ".txt": "text/plain; charset=utf-8",
+    ".collapsed": "text/plain; charset=utf-8",
+}
+
+
+def _safe(name: str) -> str:
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
+
+
+def profile_dir(run_id: str) -> str:
+    return os.path.join(ART_DIR, "profiles", _safe(run_id))
+
+
+class _StackSampler(threading.Thread):
+    """대상 스레드의 스택을 주기적으로 샘플링해 collapsed 스택별 횟수를 센다."""
+
+    def __init__(self, thread_id: int, interval_s: float):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.thread_id = thread_id
+        self.interval_s = interval_s
+        self.counts: Counter = Counter()
+        self._halt = threading.Event()
+
+    def run(self):
+        while not self._halt.wait(self.interval_s):
+            frame = sys._current_frames().get(self.thread_id)
+            stack: List[str] = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.counts[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._halt.set()
+        self.join(1)
+
+
+def _next_name(d: str, label: str) -> str:
+    """재시도 등으로 같은 노드가 여러 번 돌면 node, node.2, node.3 …"""
+    base = _safe(label)
+    name, n = base, 1
+    while os.path.exists(os.path.join(d, f"{name}.pstats")):
+        n += 1
+        name = f"{base}.{n}"
+    return name
+
+
+@contextmanager
+def profiled(run_id: str, label: Optional[str]):
+    """label 이 있으면 현재 스레드에서 도는 블록을 cProfile + 스택 샘플링으로 기록."""
+    if not label:
+        yield
+        return
+    prof = cProfile.Profile()
+    sampler = _StackSampler(threading.get_ident(), max(PROFILE_SAMPLE_MS, 1) / 1000)
+    sampler.start()
+    prof.enable()
+    try:
+        yield
+    finally:
+        prof.disable()
+        sampler.stop()
+        try:
+            _save(run_id, label, prof, sampler.counts)
+        except OSError:
+            pass  # 프로파일 저장 실패가 노드 결과를 바꾸지 않도록
+
+
+def _save(run_id: str, label: str, prof: cProfile.Profile, counts: Counter):
+    d = profile_dir(run_id)
+    os.makedirs(d, exist_ok=True)
+    name = _next_name(d, label)
+    base = os.path.join(d, name)
+    prof.dump_stats(f"{base}.pstats")
+    buf = io.StringIO()
+    pstats.Stats(prof, stream=buf).sort_stats("cumulative").print_stats(40)
+    with open(f"{base}.txt", "w", encoding="utf-8") as f:
+        f.write(buf.getvalue())
+    with open(f"{base}.collapsed", "w", encoding="utf-8") as f:
+        for stack, n in counts.most_common():
+            f.write(f"{stack} {n}\n")
+
+
+def list_profiles(run_id: str) -> List[Dict[str, Any]]:
+    d = profile_dir(run_id)
+    if not os.path.isdir(d):
+        return []
+    out = []
+    for fn in sorted(os.listdir(d)):
+        stem, ext = os.path.splitext(fn)
+        if ext in PROFILE_KINDS:
+            out.append({"name": fn, "node": stem, "kind": ext[1:], "bytes": os.path.getsize(os.path.join(d, fn))})
+    return out
+
+
+def profile_path(run_id: str, name: str) -> Optional[str]:
+    if os.path.basename(name) != name or os.path.splitext(name)[1] not in PROFILE_KINDS:
+        return None
+    path = os.path.join(profile_dir(run_id), name)
+    return path if os.path.exists(path) else None
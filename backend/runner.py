@@ -0,0 +1,254 @@
+from __future__ import annotations
+import os, json, asyncio
+from bisect import bisect_right
+from collections import deque
+from typing import (
+    Dict, Any, List, Callable, Awaitable, AsyncIterator, Deque, Optional, Set, Tuple,
+)
+
+from .settings import RUN_DIR, RUN_RETAIN_S, SUBSCRIBER_QUEUE_MAX
+from .wire import coalesced_frame, render, sse_frame
+
+
+def event_log_path(run_id: str) -> str:
+    return os.path.join(RUN_DIR, f"{run_id}.events.jsonl")
+
+
+def read_event_log(run_id: str, after_seq: int = 0) -> List[Dict[str, Any]]:
+    """append-only 이벤트 로그에서 seq > after_seq 인 이벤트(압축본)를 순서대로 반환."""
+    path = event_log_path(run_id)
+    if not os.path.exists(path):
+        return []
+    out: List[Dict[str, Any]] = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                ev = json.loads(line)
+            except ValueError:
+                continue  # 기록 도중 중단된 마지막 줄
+            if int(ev.get("seq", 0)) > after_seq:
+                out.append(ev)
+    return out
+
+
+def is_droppable(ev: Dict[str, Any]) -> bool:
+    """느린 구독자에게서 생략 가능한 중간 진행 이벤트인지 (PLAN/SUMMARY/HITL/export/종료는 항상 전달)."""
+    return (
+        ev.get("type") in ("ACTION", "OBS")
+        and ev.get("nodeId") not in ("hitl", "export")
+        and bool(ev.get("has_more", True))
+    )
+
+
+class Subscriber:
+    """
+    구독자 1명의 고정 크기 큐.
+    가득 차면 중간 진행 이벤트는 같은 노드의 최신 것으로 병합하거나 버리고,
+    필수 이벤트조차 넣을 수 없으면 overflow → 구독 종료(클라이언트는 Last-Event-ID 로 재접속해 재생).
+    발행자는 절대 기다리지 않는다.
+    """
+
+    def __init__(self, maxsize: int = SUBSCRIBER_QUEUE_MAX):
+        self.maxsize = max(1, maxsize)
+        # (이벤트, 채널 로그 인덱스) — 프레임은 구독자의 전송 형식으로 꺼낼 때 고른다
+        self.buf: Deque[Tuple[Dict[str, Any], int]] = deque()
+        self.dropped = 0
+        self.overflowed = False
+        self._wake = asyncio.Event()
+
+    def offer(self, ev: Dict[str, Any], idx: int):
+        if len(self.buf) < self.maxsize:
+            self.buf.append((ev, idx))
+            self._wake.set()
+            return
+        if is_droppable(ev):
+            # 같은 노드의 대기 중인 진행 이벤트를 빼고 최신 것을 맨 뒤에 넣음(병합), 없으면 버림
+            # → 구독자에게 나가는 seq(SSE id)는 항상 증가: Last-Event-ID 재접속 시 필수 이벤트 누락 없음
+            for i in range(len(self.buf) - 1, -1, -1):
+                q = self.buf[i][0]
+                if is_droppable(q) and q.get("nodeId") == ev.get("nodeId"):
+                    del self.buf[i]
+                    self.buf.append((ev, idx))
+                    self._wake.set()
+                    break
+            self.dropped += 1
+            return
+        # 필수 이벤트: 가장 오래된 진행 이벤트를 밀어내고 자리 확보
+        for i, (q, _) in enumerate(self.buf):
+            if is_droppable(q):
+                del self.buf[i]
+                self.buf.append((ev, idx))
+                self.dropped += 1
+                self._wake.set()
+                return
+        self.overflowed = True
+        self._wake.set()
+
+    def wake(self):
+        self._wake.set()
+
+    async def wait(self):
+        await self._wake.wait()
+        self._wake.clear()
+
+
+class RunChannel:
+    """
+    실행 1건의 이벤트 로그 + 구독자 팬아웃.
+    - 실행 태스크가 publish → RUN_DIR/{run_id}.events.jsonl 에 append 후 메모리에도 보관
+    - 직렬화는 이벤트당 1번(로그 줄과 SSE 프레임 공유, compact.encode_event 가 만든 bytes 를 그대로 사용),
+      구독자에게는 프레임 참조만 전달. msgpack 프레임은 처음 요청될 때 한 번 만들어 공유
+    - 압축(gzip/deflate)은 구독자 스트림마다 따로(앞 이벤트가 사전 역할을 하므로 공유 불가) — app 에서 적용
+    - subscribe(after_seq): 구독 시점까지는 공유 로그에서 재생, 이후는 구독자별 고정 크기 큐
+    - 구독자가 없어도/끊겨도/느려도 실행은 계속된다
+    """
+
+    def __init__(self, run_id: str):
+        self.run_id = run_id
+        # 재개된 실행이면 기존 로그를 이어서 사용
+        self.events: List[Dict[str, Any]] = read_event_log(run_id)
+        self.frames: List[bytes] = [sse_frame(e) for e in self.events]
+        self._packed: List[Optional[bytes]] = [None] * len(self.events)
+        self._seqs: List[int] = [int(e.get("seq", 0)) for e in self.events]
+        self._subs: Set[Subscriber] = set()
+        self.closed = False
+        self._log = open(event_log_path(run_id), "ab")
+
+    @property
+    def last_seq(self) -> int:
+        return self._seqs[-1] if self._seqs else 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subs)
+
+    async def publish(self, ev: Dict[str, Any], data: Optional[bytes] = None):
+        """ev: 축약본, data: 그 JSON(UTF-8). data 를 주면 다시 직렬화하지 않는다."""
+        if data is None:
+            data = json.dumps(ev, ensure_ascii=False).encode("utf-8")
+        self._log.write(data + b"\n")
+        self._log.flush()
+        frame = sse_frame(ev, data)
+        self.events.append(ev)
+        self.frames.append(frame)
+        self._packed.append(None)
+        self._seqs.append(int(ev.get("seq", 0)))
+        idx = len(self.events) - 1
+        for sub in self._subs:
+            sub.offer(ev, idx)
+
+    def frame(self, idx: int, fmt: str = "sse") -> bytes:
+        if fmt != "msgpack":
+            return self.frames[idx]
+        packed = self._packed[idx]
+        if packed is None:
+            packed = self._packed[idx] = render(fmt, self.events[idx])
+        return packed
+
+    async def close(self):
+        self.closed = True
+        for sub in self._subs:
+            sub.wake()
+        self._log.close()
+
+    async def subscribe(self, after_seq: int = 0, fmt: str = "sse") -> AsyncIterator[bytes]:
+        """프레임(bytes, fmt: sse|msgpack) 스트림. 생략된 진행 이벤트 수는 id 없는 'coalesced' 이벤트로 알린다."""
+        sub = Subscriber()
+        start = bisect_right(self._seqs, after_seq)
+        end = len(self.frames)
+        # 스냅숏 경계와 등록 사이에 await 가 없으므로 누락/중복 없음
+        self._subs.add(sub)
+        try:
+            for i in range(start, end):
+                yield self.frame(i, fmt)
+            while True:
+                while sub.buf:
+                    ev, idx = sub.buf.popleft()
+                    if sub.dropped:
+                        n, sub.dropped = sub.dropped, 0
+                        yield coalesced_frame(fmt, n)
+                    # 아직 발생하지 않은 seq 로 재접속한 경우까지 고려
+                    if int(ev.get("seq", 0)) > after_seq:
+                        yield self.frame(idx, fmt)
+                if sub.overflowed or self.closed:
+                    return
+                await sub.wait()
+        finally:
+            self._subs.discard(sub)
+
+
+RunFn = Callable[[str, RunChannel], Awaitable[None]]
+
+
+class RunManager:
+    """
+    프로세스 내 실행 태스크 관리.
+    /pipeline/execute 가 submit → 태스크 생성(동시 실행 상한/대기열은 admission 이 담당).
+    같은 run_id 는 동시에 한 번만 실행된다(여러 탭이 열어도 중복 실행 없음, 끝난 뒤 재개는 가능).
+    """
+
+    def __init__(self):
+        self.channels: Dict[str, RunChannel] = {}
+        self.tasks: Dict[str, asyncio.Task] = {}
+        # HITL 결정 등 외부 신호: run_id → asyncio.Event (폴링 없이 즉시 깨움)
+        self._signals: Dict[str, asyncio.Event] = {}
+
+    def channel(self, run_id: str) -> Optional[RunChannel]:
+        return self.channels.get(run_id)
+
+    def is_active(self, run_id: str) -> bool:
+        t = self.tasks.get(run_id)
+        return t is not None and not t.done()
+
+    def submit(self, run_id: str, fn: RunFn) -> RunChannel:
+        if self.is_active(run_id):
+            return self.channels[run_id]
+        ch = self.channels.get(run_id)
+        if ch is None or ch.closed:
+            # 처음 실행 또는 끝난 실행의 재개: 기존 로그를 이어 쓰는 새 채널
+            ch = self.channels[run_id] = RunChannel(run_id)
+        self.tasks[run_id] = asyncio.create_task(self._run(run_id, ch, fn))
+        return ch
+
+    async def _run(self, run_id: str, ch: RunChannel, fn: RunFn):
+        try:
+            await fn(run_id, ch)
+        finally:
+            self._signals.pop(run_id, None)
+            await ch.close()
+            # 종료 후 재접속 구독자를 위해 잠시 보관 후 해제
+            asyncio.get_running_loop().call_later(RUN_RETAIN_S, self._evict, run_id)
+
+    # ---------- 실행 신호 ----------
+    def arm(self, run_id: str):
+        """신호 대기 준비. 상태를 '대기'로 저장하기 전에 호출해야 그 사이 도착한 신호를 잃지 않는다."""
+        self._signals[run_id] = asyncio.Event()
+
+    def notify(self, run_id: str) -> bool:
+        """같은 프로세스에서 대기 중인 실행을 깨운다. 대기자가 없으면 False."""
+        ev = self._signals.get(run_id)
+        if ev is None:
+            return False
+        ev.set()
+        return True
+
+    async def wait_signal(self, run_id: str, timeout: Optional[float] = None) -> bool:
+        """신호를 받으면 True, timeout 이 지나면 False."""
+        ev = self._signals.setdefault(run_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(ev.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        ev.clear()
+        return True
+
+    def _evict(self, run_id: str):
+        if not self.is_active(run_id):
+            self.tasks.pop(run_id, None)
+            self.channels.pop(run_id, None)
+
+
+runs = RunManager()
@@ -0,0 +1,225 @@
+from __future__ import annotations
+import os, json, glob, sqlite3, threading, time
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+
+from .settings import RUN_DB, RUN_DIR, RUN_STALE_S
+
+# API 필드(camelCase) ↔ 컬럼
+_COLUMNS = {
+    "runId": "run_id",
+    "status": "status",
+    "engine": "engine",
+    "workflowId": "workflow_id",
+    "startedAt": "started_at",
+    "endedAt": "ended_at",
+    "artifactId": "artifact_id",
+    "checkpoint": "checkpoint",
+    "workflow": "workflow",
+    "user": "user_id",
+    "priority": "priority",
+    "metrics": "metrics",
+}
+# JSON 으로 직렬화해 보관하는 필드
+_JSON_FIELDS = {"checkpoint", "workflow", "metrics"}
+# 목록 조회에 싣는 필드(무거운 workflow 본문 제외)
+_SUMMARY_FIELDS = [
+    "runId", "status", "engine", "workflowId", "startedAt", "endedAt", "artifactId", "user", "priority",
+]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id      TEXT PRIMARY KEY,
+    status      TEXT NOT NULL,
+    engine      TEXT,
+    workflow_id TEXT,
+    started_at  TEXT,
+    ended_at    TEXT,
+    artifact_id TEXT,
+    checkpoint  TEXT,
+    workflow    TEXT,
+    user_id     TEXT,
+    priority    INTEGER,
+    metrics     TEXT,
+    heartbeat_at REAL,
+    updated_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_status_started ON runs(status, started_at DESC, run_id DESC);
+CREATE INDEX IF NOT EXISTS runs_started ON runs(started_at DESC, run_id DESC);
+"""
+# 기존 DB 에 없으면 추가할 컬럼 (스키마 확장 이력)
+_ADDED_COLUMNS = {"user_id": "TEXT", "priority": "INTEGER", "metrics": "TEXT", "heartbeat_at": "REAL"}
+
+
+class RunStore:
+    """
+    실행 레코드 저장소 (SQLite, WAL).
+    - 상태 변경은 해당 컬럼만 UPDATE (workflow 본문은 생성 시 1번만 기록)
+    - transition(): 현재 상태 조건부 UPDATE 로 원자적 전이 (동시 승인/거부 중 하나만 반영)
+    - heartbeat_at: 실행을 가진 워커가 주기적으로 갱신. 끊긴 지 RUN_STALE_S 가 지난 실행만
+      다른 워커가 가져간다(transition(stale_from=...) / claim(), 같은 UPDATE 안에서 확인)
+    - 상태/시작시각 인덱스로 목록 조회(keyset 페이지네이션)
+    모든 쓰기는 단일 문장(autocommit)이라 그 자체로 원자적이다.
+    연결은 스레드별로 하나씩 연다(FastAPI 스레드풀 + 실행 워커 스레드).
+    """
+
+    def __init__(self, path: str = RUN_DB, legacy_dir: Optional[str] = RUN_DIR):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        fresh = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name='runs'"
+        ).fetchone() is None
+        conn.executescript(_SCHEMA)
+        have = {r["name"] for r in conn.execute("PRAGMA table_info(runs)")}
+        for col, typ in _ADDED_COLUMNS.items():
+            if col not in have:
+                conn.execute(f"ALTER TABLE runs ADD COLUMN {col} {typ}")
+        if fresh and legacy_dir:
+            self._import_legacy(legacy_dir)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ---------- 변환 ----------
+    @staticmethod
+    def _to_row(fields: Dict[str, Any]) -> Dict[str, Any]:
+        row: Dict[str, Any] = {}
+        for k, v in fields.items():
+            col = _COLUMNS.get(k)
+            if col is None:
+                raise KeyError(f"unknown run field: {k}")
+            row[col] = json.dumps(v, ensure_ascii=False) if k in _JSON_FIELDS and v is not None else v
+        return row
+
+    @staticmethod
+    def _from_row(row: sqlite3.Row) -> Dict[str, Any]:
+        out: Dict[str, Any] = {}
+        keys = row.keys()
+        for k, col in _COLUMNS.items():
+            if col not in keys:
+                continue
+            v = row[col]
+            out[k] = json.loads(v) if k in _JSON_FIELDS and v is not None else v
+        return out
+
+    # ---------- CRUD ----------
+    def create(self, run: Dict[str, Any]):
+        run = dict(run)
+        if "workflowId" not in run:
+            run["workflowId"] = (run.get("workflow") or {}).get("id")
+        row = self._to_row({k: v for k, v in run.items() if k in _COLUMNS})
+        row["updated_at"] = row["heartbeat_at"] = time.time()
+        cols = ", ".join(row)
+        marks = ", ".join("?" for _ in row)
+        self._conn().execute(f"INSERT OR REPLACE INTO runs ({cols}) VALUES ({marks})", list(row.values()))
+
+    def get(self, run_id: str, with_workflow: bool = True) -> Optional[Dict[str, Any]]:
+        cols = "*" if with_workflow else ", ".join(_COLUMNS[f] for f in _SUMMARY_FIELDS + ["checkpoint"])
+        row = self._conn().execute(f"SELECT {cols} FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return self._from_row(row) if row else None
+
+    def get_status(self, run_id: str) -> Optional[str]:
+        row = self._conn().execute("SELECT status FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return row["status"] if row else None
+
+    def exists(self, run_id: str) -> bool:
+        return self.get_status(run_id) is not None
+
+    def update(self, run_id: str, **fields: Any) -> bool:
+        """지정 필드만 갱신."""
+        return self._update(run_id, fields, None)
+
+    def transition(
+        self, run_id: str, to: str, from_: Iterable[str], stale_from: Iterable[str] = (), **fields: Any
+    ) -> bool:
+        """
+        현재 상태가 from_ 중 하나이거나, stale_from 중 하나이면서 하트비트가 RUN_STALE_S 넘게 끊겼을 때만
+        to 로 전이(+필드 갱신). 전이했으면 True. stale_from 을 주면 같은 UPDATE 로 하트비트도 갱신(소유권 획득).
+        """
+        return self._update(run_id, dict(fields, status=to), tuple(from_), tuple(stale_from))
+
+    def claim(self, run_id: str, stale_from: Iterable[str]) -> bool:
+        """상태는 그대로 두고, stale_from 상태이면서 하트비트가 끊긴 실행의 소유권만 가져온다."""
+        return self._update(run_id, {}, (), tuple(stale_from))
+
+    def heartbeat(self, run_id: str) -> bool:
+        cur = self._conn().execute("UPDATE runs SET heartbeat_at = ? WHERE run_id = ?", (time.time(), run_id))
+        return cur.rowcount > 0
+
+    def _update(
+        self,
+        run_id: str,
+        fields: Dict[str, Any],
+        from_: Optional[Tuple[str, ...]],
+        stale_from: Tuple[str, ...] = (),
+    ) -> bool:
+        row = self._to_row(fields)
+        now = time.time()
+        row["updated_at"] = now
+        if stale_from:
+            row["heartbeat_at"] = now
+        sets = ", ".join(f"{c} = ?" for c in row)
+        sql = f"UPDATE runs SET {sets} WHERE run_id = ?"
+        args: List[Any] = list(row.values()) + [run_id]
+        if from_ is not None:
+            conds: List[str] = []
+            if from_:
+                conds.append(f"status IN ({', '.join('?' for _ in from_)})")
+                args += list(from_)
+            if stale_from:
+                conds.append(
+                    f"(status IN ({', '.join('?' for _ in stale_from)}) AND COALESCE(heartbeat_at, 0) < ?)"
+                )
+                args += list(stale_from) + [now - RUN_STALE_S]
+            sql += f" AND ({' OR '.join(conds) or '0'})"
+        return self._conn().execute(sql, args).rowcount > 0
+
+    def list_runs(
+        self,
+        status: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """최신순 목록. cursor 는 직전 페이지 마지막 항목의 'startedAt|runId'. (항목들, 다음 cursor)"""
+        cols = ", ".join(_COLUMNS[f] for f in _SUMMARY_FIELDS)
+        where: List[str] = []
+        args: List[Any] = []
+        if status:
+            where.append("status = ?")
+            args.append(status)
+        if cursor:
+            started, _, rid = cursor.partition("|")
+            where.append("(started_at, run_id) < (?, ?)")
+            args += [started, rid]
+        sql = f"SELECT {cols} FROM runs"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY started_at DESC, run_id DESC LIMIT ?"
+        args.append(limit + 1)
+        rows = self._conn().execute(sql, args).fetchall()
+        items = [self._from_row(r) for r in rows[:limit]]
+        nxt = None
+        if len(rows) > limit and items:
+            nxt = f"{items[-1]['startedAt']}|{items[-1]['runId']}"
+        return items, nxt
+
+    # ---------- 기존 JSON 파일 이관 ----------
+    def _import_legacy(self, legacy_dir: str):
+        for p in glob.glob(os.path.join(legacy_dir, "*.json")):
+            try:
+                with open(p, "r", encoding="utf-8") as f:
+                    run = json.load(f)
+            except Exception:
+                continue
+            if isinstance(run, dict) and run.get("runId") and run.get("status"):
+                self.create(run)
+
+
+run_store = RunStore()
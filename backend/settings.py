@@ -47,10 +47,69 @@ WF_DIR: str = (Path(STORAGE) / "workflows").as_posix()
 RUN_DIR: str = (Path(STORAGE) / "runs").as_posix()
 ART_DIR: str = (Path(STORAGE) / "artifacts").as_posix()
 TMP_DIR: str = (Path(STORAGE) / "tmp").as_posix()
+MEMO_DIR: str = (Path(TMP_DIR) / "memo").as_posix()
+# 실행 전용 중간값(blob) 저장소: LangGraph state 에는 핸들만 싣는다
+RUN_BLOB_DIR: str = (Path(TMP_DIR) / "runs").as_posix()
+# 실행 레코드 DB (SQLite, WAL)
+RUN_DB: str = os.getenv("RUN_DB", (Path(STORAGE) / "runs.sqlite3").as_posix())
+# LangGraph 체크포인트 DB (thread_id=run_id, 실패/재시작 후 /runs/{id}/resume 으로 이어서 실행)
+LG_CHECKPOINT_DB: str = os.getenv(
+    "LG_CHECKPOINT_DB", (Path(STORAGE) / "checkpoints.sqlite3").as_posix()
+)
 
 # ── Vector DB (Chroma) ─────────────────────────────────────────────────────────
 CHROMA_DIR: str = (Path(ROOT) / "chroma").as_posix()
 CHROMA_COLLECTION: str = os.getenv("CHROMA_COLLECTION", "budget_pdf")
+# 내용별 컬렉션({CHROMA_COLLECTION}-{해시}) 보관 개수. 넘으면 새로 만들 때 오래된 것부터 삭제, 0 이면 무제한(계속 쌓임)
+CHROMA_MAX_COLLECTIONS: int = int(os.getenv("CHROMA_MAX_COLLECTIONS", "0"))
+
+# ── Export ─────────────────────────────────────────────────────────────────────
+# stream: openpyxl write-only 모드로 배치 단위 기록(상수 메모리) / pandas: 기존 ExcelWriter
+EXPORT_WRITER: str = os.getenv("EXPORT_WRITER", "stream")
+EXPORT_BATCH_ROWS: int = int(os.getenv("EXPORT_BATCH_ROWS", "5000"))
+# xlsx 외 즉시 생성할 포맷(쉼표 구분: parquet,csv). 미지정 포맷은 다운로드 요청 시 지연 생성
+EXPORT_FORMATS: list[str] = [
+    f.strip() for f in os.getenv("EXPORT_FORMATS", "").split(",") if f.strip()
+]
+
+# ── Engine ─────────────────────────────────────────────────────────────────────
+# DAG 실행기에서 동시에 실행할 수 있는 노드 수(독립 분기 병렬화)
+NODE_WORKERS: int = int(os.getenv("NODE_WORKERS", "4"))
+# 컴파일된 LangGraph 캐시 크기(같은 nodes/edges 면 재컴파일 없이 재사용)
+GRAPH_CACHE_SIZE: int = int(os.getenv("GRAPH_CACHE_SIZE", "32"))
+# 임베딩 요청 배치 크기(배치 사이마다 취소 확인)
+EMBED_BATCH: int = int(os.getenv("EMBED_BATCH", "64"))
+# 노드 실행 제한 기본값(노드 config 의 timeout_s / max_retries / retry_backoff_s 가 우선). 0 이면 제한 없음
+NODE_TIMEOUT_S: float = float(os.getenv("NODE_TIMEOUT_S", "0"))
+NODE_MAX_RETRIES: int = int(os.getenv("NODE_MAX_RETRIES", "0"))
+NODE_RETRY_BACKOFF_S: float = float(os.getenv("NODE_RETRY_BACKOFF_S", "1.0"))
+# 스레드 실행 노드가 시간 초과된 뒤 취소 경계에서 멈추기를 기다리는 시간(초). 0 이면 즉시 실패(멈추지 않은 시도는 재시도 안 함)
+NODE_TIMEOUT_GRACE_S: float = float(os.getenv("NODE_TIMEOUT_GRACE_S", "10"))
+# 프로파일링(실행/노드 opt-in) 시 스택 샘플링 주기(ms)
+PROFILE_SAMPLE_MS: float = float(os.getenv("PROFILE_SAMPLE_MS", "5"))
+# 노드 결과 메모이제이션(타입+config+입력 지문+선행 키가 같으면 재사용)
+MEMO_ENABLED: bool = os.getenv("MEMO_ENABLED", "1") == "1"
+# 동시 실행 상한(전체) / 종료된 실행의 이벤트 보관 시간(초)
+RUN_WORKERS: int = int(os.getenv("RUN_WORKERS", "4"))
+RUN_RETAIN_S: float = float(os.getenv("RUN_RETAIN_S", "600"))
+# 사용자별 동시 실행 상한 / 대기열 정책(fifo | priority)
+RUN_USER_MAX: int = int(os.getenv("RUN_USER_MAX", "2"))
+RUN_QUEUE_POLICY: str = os.getenv("RUN_QUEUE_POLICY", "fifo").lower()
+# 실행을 가진 워커의 하트비트 주기(초) / 하트비트가 이만큼 끊긴 실행만 다른 워커가 재개·재등록(다중 워커)
+RUN_HEARTBEAT_S: float = float(os.getenv("RUN_HEARTBEAT_S", "10"))
+RUN_STALE_S: float = float(os.getenv("RUN_STALE_S", "30"))
+# HITL 대기 중 다른 워커 프로세스의 승인 반영 주기(초). 같은 프로세스는 즉시 깨어남, 0 이면 확인 안 함
+HITL_FALLBACK_S: float = float(os.getenv("HITL_FALLBACK_S", "5"))
+# SSE 구독자별 대기 이벤트 상한. 넘치면 중간 진행 이벤트를 병합/생략(느린 클라이언트가 실행을 막지 않음)
+SUBSCRIBER_QUEUE_MAX: int = int(os.getenv("SUBSCRIBER_QUEUE_MAX", "256"))
+# SSE 시연용 이벤트 간 지연(초). 0 이면 즉시 방출
+EVENT_PACING_S: float = float(os.getenv("EVENT_PACING_S", "0.8"))
+# 축약된 이벤트의 원본(detail/message)을 RUN_DIR/{run_id}.payloads/ 에 따로 저장하고 이벤트엔 payloadId 만 싣기
+EVENT_PAYLOADS: bool = os.getenv("EVENT_PAYLOADS", "1") == "1"
+# SSE 스트림 압축 후보(우선순위 순, Accept-Encoding 으로 협상). 빈 값이면 압축 안 함
+SSE_ENCODINGS: list[str] = [
+    e.strip().lower() for e in os.getenv("SSE_ENCODINGS", "gzip,deflate").split(",") if e.strip()
+]
 
 # ── Misc ───────────────────────────────────────────────────────────────────────
 APP_VERSION: str = "0.5.1-poc"
@@ -63,4 +122,6 @@ Path(WF_DIR).mkdir(parents=True, exist_ok=True)
 Path(RUN_DIR).mkdir(parents=True, exist_ok=True)
 Path(ART_DIR).mkdir(parents=True, exist_ok=True)
 Path(TMP_DIR).mkdir(parents=True, exist_ok=True)
+Path(MEMO_DIR).mkdir(parents=True, exist_ok=True)
+Path(RUN_BLOB_DIR).mkdir(parents=True, exist_ok=True)
 Path(CHROMA_DIR).mkdir(parents=True, exist_ok=True)
@@ -1,7 +1,7 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import List, Dict, Any, Iterable
-import uuid
+from typing import List, Dict, Any, Iterable, Optional
+import hashlib, threading, time
 
 import chromadb
 from chromadb.config import Settings
@@ -13,6 +13,7 @@ from .settings import (
     CHROMA_DIR,
     CHROMA_COLLECTION,
 )
+from .metrics import EMBED_REQUESTS, EMBED_TEXTS, EMBED_TOKENS, EMBED_SECONDS, CHROMA_SECONDS
 
 
 @dataclass
@@ -32,29 +33,117 @@ class OpenAIEmbedder:
     def embed(self, texts: List[str]) -> List[List[float]]:
         if not texts:
             return []
-        resp = self.client.embeddings.create(model=self.model, input=texts)
+        t0 = time.perf_counter()
+        try:
+            resp = self.client.embeddings.create(model=self.model, input=texts)
+        except Exception:
+            EMBED_REQUESTS.inc(outcome="error")
+            raise
+        finally:
+            EMBED_SECONDS.observe(time.perf_counter() - t0)
+        EMBED_REQUESTS.inc(outcome="ok")
+        EMBED_TEXTS.inc(len(texts))
+        tokens = getattr(getattr(resp, "usage", None), "total_tokens", None)
+        if tokens:
+            EMBED_TOKENS.inc(tokens)
         # OpenAI Python SDK v1 returns data[].embedding
         return [d.embedding for d in resp.data]
 
 
+# ---------- 프로세스 공용 클라이언트 / 내용별 컬렉션 ----------
+# PersistentClient 는 프로세스당 1개만 연다(실행마다 새로 열면 동시 실행에서 tenant/바인딩 초기화가 서로 깨짐).
+# 컬렉션은 PDF 청크 내용 + 임베딩 모델 해시별로 따로 두므로 동시 실행이 서로의 벡터를 지우지 않는다.
+REF_PREFIX = "chroma://"
+_client = None
+_client_lock = threading.Lock()
+_build_locks: Dict[str, threading.Lock] = {}
+
+
+def get_client():
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = chromadb.PersistentClient(
+                path=CHROMA_DIR, settings=Settings(anonymized_telemetry=False)
+            )
+        return _client
+
+
+def build_lock(name: str) -> threading.Lock:
+    """같은 컬렉션을 만드는 실행끼리 직렬화(다른 PDF 는 서로 기다리지 않음)."""
+    with _client_lock:
+        return _build_locks.setdefault(name, threading.Lock())
+
+
+def collection_for(docs: List["VSDoc"], embedder: Any) -> str:
+    h = hashlib.sha256(f"{type(embedder).__name__}:{getattr(embedder, 'model', '')}".encode("utf-8"))
+    for d in docs:
+        h.update(b"\0" + d.id.encode("utf-8") + b"\0" + str(d.metadata.get("page")).encode() + b"\0")
+        h.update(d.text.encode("utf-8"))
+    return f"{CHROMA_COLLECTION}-{h.hexdigest()[:16]}"
+
+
+def ref_collection(vs_ref: Any) -> Optional[str]:
+    """
+    'chroma://{컬렉션}' → 컬렉션 이름. 이름이 없으면(청크 없음, 호환용 더미) None.
+    기본 컬렉션으로 대체하지 않는다(아무도 쓰지 않는 빈/옛 컬렉션을 조회하게 되므로).
+    """
+    if isinstance(vs_ref, str) and vs_ref.startswith(REF_PREFIX) and vs_ref[len(REF_PREFIX):]:
+        return vs_ref[len(REF_PREFIX):]
+    return None
+
+
+def prune_collections(keep: int, protect: Iterable[str] = ()) -> List[str]:
+    """
+    내용별 컬렉션이 keep 개를 넘으면 먼저 만든 것부터 삭제하고 삭제한 이름을 반환(keep<=0 이면 아무것도 안 함).
+    protect 와 빌드 중인 컬렉션은 건너뛴다. 삭제된 컬렉션을 쓰던 메모 항목은 다음 조회에서 무효화된다.
+    """
+    if keep <= 0:
+        return []
+    client = get_client()
+    prefix = f"{CHROMA_COLLECTION}-"
+    cols = [c for c in client.list_collections() if c.name.startswith(prefix)]
+    excess = len(cols) - keep
+    if excess <= 0:
+        return []
+    skip = set(protect)
+    removed: List[str] = []
+    for c in sorted(cols, key=lambda c: float((c.metadata or {}).get("created_at", 0))):
+        if excess <= 0:
+            break
+        if c.name in skip or build_lock(c.name).locked():
+            continue
+        try:
+            client.delete_collection(c.name)
+        except Exception:
+            continue
+        removed.append(c.name)
+        excess -= 1
+    return removed
+
+
 class ChromaVS:
-    def __init__(self):
-        self.client = chromadb.PersistentClient(
-            path=CHROMA_DIR, settings=Settings(anonymized_telemetry=False)
-        )
+    def __init__(self, collection: Optional[str] = None):
+        self.client = get_client()
+        self.name = collection or CHROMA_COLLECTION
         self.collection = self.client.get_or_create_collection(
-            name=CHROMA_COLLECTION, metadata={"hnsw:space": "cosine"}
+            name=self.name, metadata={"hnsw:space": "cosine"}
         )
         self.embedder = OpenAIEmbedder(OPENAI_API_KEY, OPENAI_EMBED_MODEL)
 
+    def use(self, name: str):
+        self.name = name
+        # created_at: prune_collections 의 삭제 순서(이미 있는 컬렉션이면 무시됨)
+        self.collection = self.client.get_or_create_collection(
+            name=name, metadata={"hnsw:space": "cosine", "created_at": time.time()}
+        )
+
     def reset(self):
         try:
-            self.client.delete_collection(CHROMA_COLLECTION)
+            self.client.delete_collection(self.name)
         except Exception:
             pass
-        self.collection = self.client.get_or_create_collection(
-            name=CHROMA_COLLECTION, metadata={"hnsw:space": "cosine"}
-        )
+        self.use(self.name)
 
     def upsert(self, docs: Iterable[VSDoc]):
         docs = list(docs)
@@ -64,13 +153,15 @@ class ChromaVS:
         texts = [d.text for d in docs]
         metas = [d.metadata for d in docs]
         embeds = self.embedder.embed(texts)
-        self.collection.upsert(
-            ids=ids, documents=texts, metadatas=metas, embeddings=embeds
-        )
+        with CHROMA_SECONDS.time(op="upsert"):
+            self.collection.upsert(
+                ids=ids, documents=texts, metadatas=metas, embeddings=embeds
+            )
 
     def query(self, query_text: str, k: int = 3) -> List[Dict[str, Any]]:
         embeds = self.embedder.embed([query_text])[0]
-        res = self.collection.query(query_embeddings=[embeds], n_results=k)
+        with CHROMA_SECONDS.time(op="query"):
+            res = self.collection.query(query_embeddings=[embeds], n_results=k)
         out = []
         for i in range(len(res["ids"][0])):
             out.append(
@@ -84,5 +175,12 @@ class ChromaVS:
         return out
 
 
-def new_id(prefix: str = "doc") -> str:
-    return f"{prefix}-{uuid.uuid4().hex[:12]}"
+def collection_state(name: Optional[str]) -> List[Any] | None:
+    """컬렉션 식별자/문서 수. reset(삭제→재생성) 또는 upsert 시 값이 바뀐다. 없으면 None."""
+    if not name:
+        return None
+    try:
+        col = get_client().get_collection(name)
+    except Exception:
+        return None
+    return [str(col.id), col.count()]
@@ -0,0 +1,102 @@
+from __future__ import annotations
+import json, struct, zlib
+from typing import Any, Dict, Optional, Tuple
+
+import ormsgpack
+
+from .settings import SSE_ENCODINGS
+
+# /runs/{id}/events 전송 형식
+#   sse     : text/event-stream (기본, EventSource 호환)
+#   msgpack : application/x-msgpack — [4바이트 big-endian 길이][MessagePack {"id","event","data"}] 반복
+#             (fetch + ReadableStream 클라이언트용, SSE 의 id/event/data 필드를 그대로 옮김)
+# 콘텐츠 인코딩(gzip/deflate)은 두 형식 모두에 적용 가능. 이벤트마다 Z_SYNC_FLUSH 로 바로 내보낸다.
+STREAM_FORMATS = {"sse": "text/event-stream", "msgpack": "application/x-msgpack"}
+COMPRESS_LEVEL = 6
+_WBITS = {"gzip": 31, "deflate": 15}  # HTTP deflate = zlib 포맷
+_MSGPACK_OPTS = ormsgpack.OPT_NON_STR_KEYS
+
+
+def sse_frame(cev: Dict[str, Any], data: Optional[bytes] = None) -> bytes:
+    """SSE 프레임. id 는 seq → 브라우저가 재접속 시 Last-Event-ID 로 돌려준다."""
+    if data is None:
+        data = json.dumps(cev, ensure_ascii=False).encode("utf-8")
+    return b"id: %s\nevent: message\ndata: %s\n\n" % (str(cev.get("seq")).encode(), data)
+
+
+def msgpack_frame(cev: Dict[str, Any], event: str = "message") -> bytes:
+    body = ormsgpack.packb(
+        {"id": cev.get("seq"), "event": event, "data": cev}, default=str, option=_MSGPACK_OPTS
+    )
+    return struct.pack(">I", len(body)) + body
+
+
+def coalesced_frame(fmt: str, dropped: int) -> bytes:
+    """느린 구독자에게서 생략된 진행 이벤트 수 통지(id 없음)."""
+    if fmt == "msgpack":
+        body = ormsgpack.packb({"id": None, "event": "coalesced", "data": {"dropped": dropped}})
+        return struct.pack(">I", len(body)) + body
+    return f"event: coalesced\ndata: {json.dumps({'dropped': dropped})}\n\n".encode("utf-8")
+
+
+def render(fmt: str, cev: Dict[str, Any], data: Optional[bytes] = None) -> bytes:
+    return msgpack_frame(cev) if fmt == "msgpack" else sse_frame(cev, data)
+
+
+def _accepted(header: str) -> Dict[str, float]:
+    """Accept-Encoding → {코딩: q}."""
+    out: Dict[str, float] = {}
+    for part in (header or "").split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for p in params.split(";"):
+            k, _, v = p.strip().partition("=")
+            if k.strip().lower() == "q":
+                try:
+                    q = float(v)
+                except ValueError:
+                    q = 0.0
+        out[name] = q
+    return out
+
+
+def negotiate(
+    accept: Optional[str], accept_encoding: Optional[str], fmt: Optional[str] = None, encoding: Optional[str] = None
+) -> Tuple[str, str]:
+    """
+    (형식, 콘텐츠 인코딩). ?format= / ?encoding= 가 헤더보다 우선.
+    형식: Accept 에 application/x-msgpack 이 있으면 msgpack, 아니면 sse.
+    인코딩: SSE_ENCODINGS 순서대로 Accept-Encoding 에서 q>0 인 첫 번째, 없으면 identity.
+    """
+    fmt = (fmt or "").lower()
+    if fmt not in STREAM_FORMATS:
+        fmt = "msgpack" if "application/x-msgpack" in (accept or "").lower() else "sse"
+    enc = (encoding or "").lower()
+    if enc not in _WBITS and enc != "identity":
+        acc = _accepted(accept_encoding or "")
+        enc = next(
+            (e for e in SSE_ENCODINGS if acc.get(e, acc.get("*", 0.0)) > 0),
+            "identity",
+        )
+    return fmt, enc
+
+
+class StreamCompressor:
+    """gzip/deflate 스트림 하나. feed() 는 이벤트 1건을 압축해 Z_SYNC_FLUSH 까지 내보낸다(버퍼링 없음)."""
+
+    def __init__(self, encoding: str, level: int = COMPRESS_LEVEL):
+        self.encoding = encoding
+        self._z = zlib.compressobj(level, zlib.DEFLATED, _WBITS[encoding]) if encoding in _WBITS else None
+
+    def feed(self, frame: bytes) -> bytes:
+        if self._z is None:
+            return frame
+        return self._z.compress(frame) + self._z.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self._z is None:
+            return b""
+        return self._z.flush(zlib.Z_FINISH)
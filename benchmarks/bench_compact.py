@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+이벤트 축약/직렬화 마이크로 벤치마크 (compact.encode_event).
+
+사용 예시:
+    python -m benchmarks.bench_compact --chunks 1000 10000 --iters 50
+    python -m benchmarks.bench_compact --legacy-rev 3482850   # 이전 구현과 비교(git 리비전)
+
+동작 요약:
+ 1) STATE_CHECKPOINT 형태 이벤트 생성: state.pdf_chunks N개(청크당 ~1200자 한글) + validation_report(부서 80개)
+    + 긴 문자열 키들 (state 바이트 상한 초과 경로까지 태움)
+ 2) 이벤트 1건을 SSE/로그용 bytes 로 만드는 전체 비용 측정
+    - new   : encode_event(ev) → (축약본, bytes) 한 번의 순회
+    - legacy: (--legacy-rev) 해당 리비전의 compact_event(ev) + json.dumps (RunChannel.publish 와 동일)
+ 3) 이벤트당 p50/p99 (ms), 출력 bytes, 배율을 JSON 으로 출력
+"""
+
+import argparse
+import copy
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import types
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def make_event(n_chunks: int) -> dict:
+    text = "가족복지과 세부사업 1인가구 병원 안심동행 사업 민간위탁금 112,530 " * 24  # ~1200자
+    items = []
+    for i in range(80):
+        dept = f"부서{i:02d}과"
+        ev = [{"page": i + 1, "snippet": f"{dept} 부서 예산 총괄 표 " + "1,234,567 " * 30}]
+        items.append({"policy": "exists", "dept": dept, "status": "ok", "evidence": ev})
+        items.append({"policy": "sum_check", "dept": dept, "status": "diff", "expected": 101250, "found": 27299, "delta": -73951, "evidence": ev})
+    return {
+        "seq": 42,
+        "type": "OBS",
+        "nodeId": "hitl",
+        "message": "STATE_CHECKPOINT",
+        "detail": {
+            "state": {
+                "pdf_chunks": [{"page": i // 3 + 1, "text": text} for i in range(n_chunks)],
+                "validation_report": {"summary": {"ok": 80, "warn": 80, "fail": 0}, "items": items},
+                "merged_path": "/data/storage/tmp/abcd1234_merged.parquet",
+                **{f"note_{j}": "검증 메모 " * 400 for j in range(20)},
+            }
+        },
+        "ts": "2025-10-22T10:00:00+09:00",
+        "has_more": True,
+    }
+
+
+def load_legacy(rev: str):
+    src = subprocess.run(
+        ["git", "show", f"{rev}:backend/compact.py"], cwd=str(ROOT), capture_output=True, text=True, check=True
+    ).stdout
+    mod = types.ModuleType("legacy_compact")
+    exec(compile(src, f"{rev}:backend/compact.py", "exec"), mod.__dict__)
+    return mod
+
+
+def _time(fn, iters: int) -> dict:
+    samples = []
+    out = None
+    for _ in range(iters):
+        t0 = time.perf_counter()
+        out = fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return {
+        "p50_ms": round(samples[len(samples) // 2], 4),
+        "p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))], 4),
+        "bytes": len(out),
+    }
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--chunks", type=int, nargs="+", default=[1000, 10000])
+    ap.add_argument("--iters", type=int, default=50)
+    ap.add_argument("--legacy-rev", default=None, help="비교할 이전 구현의 git 리비전")
+    ap.add_argument("--json-out", default=None)
+    args = ap.parse_args()
+
+    sys.path.insert(0, str(ROOT))
+    with tempfile.TemporaryDirectory() as workdir:
+        # settings 가 cwd 기준으로 storage/ 를 만들므로 임시 작업 디렉터리에서 import
+        os.chdir(workdir)
+        from backend.compact import encode_event
+
+        legacy = load_legacy(args.legacy_rev) if args.legacy_rev else None
+        results = []
+        for n in args.chunks:
+            ev = make_event(n)
+            r = {"chunks": n, "input_bytes": len(json.dumps(ev, ensure_ascii=False).encode("utf-8"))}
+            r["new"] = _time(lambda: encode_event(ev)[1], args.iters)
+            if legacy is not None:
+                # 기존 compact_event 는 detail 을 제자리에서 바꾸므로 매번 사본 (사본 비용은 측정 밖)
+                copies = [copy.deepcopy(ev) for _ in range(args.iters)]
+                it = iter(copies)
+                r["legacy"] = _time(
+                    lambda: json.dumps(legacy.compact_event(next(it)), ensure_ascii=False).encode("utf-8"),
+                    args.iters,
+                )
+                r["speedup_p50"] = round(r["legacy"]["p50_ms"] / max(r["new"]["p50_ms"], 1e-9), 1)
+            results.append(r)
+            print(f"[chunks={n}] {json.dumps(r, ensure_ascii=False)}", file=sys.stderr)
+
+    report = {"benchmark": "compact_event", "legacy_rev": args.legacy_rev, "results": results}
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+XLSX export 벤치마크: 스트리밍(write-only) vs 기존 pandas ExcelWriter.
+
+사용 예시:
+    python -m benchmarks.bench_export --rows 100000 200000 --json-out bench_export.json
+
+동작 요약:
+ 1) storage/splits 와 같은 형태(문자열 8열 + 정수 10열)의 합성 병합 테이블을 Parquet 로 생성
+ 2) writer 별로 **별도 프로세스**에서 node_export_xlsx 경로를 실행 (RSS 측정 격리)
+ 3) rows/sec, wall time, peak RSS(ru_maxrss)를 JSON 으로 출력
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+WRITERS = ["stream", "pandas"]
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux: KB, macOS: bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def make_table(rows: int, path: str) -> None:
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(42)
+    depts = [f"부서{i:02d}과" for i in range(40)]
+    data = {
+        "회계연도": np.full(rows, 2025),
+        "예산구분": ["추경3회"] * rows,
+        "회계": ["일반회계"] * rows,
+        "부서명": [depts[i % len(depts)] for i in range(rows)],
+        "세부사업": [f"세부사업 {i % 997}" for i in range(rows)],
+        "통계목코드": [f"{301 + i % 9}-{i % 12:02d}" for i in range(rows)],
+        "통계목": ["민간위탁금"] * rows,
+        "산출근거": [f"○사업 산출근거 {i}" for i in range(rows)],
+    }
+    for col in ["예산액", "기정액", "비교증감", "국비", "시도비", "시군구비", "기금", "기타", "지방채", "자체"]:
+        data[col] = rng.integers(-500_000, 5_000_000, size=rows)
+    df = pd.DataFrame(data)
+    df["__sheet__"] = "데이터"
+    df["__file__"] = [f"{d}.xlsx" for d in df["부서명"]]
+    df.to_parquet(path, index=False)
+
+
+def run_child(writer: str, src: str, workdir: str) -> dict:
+    # settings 가 cwd 기준으로 storage/ 를 만들므로 임시 작업 디렉터리에서 import
+    os.chdir(workdir)
+    sys.path.insert(0, str(ROOT))
+    from backend.engine import Ctx, node_export_xlsx
+
+    base = _peak_rss_mb()
+    ctx = Ctx(run_id=f"bench-{writer}", storage=workdir, art_dir=workdir)
+    t0 = time.perf_counter()
+    out = node_export_xlsx(
+        {"table_in": "merge_xlsx.merged_table", "writer": writer},
+        {"merge_xlsx.merged_table": src},
+        ctx,
+    )
+    wall = time.perf_counter() - t0
+    return {
+        "writer": writer,
+        "wall_s": round(wall, 3),
+        "base_rss_mb": round(base, 1),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "xlsx_bytes": os.path.getsize(out["artifact_path"]),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="XLSX export benchmark")
+    ap.add_argument("--rows", type=int, nargs="+", default=[20_000, 100_000])
+    ap.add_argument("--writers", nargs="+", default=WRITERS, choices=WRITERS)
+    ap.add_argument("--json-out", default=None)
+    ap.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    ap.add_argument("--src", default=None, help=argparse.SUPPRESS)
+    ap.add_argument("--workdir", default=None, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child, args.src, args.workdir)))
+        return
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="bench-export-") as tmp:
+        for rows in args.rows:
+            src = os.path.join(tmp, f"merged_{rows}.parquet")
+            make_table(rows, src)
+            for writer in args.writers:
+                proc = subprocess.run(
+                    [
+                        sys.executable,
+                        "-m",
+                        "benchmarks.bench_export",
+                        "--child",
+                        writer,
+                        "--src",
+                        src,
+                        "--workdir",
+                        tmp,
+                    ],
+                    cwd=str(ROOT),
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                )
+                r = json.loads(proc.stdout.strip().splitlines()[-1])
+                r["rows"] = rows
+                r["rows_per_s"] = round(rows / r["wall_s"], 1) if r["wall_s"] else None
+                results.append(r)
+                print(
+                    f"[{writer:>6}] rows={rows:>8} {r['wall_s']:>7.2f}s "
+                    f"{r['rows_per_s']:>10} rows/s  peak_rss={r['peak_rss_mb']} MB",
+                    file=sys.stderr,
+                )
+
+    report = {"benchmark": "export_xlsx", "results": results}
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+실행 이벤트 팬아웃 부하 테스트: 실행 1건 + 구독자 N명.
+
+사용 예시:
+    python -m benchmarks.bench_fanout --subscribers 1 10 100 --events 2000 --slow-ratio 0.2
+
+동작 요약:
+ 1) 임시 작업 디렉터리에서 RunChannel 을 만들고 구독자 N명을 붙인다
+    (slow-ratio 비율은 프레임마다 sleep 하는 느린 클라이언트)
+ 2) 발행자가 ACTION/OBS/SUMMARY 가 섞인 이벤트를 일정 간격으로 publish
+ 3) 발행 1건당 소요 시간(p50/p99), 프로세스 CPU 시간, 구독자별 최대 대기 수,
+    생략(병합)된 이벤트 수, 필수 이벤트 누락 여부를 JSON 으로 출력
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _event(seq: int, n_events: int) -> dict:
+    node = f"node{seq % 7}"
+    kind = ("ACTION", "OBS", "OBS", "SUMMARY")[seq % 4]
+    return {
+        "seq": seq,
+        "type": kind,
+        "nodeId": node,
+        "message": f"{kind} {node}",
+        "detail": {"rows": seq * 10, "preview": ["부서명", "세부사업", "예산액"] * 4},
+        "ts": "2025-01-01T00:00:00+09:00",
+        "has_more": seq < n_events,
+    }
+
+
+async def _consume(ch, slow_s: float, stats: dict):
+    async for frame in ch.subscribe(0):
+        if frame.startswith(b"event: coalesced"):
+            stats["coalesced_notes"] += 1
+            continue
+        stats["frames"] += 1
+        if b'"type": "SUMMARY"' in frame:
+            stats["summaries"] += 1
+        if slow_s:
+            await asyncio.sleep(slow_s)
+
+
+async def run_case(n_subs: int, n_events: int, slow_ratio: float, slow_s: float, interval_s: float, queue_max: int) -> dict:
+    from backend import runner
+
+    ch = runner.RunChannel(f"bench-{n_subs}-{time.time_ns()}")
+    n_slow = int(n_subs * slow_ratio)
+    stats = [
+        {"slow": i < n_slow, "frames": 0, "summaries": 0, "coalesced_notes": 0}
+        for i in range(n_subs)
+    ]
+    consumers = [
+        asyncio.create_task(_consume(ch, slow_s if st["slow"] else 0.0, st)) for st in stats
+    ]
+    await asyncio.sleep(0)  # 구독 등록
+
+    # 구독자 큐 상한을 케이스별로 적용
+    for sub in ch._subs:
+        sub.maxsize = queue_max
+
+    publish_ns = []
+    peak_buffered = 0
+    cpu0 = time.process_time()
+    wall0 = time.perf_counter()
+    for seq in range(1, n_events + 1):
+        t0 = time.perf_counter_ns()
+        await ch.publish(_event(seq, n_events))
+        publish_ns.append(time.perf_counter_ns() - t0)
+        peak_buffered = max([peak_buffered] + [len(s.buf) for s in ch._subs])
+        await asyncio.sleep(interval_s)
+    await ch.close()
+    await asyncio.wait_for(asyncio.gather(*consumers), timeout=max(30.0, n_events * slow_s))
+    wall = time.perf_counter() - wall0
+    cpu = time.process_time() - cpu0
+
+    publish_ns.sort()
+    expected_summaries = n_events // 4
+    fast = [s for s in stats if not s["slow"]]
+    slow = [s for s in stats if s["slow"]]
+    return {
+        "subscribers": n_subs,
+        "slow_subscribers": n_slow,
+        "events": n_events,
+        "queue_max": queue_max,
+        "wall_s": round(wall, 3),
+        "cpu_s": round(cpu, 3),
+        "cpu_us_per_event": round(cpu / n_events * 1e6, 1),
+        "publish_p50_us": round(publish_ns[len(publish_ns) // 2] / 1000, 1),
+        "publish_p99_us": round(publish_ns[int(len(publish_ns) * 0.99)] / 1000, 1),
+        "peak_buffered_per_subscriber": peak_buffered,
+        "fast_min_frames": min((s["frames"] for s in fast), default=None),
+        "slow_min_frames": min((s["frames"] for s in slow), default=None),
+        "all_summaries_delivered": all(s["summaries"] == expected_summaries for s in stats),
+    }
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--subscribers", type=int, nargs="+", default=[1, 10, 100])
+    ap.add_argument("--events", type=int, default=2000)
+    ap.add_argument("--slow-ratio", type=float, default=0.2)
+    ap.add_argument("--slow-ms", type=float, default=5.0, help="느린 구독자의 프레임당 처리 시간")
+    ap.add_argument("--interval-ms", type=float, default=0.5, help="발행 간격")
+    ap.add_argument("--queue-max", type=int, default=64)
+    ap.add_argument("--json-out", default=None)
+    args = ap.parse_args()
+
+    # settings 가 cwd 기준으로 storage/ 를 만들므로 임시 작업 디렉터리에서 import
+    sys.path.insert(0, str(ROOT))
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        for n in args.subscribers:
+            res = asyncio.run(
+                run_case(n, args.events, args.slow_ratio, args.slow_ms / 1000, args.interval_ms / 1000, args.queue_max)
+            )
+            results.append(res)
+            print(json.dumps(res, ensure_ascii=False))
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
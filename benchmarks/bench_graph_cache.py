@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+LangGraph 컴파일 캐시 마이크로 벤치마크.
+
+사용 예시:
+    python -m benchmarks.bench_graph_cache --iters 200
+
+동작 요약:
+ 1) quickstart 와 같은 모양의 workflow(parse_pdf/embed_pdf/merge_xlsx/validate/export, XLSX 41개 경로)
+ 2) 실행 1건당 그래프 준비 비용을 측정
+    - rebuild: 매번 build_langgraph (StateGraph 구성 + 노드 클로저 + 엣지 + compile)
+    - cached : get_compiled_graph (정규화 해시 + LRU 조회)
+    두 경우 모두 실행별 memo_keys 계산을 포함(실제 실행 경로와 동일)
+ 3) 평균/p50/p99 (ms) 와 배율을 JSON 으로 출력
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def make_workflow() -> dict:
+    xlsx = [f"/data/storage/splits/{'x' * 36}/부서{j:02d}과.xlsx" for j in range(41)]
+    return {
+        "id": "wf-bench",
+        "nodes": [
+            {"id": "parse_pdf", "type": "parse_pdf", "config": {"pdf_path": "/data/budget.pdf", "chunk_size": 1200, "overlap": 200}, "in": []},
+            {"id": "embed_pdf", "type": "embed_pdf", "config": {"chunks_in": "parse_pdf.pdf_chunks", "reset": True}, "in": ["parse_pdf.pdf_chunks"]},
+            {"id": "merge_xlsx", "type": "merge_xlsx", "config": {"xlsx_paths": xlsx, "flatten": True}, "in": []},
+            {"id": "validate", "type": "validate_with_pdf", "config": {"table_in": "merge_xlsx.merged_table", "tolerance": 0.005}, "in": ["merge_xlsx.merged_table"]},
+            {"id": "export", "type": "export_xlsx", "config": {"table_in": "merge_xlsx.merged_table"}, "in": ["merge_xlsx.merged_table"]},
+        ],
+        "edges": [
+            {"from": "parse_pdf", "to": "embed_pdf"},
+            {"from": "embed_pdf", "to": "validate"},
+            {"from": "merge_xlsx", "to": "validate"},
+            {"from": "validate", "to": "export"},
+        ],
+    }
+
+
+def _stats(samples: list) -> dict:
+    samples = sorted(samples)
+    return {
+        "mean_ms": round(sum(samples) / len(samples), 4),
+        "p50_ms": round(samples[len(samples) // 2], 4),
+        "p99_ms": round(samples[int(len(samples) * 0.99)], 4),
+    }
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--iters", type=int, default=200)
+    ap.add_argument("--json-out", default=None)
+    args = ap.parse_args()
+
+    sys.path.insert(0, str(ROOT))
+    with tempfile.TemporaryDirectory() as workdir:
+        # settings 가 cwd 기준으로 storage/ 를 만들므로 임시 작업 디렉터리에서 import
+        os.chdir(workdir)
+        from backend.engine_lg import build_langgraph, get_compiled_graph, memo_keys
+
+        wf = make_workflow()
+        get_compiled_graph(wf)  # 캐시 채움 + import 워밍업
+
+        results = {}
+        for name, prepare in (("rebuild", build_langgraph), ("cached", get_compiled_graph)):
+            samples = []
+            for _ in range(args.iters):
+                t0 = time.perf_counter()
+                prepare(wf)
+                memo_keys(wf)
+                samples.append((time.perf_counter() - t0) * 1000)
+            results[name] = _stats(samples)
+        results["speedup"] = round(results["rebuild"]["mean_ms"] / results["cached"]["mean_ms"], 1)
+        results["iters"] = args.iters
+
+    print(json.dumps(results, ensure_ascii=False))
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+오프라인 종단 간 벤치마크: 합성 예산서로 노드별 + 엔진(seq / lg) 전체 실행.
+
+사용 예시:
+    python -m benchmarks.bench_pipeline --tiers small medium --json-out bench_pipeline.json
+    python -m benchmarks.bench_pipeline --tiers medium --baseline prev.json --threshold 0.2
+
+동작 요약:
+ 1) 규모 단계별로 benchmarks.synth 로 PDF(N쪽) + 부서별 XLSX(M개) 생성
+ 2) 대상별로 **별도 프로세스 + 별도 작업 디렉터리**에서 실행 (RSS 측정 격리, 메모/Chroma 공유 방지)
+    - nodes: parse_pdf → embed_pdf → merge_xlsx → validate_with_pdf → export_xlsx 를 하나씩 (run_limited 경로)
+    - seq  : engine.execute_stream (워커 풀 병렬)
+    - lg   : engine_lg.execute_stream_lg + HITL 승인 후 export (서버와 같은 순서)
+    임베딩은 benchmarks.stubs.HashEmbedder (네트워크 없음, 결정적)
+ 3) wall time, 노드별 소요/CPU/최대 RSS 증가/처리량, 프로세스 peak RSS 를 JSON 으로 출력
+ 4) --baseline 을 주면 같은 (tier, target) 의 wall/peak RSS 를 비교해 임계치 초과 시 종료 코드 1
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+TARGETS = ["nodes", "seq", "lg"]
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux: KB, macOS: bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def make_workflow(books: dict) -> dict:
+    """quickstart 와 같은 노드/엣지 (embed_pdf → validate 는 _autopatch_edges 가 붙이는 엣지)."""
+    return {
+        "id": "wf-bench",
+        "nodes": [
+            {"id": "parse_pdf", "type": "parse_pdf", "config": {"pdf_path": books["pdf"], "chunk_size": 1200, "overlap": 200}, "in": []},
+            {"id": "embed_pdf", "type": "embed_pdf", "config": {"chunks_in": "parse_pdf.pdf_chunks", "reset": True}, "in": ["parse_pdf.pdf_chunks"]},
+            {"id": "merge_xlsx", "type": "merge_xlsx", "config": {"xlsx_paths": books["xlsx"], "flatten": True}, "in": []},
+            {"id": "validate", "type": "validate_with_pdf", "config": {"table_in": "merge_xlsx.merged_table", "tolerance": 0.005}, "in": ["merge_xlsx.merged_table"]},
+            {"id": "export", "type": "export_xlsx", "config": {"table_in": "merge_xlsx.merged_table"}, "in": ["merge_xlsx.merged_table"]},
+        ],
+        "edges": [
+            {"from": "parse_pdf", "to": "embed_pdf"},
+            {"from": "embed_pdf", "to": "validate"},
+            {"from": "merge_xlsx", "to": "validate"},
+            {"from": "validate", "to": "export"},
+        ],
+    }
+
+
+def _node_result(m: dict) -> dict:
+    """NodeMeter.finish() → 벤치마크 보고 형식."""
+    r = {
+        "wall_s": round(m["duration_ms"] / 1000, 4),
+        "cpu_s": round(m["cpu_ms"] / 1000, 4),
+        "peak_rss_delta_mb": round(m["peak_rss_delta_kb"] / 1024, 1),
+    }
+    if "items" in m:
+        r["items"] = m["items"]
+        r["throughput"] = m["throughput"]
+    return r
+
+
+# ---------- 자식 프로세스 ----------
+def _child_nodes(wf: dict, ctx) -> dict:
+    from backend.engine import NodeMeter, run_limited
+
+    outputs, nodes = {}, {}
+    for node in wf["nodes"]:
+        meter = NodeMeter()
+        out, _ = run_limited(node["type"], node["config"], {**outputs}, ctx, meter.usage)
+        nodes[node["id"]] = _node_result(meter.finish(node["type"], out))
+        for k, v in out.items():
+            outputs[k] = v
+            outputs[f"{node['id']}.{k}"] = v
+    return nodes
+
+
+def _collect(events, nodes: dict, state: dict):
+    for ev in events:
+        d = ev.get("detail") or {}
+        if ev.get("type") == "SUMMARY" and d.get("metrics"):
+            nodes[ev["nodeId"]] = _node_result(d["metrics"])
+        elif ev.get("message") == "STATE_CHECKPOINT":
+            state.update(d.get("state") or {})
+
+
+def _child_seq(wf: dict, ctx) -> dict:
+    from backend.engine import execute_stream
+
+    nodes: dict = {}
+    _collect(execute_stream(wf, ctx), nodes, {})
+    return nodes
+
+
+def _child_lg(wf: dict, ctx) -> dict:
+    from backend.engine import NodeMeter, run_limited
+    from backend.engine_lg import execute_stream_lg
+
+    nodes, state = {}, {}
+    _collect(execute_stream_lg(wf, ctx), nodes, state)
+    # 서버는 HITL 승인 후 export 를 직접 실행한다 → 자동 승인으로 보고 같은 경로 실행
+    export = next(n for n in wf["nodes"] if n["type"] == "export_xlsx")
+    meter = NodeMeter()
+    out, _ = run_limited(
+        "export_xlsx",
+        export["config"],
+        {"merge_xlsx.merged_table": state.get("merged_path")},
+        ctx,
+        meter.usage,
+    )
+    nodes[export["id"]] = _node_result(meter.finish("export_xlsx", out))
+    return nodes
+
+
+def run_child(target: str, books_json: str, workdir: str) -> dict:
+    # settings 가 cwd 기준으로 storage/, chroma/ 를 만들므로 대상별 작업 디렉터리에서 import
+    os.makedirs(workdir, exist_ok=True)
+    os.chdir(workdir)
+    sys.path.insert(0, str(ROOT))
+    from benchmarks.stubs import install_stub_embedder
+    from backend.engine import Ctx
+    from backend.settings import STORAGE, ART_DIR
+
+    install_stub_embedder()
+    with open(books_json, "r", encoding="utf-8") as f:
+        books = json.load(f)
+    wf = make_workflow(books)
+    base = _peak_rss_mb()
+    ctx = Ctx(run_id=f"bench-{target}-{os.getpid()}", storage=STORAGE, art_dir=ART_DIR)
+    runner = {"nodes": _child_nodes, "seq": _child_seq, "lg": _child_lg}[target]
+    t0 = time.perf_counter()
+    nodes = runner(wf, ctx)
+    wall = time.perf_counter() - t0
+    return {
+        "wall_s": round(wall, 3),
+        "base_rss_mb": round(base, 1),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "nodes": nodes,
+    }
+
+
+# ---------- 부모: 데이터 생성 / 반복 / 비교 ----------
+def _env() -> dict:
+    try:
+        rev = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=str(ROOT), capture_output=True, text=True
+        ).stdout.strip()
+    except OSError:
+        rev = ""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "git_rev": rev or None,
+    }
+
+
+def _spawn(target: str, books_json: str, workdir: str) -> dict:
+    proc = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.bench_pipeline",
+            "--child",
+            target,
+            "--books",
+            books_json,
+            "--workdir",
+            workdir,
+        ],
+        cwd=str(ROOT),
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{target} failed:\n{proc.stderr[-4000:]}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def _compare(results: list, baseline: dict, threshold: float) -> list:
+    """baseline 대비 wall_s / peak_rss_mb 가 (1 + threshold) 배를 넘은 항목."""
+    prev = {(r["tier"], r["target"]): r for r in baseline.get("results", [])}
+    out = []
+    for r in results:
+        b = prev.get((r["tier"], r["target"]))
+        if not b:
+            continue
+        for key in ("wall_s", "peak_rss_mb"):
+            if b.get(key) and r[key] > b[key] * (1 + threshold):
+                out.append(
+                    {
+                        "tier": r["tier"],
+                        "target": r["target"],
+                        "metric": key,
+                        "baseline": b[key],
+                        "current": r[key],
+                        "ratio": round(r[key] / b[key], 3),
+                    }
+                )
+    return out
+
+
+def main() -> int:
+    from benchmarks.synth import TIERS, make_budget_books
+
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--tiers", nargs="+", default=["small", "medium"], choices=list(TIERS))
+    ap.add_argument("--targets", nargs="+", default=TARGETS, choices=TARGETS)
+    ap.add_argument("--repeat", type=int, default=1, help="대상별 반복 횟수(wall 은 중앙값)")
+    ap.add_argument("--json-out", default=None)
+    ap.add_argument("--baseline", default=None, help="이전 결과 JSON (회귀 비교)")
+    ap.add_argument("--threshold", type=float, default=0.2, help="회귀 판정 배율 여유(0.2 = +20%%)")
+    ap.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    ap.add_argument("--books", default=None, help=argparse.SUPPRESS)
+    ap.add_argument("--workdir", default=None, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child, args.books, args.workdir), ensure_ascii=False))
+        return 0
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="bench-pipeline-") as tmp:
+        for tier in args.tiers:
+            size = TIERS[tier]
+            t0 = time.perf_counter()
+            books = make_budget_books(os.path.join(tmp, tier, "data"), **size)
+            books_json = os.path.join(tmp, tier, "books.json")
+            with open(books_json, "w", encoding="utf-8") as f:
+                json.dump(books, f, ensure_ascii=False)
+            print(f"[{tier}] synth {size} in {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+
+            for target in args.targets:
+                runs = [
+                    _spawn(target, books_json, os.path.join(tmp, tier, f"work-{target}-{i}"))
+                    for i in range(max(1, args.repeat))
+                ]
+                walls = [r["wall_s"] for r in runs]
+                best = min(runs, key=lambda r: r["wall_s"])
+                r = {
+                    "tier": tier,
+                    "target": target,
+                    **size,
+                    "total_rows": books["rows"],
+                    "wall_s": round(statistics.median(walls), 3),
+                    "wall_s_samples": walls,
+                    "base_rss_mb": best["base_rss_mb"],
+                    "peak_rss_mb": max(x["peak_rss_mb"] for x in runs),
+                    "pages_per_s": round(size["pages"] / statistics.median(walls), 1),
+                    "rows_per_s": round(books["rows"] / statistics.median(walls), 1),
+                    "nodes": best["nodes"],
+                }
+                results.append(r)
+                print(
+                    f"[{tier}] {target:>5} {r['wall_s']:>8.2f}s  peak_rss={r['peak_rss_mb']} MB  "
+                    + "  ".join(f"{k}={v['wall_s']}s" for k, v in r["nodes"].items()),
+                    file=sys.stderr,
+                )
+
+    report = {"benchmark": "pipeline", "env": _env(), "tiers": {t: TIERS[t] for t in args.tiers}, "results": results}
+    code = 0
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            report["regressions"] = _compare(results, json.load(f), args.threshold)
+        for reg in report["regressions"]:
+            print(f"REGRESSION {reg}", file=sys.stderr)
+        code = 1 if report["regressions"] else 0
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
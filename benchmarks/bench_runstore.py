@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+실행 상태 갱신 처리량 벤치마크: SQLite RunStore vs 기존 JSON 전체 재기록.
+
+사용 예시:
+    python -m benchmarks.bench_runstore --runs 200 --updates 20 --threads 1 8 32
+
+동작 요약:
+ 1) quickstart 와 같은 크기의 workflow(XLSX 41개 경로 포함)를 담은 실행 N건 생성
+ 2) 스레드 T개가 실행별로 상태 갱신 U회(RUNNING ↔ WAITING_HITL … SUCCEEDED)를 동시에 수행
+    - json: 기존 방식(_load_json → 필드 변경 → _save_json 전체 재기록)
+    - sqlite: RunStore.update / transition (해당 컬럼만 UPDATE)
+ 3) updates/sec, 상태별 목록 조회 시간(json 은 디렉터리 스캔)을 JSON 으로 출력
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+STATES = ["RUNNING", "WAITING_HITL"]
+
+
+def make_run(i: int) -> dict:
+    xlsx = [f"/data/storage/splits/{'x' * 36}/부서{j:02d}과.xlsx" for j in range(41)]
+    return {
+        "runId": f"run-{i:06d}",
+        "status": "PLANNING",
+        "engine": "lg",
+        "workflow": {
+            "id": "wf-bench",
+            "name": "Budget-Validation",
+            "nodes": [
+                {"id": "merge_xlsx", "type": "merge_xlsx", "config": {"xlsx_paths": xlsx, "flatten": True}},
+                {"id": "validate", "type": "validate_with_pdf", "config": {"tolerance": 0.005}},
+                {"id": "export", "type": "export_xlsx", "config": {"filename": "예산서.xlsx"}},
+            ],
+            "edges": [{"from": "merge_xlsx", "to": "validate"}, {"from": "validate", "to": "export"}],
+        },
+        "startedAt": f"2025-01-01T00:{i // 60 % 60:02d}:{i % 60:02d}+09:00",
+        "endedAt": None,
+        "artifactId": None,
+        "checkpoint": None,
+    }
+
+
+# ---------- 기존 방식 ----------
+def _save_json(path: str, obj):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False, indent=2)
+
+
+def _load_json(path: str, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def json_worker(run_dir: str, run_id: str, updates: int):
+    path = os.path.join(run_dir, f"{run_id}.json")
+    for u in range(updates):
+        run = _load_json(path, {})
+        run["status"] = STATES[u % 2]
+        _save_json(path, run)
+    run = _load_json(path, {})
+    run["status"] = "SUCCEEDED"
+    _save_json(path, run)
+
+
+def json_list(run_dir: str, status: str) -> int:
+    n = 0
+    for fn in os.listdir(run_dir):
+        if fn.endswith(".json") and _load_json(os.path.join(run_dir, fn), {}).get("status") == status:
+            n += 1
+    return n
+
+
+# ---------- SQLite ----------
+def sqlite_worker(store, run_id: str, updates: int):
+    for u in range(updates):
+        store.update(run_id, status=STATES[u % 2])
+    store.transition(run_id, "SUCCEEDED", from_=STATES)
+
+
+def run_case(kind: str, n_runs: int, updates: int, threads: int, workdir: str) -> dict:
+    from backend.runstore import RunStore
+
+    case_dir = tempfile.mkdtemp(dir=workdir)
+    ids = [f"run-{i:06d}" for i in range(n_runs)]
+    if kind == "json":
+        for i in range(n_runs):
+            _save_json(os.path.join(case_dir, f"{ids[i]}.json"), make_run(i))
+        fn = lambda rid: json_worker(case_dir, rid, updates)
+    else:
+        store = RunStore(os.path.join(case_dir, "runs.sqlite3"), legacy_dir=None)
+        for i in range(n_runs):
+            store.create(make_run(i))
+        fn = lambda rid: sqlite_worker(store, rid, updates)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(threads) as ex:
+        list(ex.map(fn, ids))
+    wall = time.perf_counter() - t0
+
+    t1 = time.perf_counter()
+    if kind == "json":
+        listed = json_list(case_dir, "SUCCEEDED")
+    else:
+        listed, cursor = 0, None
+        while True:
+            items, cursor = store.list_runs(status="SUCCEEDED", limit=100, cursor=cursor)
+            listed += len(items)
+            if not cursor:
+                break
+    list_ms = (time.perf_counter() - t1) * 1000
+
+    total = n_runs * (updates + 1)
+    return {
+        "store": kind,
+        "runs": n_runs,
+        "threads": threads,
+        "updates": total,
+        "wall_s": round(wall, 3),
+        "updates_per_s": round(total / wall, 1),
+        "list_by_status_ms": round(list_ms, 2),
+        "listed": listed,
+    }
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=200)
+    ap.add_argument("--updates", type=int, default=20, help="실행당 상태 갱신 횟수")
+    ap.add_argument("--threads", type=int, nargs="+", default=[1, 8, 32])
+    ap.add_argument("--json-out", default=None)
+    args = ap.parse_args()
+
+    sys.path.insert(0, str(ROOT))
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        # settings 가 cwd 기준으로 storage/ 를 만들므로 임시 작업 디렉터리에서 import
+        os.chdir(workdir)
+        for threads in args.threads:
+            for kind in ("json", "sqlite"):
+                res = run_case(kind, args.runs, args.updates, threads, workdir)
+                results.append(res)
+                print(json.dumps(res, ensure_ascii=False))
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
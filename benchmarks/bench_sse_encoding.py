@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+/runs/{id}/events 전송 인코딩 비교 (실행 1건당 bytes).
+
+사용 예시:
+    python -m benchmarks.bench_sse_encoding --chunks 1000 --progress 200
+    python -m benchmarks.bench_sse_encoding --log storage/runs/*.events.jsonl   # 실제 실행 로그로 측정
+
+동작 요약:
+ 1) 이벤트 열 준비
+    - 합성(기본): PLAN → 노드별 ACTION/진행 OBS(--progress 개)/SUMMARY(metrics) → STATE_CHECKPOINT
+      (bench_compact.make_event, --chunks) → WAITING_HITL → export → ASSISTANT_REPLY.
+      모두 compact.encode_event 를 거친 축약본(서버가 실제로 보내는 것)
+    - --log: append-only 이벤트 로그(축약본)를 그대로 사용
+ 2) 형식(sse | msgpack) × 인코딩(identity | gzip | deflate) 조합마다
+    서버와 같은 경로(wire.render → StreamCompressor.feed, 이벤트마다 Z_SYNC_FLUSH)로 스트림을 만들어
+    총 bytes, 현재 JSON 스트림(sse+identity) 대비 비율, 이벤트당 인코딩 시간(p50 µs)을 잰다
+ 3) 참고치: flush 없이 스트림 전체를 한 번에 gzip 한 크기(이벤트별 flush 비용 확인용)
+ 4) 왕복 확인: 압축 스트림을 풀어 원래 프레임과 같은지 검사
+"""
+
+import argparse
+import glob
+import json
+import os
+import struct
+import sys
+import tempfile
+import time
+import zlib
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+FORMATS = ("sse", "msgpack")
+ENCODINGS = ("identity", "gzip", "deflate")
+
+
+def synth_run(n_chunks: int, n_progress: int) -> list:
+    from backend.compact import encode_event
+
+    from benchmarks.bench_compact import make_event
+
+    nodes = ["parse_pdf", "embed_pdf", "merge_xlsx", "validate", "export"]
+    evs = [{"type": "PLAN", "nodeId": "plan", "message": f"총 {len(nodes)}개 노드 실행 계획 수립",
+            "detail": {"nodes": nodes, "edges": [[a, b] for a, b in zip(nodes, nodes[1:])]}}]
+    for i, nid in enumerate(nodes):
+        evs.append({"type": "ACTION", "nodeId": nid, "message": f"{nid}({nid}) 시작",
+                    "detail": {"mono": 1000.0 + i, "config": {"chunk_size": 1200, "overlap": 100}}})
+        for k in range(n_progress if nid in ("parse_pdf", "embed_pdf") else 2):
+            evs.append({"type": "OBS", "nodeId": nid, "message": "진행 중",
+                        "detail": {"done": k + 1, "total": n_progress, "unit": "pages" if nid == "parse_pdf" else "chunks",
+                                   "eta_s": round((n_progress - k) * 0.05, 2)}})
+        evs.append({"type": "SUMMARY", "nodeId": nid, "message": f"{nid} 완료",
+                    "detail": {"metrics": {"mono_start": 1000.0 + i, "mono_end": 1001.5 + i, "duration_ms": 1500.2,
+                                           "cpu_ms": 1320.7, "peak_rss_delta_kb": 20480, "items": n_chunks,
+                                           "throughput": {"chunks_per_s": 666.4}}}})
+    cp = make_event(n_chunks)
+    evs.append({k: v for k, v in cp.items() if k not in ("seq", "has_more", "ts")})
+    evs.append({"type": "OBS", "nodeId": "hitl", "message": "WAITING_HITL", "detail": {}})
+    evs.append({"type": "OBS", "nodeId": "export", "message": "산출물 생성",
+                "detail": {"artifact_id": "abcd1234.xlsx", "rows": 1000}})
+    evs.append({"type": "SUMMARY", "nodeId": "assistant", "message": "ASSISTANT_REPLY",
+                "detail": {"text": "부서별 XLSX 병합과 문서 기준 검증을 마쳤습니다. " * 12}})
+    out = []
+    for seq, ev in enumerate(evs, 1):
+        ev = {"seq": seq, **ev, "ts": "2025-10-22T10:00:00+09:00", "has_more": seq < len(evs)}
+        out.append(encode_event(ev))
+    return out
+
+
+def load_logs(patterns: list) -> list:
+    out = []
+    for pat in patterns:
+        for path in sorted(glob.glob(pat)):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        data = line.strip().encode("utf-8")
+                        out.append((json.loads(data), data))
+    return out
+
+
+def _unframe_msgpack(buf: bytes) -> list:
+    import ormsgpack
+
+    out, i = [], 0
+    while i < len(buf):
+        (n,) = struct.unpack(">I", buf[i : i + 4])
+        out.append(ormsgpack.unpackb(buf[i + 4 : i + 4 + n]))
+        i += 4 + n
+    return out
+
+
+def measure(events: list, fmt: str, encoding: str) -> dict:
+    from backend.wire import StreamCompressor, render
+
+    z = StreamCompressor(encoding)
+    parts, samples, raw = [], [], []
+    for cev, data in events:
+        t0 = time.perf_counter()
+        frame = render(fmt, cev, data)
+        chunk = z.feed(frame)
+        samples.append((time.perf_counter() - t0) * 1e6)
+        raw.append(frame)
+        parts.append(chunk)
+    parts.append(z.finish())
+    wire = b"".join(parts)
+    plain = b"".join(raw)
+    if encoding != "identity":
+        wbits = 31 if encoding == "gzip" else 15
+        assert zlib.decompress(wire, wbits) == plain, "round-trip mismatch"
+    if fmt == "msgpack":
+        assert [r["data"]["seq"] for r in _unframe_msgpack(plain)] == [c.get("seq") for c, _ in events]
+    samples.sort()
+    return {
+        "bytes": len(wire),
+        "encode_p50_us": round(samples[len(samples) // 2], 1),
+        "encode_total_ms": round(sum(samples) / 1000, 2),
+    }
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--chunks", type=int, default=1000, help="합성 STATE_CHECKPOINT 의 pdf_chunks 개수")
+    ap.add_argument("--progress", type=int, default=200, help="합성: parse/embed 노드별 진행 OBS 개수")
+    ap.add_argument("--log", nargs="*", default=None, help="이벤트 로그(.events.jsonl) 경로/글롭")
+    ap.add_argument("--json-out", default=None)
+    args = ap.parse_args()
+
+    sys.path.insert(0, str(ROOT))
+    logs = [os.path.abspath(p) for p in args.log] if args.log else None
+    with tempfile.TemporaryDirectory() as workdir:
+        # settings 가 cwd 기준으로 storage/ 를 만들므로 임시 작업 디렉터리에서 import
+        os.chdir(workdir)
+        events = load_logs(logs) if logs else synth_run(args.chunks, args.progress)
+        if not events:
+            print("no events", file=sys.stderr)
+            return 1
+        results = {}
+        for fmt in FORMATS:
+            for enc in ENCODINGS:
+                results[f"{fmt}+{enc}"] = measure(events, fmt, enc)
+        base = results["sse+identity"]["bytes"]
+        for r in results.values():
+            r["vs_json"] = round(r["bytes"] / base, 3)
+        whole = zlib.compress(b"".join(r[1] for r in events), 6)
+        for k, r in results.items():
+            print(f"[{k}] {json.dumps(r)}", file=sys.stderr)
+
+    report = {
+        "benchmark": "sse_encoding",
+        "source": "log" if logs else {"chunks": args.chunks, "progress": args.progress},
+        "events": len(events),
+        "results": results,
+        "reference_unflushed_zlib_bytes": len(whole),
+    }
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
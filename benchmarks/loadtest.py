@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+HTTP/SSE 동시 실행 부하 테스트: 실제 FastAPI 앱을 종단 간으로 구동.
+
+사용 예시:
+    python -m benchmarks.loadtest --concurrency 1 4 8 --runs 16 --json-out loadtest.json
+    python -m benchmarks.loadtest --base-url http://127.0.0.1:8000 --concurrency 4   # 이미 떠 있는 서버
+
+동작 요약:
+ 1) (기본) 임시 작업 디렉터리에 합성 예산서(benchmarks.synth)를 깔고
+    OpenAI 호환 로컬 스텁(benchmarks.stubs)과 uvicorn 으로 backend.app 을 별도 프로세스로 띄움
+    (OPENAI_BASE_URL=스텁, EVENT_PACING_S=0, 메모이제이션 끔 — 매 실행이 실제로 노드를 돈다)
+ 2) 동시성 단계별로 가상 사용자 C명이 총 N건을 닫힌 루프로 실행:
+    PDF 업로드 → /workflows/quickstart → /pipeline/execute → SSE 구독
+    → WAITING_HITL 이면 /runs/{id}/continue 자동 승인 → 스트림 종료까지
+ 3) 실행 지연(execute~마지막 이벤트) p50/p90/p99, 첫 이벤트까지 시간(TTFE), 단계별 HTTP 지연,
+    이벤트 처리량, 실행 처리량, 오류율(원인별), 서버 peak RSS 를 JSON 으로 출력
+사용자는 가상 사용자별로 다르게(user=load-N) 보내므로 RUN_USER_MAX 가 아니라 RUN_WORKERS 가 상한이 된다.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _pct(samples: List[float], q: float) -> Optional[float]:
+    if not samples:
+        return None
+    s = sorted(samples)
+    return round(s[min(len(s) - 1, int(len(s) * q))], 4)
+
+
+def _dist(samples: List[float]) -> dict:
+    return {
+        "n": len(samples),
+        "p50": _pct(samples, 0.5),
+        "p90": _pct(samples, 0.9),
+        "p99": _pct(samples, 0.99),
+        "max": round(max(samples), 4) if samples else None,
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _vm_hwm_mb(pid: int) -> Optional[float]:
+    """프로세스 peak RSS(VmHWM, Linux). 없으면 None."""
+    try:
+        with open(f"/proc/{pid}/status", "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+# ---------- 서버 준비 ----------
+def start_server(workdir: str, tier: str, openai_url: str, args) -> subprocess.Popen:
+    from benchmarks.synth import TIERS, make_frames, write_pdf, write_xlsx
+
+    size = TIERS[tier]
+    frames = make_frames(size["depts"], size["rows"])
+    # quickstart 는 storage/splits/ 아래 가장 최근 디렉터리의 XLSX 를 쓴다
+    write_xlsx(frames, os.path.join(workdir, "storage", "splits", "synth"))
+    write_pdf(frames, size["pages"], os.path.join(workdir, "budget.pdf"))
+
+    env = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")])),
+        "OPENAI_BASE_URL": openai_url,
+        "OPENAI_API_KEY": "stub",
+        "EVENT_PACING_S": str(args.pacing),
+        "MEMO_ENABLED": "1" if args.memo else "0",
+    }
+    if args.workers:
+        env["RUN_WORKERS"] = str(args.workers)
+    proc = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "backend.app:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(args.port),
+            "--log-level",
+            "warning",
+        ],
+        cwd=workdir,
+        env=env,
+    )
+    return proc
+
+
+async def wait_ready(client, base: str, proc: Optional[subprocess.Popen], timeout_s: float = 60):
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        if proc is not None and proc.poll() is not None:
+            raise RuntimeError(f"server exited with {proc.returncode}")
+        try:
+            r = await client.get(f"{base}/metrics")
+            if r.status_code == 200:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("server did not become ready")
+
+
+# ---------- 가상 사용자 ----------
+async def one_run(client, base: str, pdf: bytes, user: str, engine: str, timeout_s: float) -> dict:
+    rec: Dict = {"user": user, "ok": False, "events": 0, "steps": {}}
+
+    async def step(name: str, coro):
+        t0 = time.perf_counter()
+        r = await coro
+        rec["steps"][name] = time.perf_counter() - t0
+        if r.status_code >= 400:
+            raise RuntimeError(f"{name} HTTP {r.status_code}")
+        return r.json()
+
+    t_start = time.perf_counter()
+    try:
+        await step(
+            "upload",
+            client.post(f"{base}/files/upload", files={"files": ("budget.pdf", pdf, "application/pdf")}),
+        )
+        wf = await step("quickstart", client.post(f"{base}/workflows/quickstart"))
+        t_exec = time.perf_counter()
+        run = await step(
+            "execute",
+            client.post(
+                f"{base}/pipeline/execute",
+                json={"workflowId": wf["id"], "engine": engine, "user": user},
+            ),
+        )
+        rec["runId"] = run_id = run["runId"]
+
+        approvals = []
+        async with client.stream("GET", f"{base}/runs/{run_id}/events", timeout=timeout_s) as r:
+            if r.status_code >= 400:
+                raise RuntimeError(f"events HTTP {r.status_code}")
+            async for line in r.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                now = time.perf_counter()
+                if rec["events"] == 0:
+                    rec["ttfe_s"] = now - t_exec
+                rec["events"] += 1
+                ev = json.loads(line[5:])
+                if ev.get("type") == "SUMMARY" and ev.get("nodeId") == "runtime":
+                    rec["fail_message"] = ev.get("message")  # 실패/취소 사유
+                if ev.get("nodeId") == "hitl" and ev.get("message") == "WAITING_HITL":
+                    rec["hitl_wait_from"] = now
+                    approvals.append(
+                        asyncio.ensure_future(
+                            step(
+                                "continue",
+                                client.post(f"{base}/runs/{run_id}/continue", json={"approve": True}),
+                            )
+                        )
+                    )
+                elif "hitl_wait_from" in rec and "hitl_resume_s" not in rec:
+                    rec["hitl_resume_s"] = now - rec.pop("hitl_wait_from")
+        rec["run_s"] = time.perf_counter() - t_exec
+        for a in approvals:
+            await a
+        status = (await client.get(f"{base}/runs/{run_id}")).json().get("status")
+        rec["status"] = status
+        rec["ok"] = status == "SUCCEEDED"
+        if not rec["ok"]:
+            # 원인별 집계가 되도록 사유 앞부분만
+            rec["error"] = f"{status}: {(rec.get('fail_message') or '')[:80]}".rstrip(": ")
+    except Exception as e:
+        rec["error"] = f"{e.__class__.__name__}: {e}" if str(e) else e.__class__.__name__
+    rec.pop("hitl_wait_from", None)
+    rec["total_s"] = time.perf_counter() - t_start
+    return rec
+
+
+async def run_stage(base: str, pdf: bytes, concurrency: int, n_runs: int, engine: str, timeout_s: float, proc) -> dict:
+    import httpx
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(n_runs):
+        queue.put_nowait(i)
+    records: List[dict] = []
+    limits = httpx.Limits(max_connections=concurrency * 3 + 4)
+
+    async def vuser(k: int, client):
+        while True:
+            try:
+                queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            records.append(await one_run(client, base, pdf, f"load-{k}", engine, timeout_s))
+
+    async with httpx.AsyncClient(timeout=timeout_s, limits=limits) as client:
+        t0 = time.perf_counter()
+        await asyncio.gather(*(vuser(k, client) for k in range(concurrency)))
+        wall = time.perf_counter() - t0
+
+    ok = [r for r in records if r["ok"]]
+    events = sum(r["events"] for r in records)
+    steps: Dict[str, List[float]] = {}
+    for r in records:
+        for k, v in r["steps"].items():
+            steps.setdefault(k, []).append(v)
+    return {
+        "concurrency": concurrency,
+        "runs": len(records),
+        "succeeded": len(ok),
+        "error_rate": round(1 - len(ok) / len(records), 4) if records else None,
+        "errors": dict(Counter(r["error"] for r in records if r.get("error"))),
+        "wall_s": round(wall, 3),
+        "runs_per_min": round(len(ok) / wall * 60, 2) if wall else None,
+        "events": events,
+        "events_per_s": round(events / wall, 1) if wall else None,
+        "run_latency_s": _dist([r["run_s"] for r in ok]),
+        "ttfe_s": _dist([r["ttfe_s"] for r in records if "ttfe_s" in r]),
+        "hitl_resume_s": _dist([r["hitl_resume_s"] for r in ok if "hitl_resume_s" in r]),
+        "http_s": {k: _dist(v) for k, v in steps.items()},
+        "server_peak_rss_mb": _vm_hwm_mb(proc.pid) if proc is not None else None,
+    }
+
+
+async def amain(args) -> dict:
+    import httpx
+    from benchmarks.stubs import start_openai_stub
+
+    report: dict = {
+        "benchmark": "loadtest",
+        "engine": args.engine,
+        "tier": args.tier,
+        "stages": [],
+    }
+    with tempfile.TemporaryDirectory(prefix="loadtest-") as tmp:
+        stub = proc = None
+        if args.base_url:
+            base = args.base_url.rstrip("/")
+            if not args.pdf:
+                raise SystemExit("--base-url 사용 시 업로드할 --pdf 가 필요합니다(서버에 splits XLSX 가 있어야 함)")
+            pdf_path = args.pdf
+        else:
+            stub, openai_url = start_openai_stub(latency_s=args.stub_latency_ms / 1000)
+            args.port = args.port or _free_port()
+            base = f"http://127.0.0.1:{args.port}"
+            proc = start_server(tmp, args.tier, openai_url, args)
+            pdf_path = args.pdf or os.path.join(tmp, "budget.pdf")
+            report["server"] = {
+                "pacing_s": args.pacing,
+                "memo": args.memo,
+                "run_workers": args.workers or "default",
+                "stub_latency_ms": args.stub_latency_ms,
+            }
+        with open(pdf_path, "rb") as f:
+            pdf = f.read()
+        try:
+            async with httpx.AsyncClient(timeout=10) as client:
+                await wait_ready(client, base, proc)
+            for c in args.concurrency:
+                n = args.runs or c * 2
+                stage = await run_stage(base, pdf, c, n, args.engine, args.timeout, proc)
+                report["stages"].append(stage)
+                lat = stage["run_latency_s"]
+                print(
+                    f"[c={c:>3}] runs={stage['runs']} ok={stage['succeeded']} "
+                    f"p50={lat['p50']}s p99={lat['p99']}s ttfe_p50={stage['ttfe_s']['p50']}s "
+                    f"{stage['runs_per_min']} runs/min {stage['events_per_s']} ev/s "
+                    f"errors={stage['errors']}",
+                    file=sys.stderr,
+                )
+        finally:
+            if proc is not None:
+                proc.terminate()
+                try:
+                    proc.wait(10)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+            if stub is not None:
+                stub.shutdown()
+    return report
+
+
+def main() -> int:
+    from benchmarks.synth import TIERS
+
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8], help="단계별 동시 가상 사용자 수")
+    ap.add_argument("--runs", type=int, default=None, help="단계별 총 실행 수(기본: 동시성 x 2)")
+    ap.add_argument("--engine", default="lg", choices=["lg", "seq"])
+    ap.add_argument("--tier", default="small", choices=list(TIERS), help="합성 입력 규모")
+    ap.add_argument("--timeout", type=float, default=600, help="실행 1건 최대 대기(초)")
+    ap.add_argument("--base-url", default=None, help="이미 떠 있는 서버(스텁/합성 데이터 준비는 직접)")
+    ap.add_argument("--pdf", default=None, help="업로드할 PDF (기본: 합성 PDF)")
+    ap.add_argument("--port", type=int, default=None)
+    ap.add_argument("--workers", type=int, default=None, help="서버 RUN_WORKERS (기본: 서버 기본값)")
+    ap.add_argument("--pacing", type=float, default=0.0, help="서버 EVENT_PACING_S")
+    ap.add_argument("--memo", action="store_true", help="서버 노드 메모이제이션 유지")
+    ap.add_argument("--stub-latency-ms", type=float, default=0.0, help="OpenAI 스텁 응답 지연")
+    ap.add_argument("--json-out", default=None)
+    args = ap.parse_args()
+
+    sys.path.insert(0, str(ROOT))
+    report = asyncio.run(amain(args))
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 0 if all(s["error_rate"] == 0 for s in report["stages"]) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+"""
+벤치마크용 로컬 스텁 (네트워크/과금 없이 실행 경로 재현).
+
+- HashEmbedder: OpenAIEmbedder 대체. 글자 2-gram 해시 → 고정 차원 단위 벡터(결정적).
+  같은 부서명이 들어간 질의/청크끼리 가깝게 나오므로 validate 의 벡터 검색이 의미 있는 결과를 낸다.
+- OpenAI 호환 HTTP 스텁: /v1/embeddings, /v1/chat/completions.
+  서버 프로세스에 OPENAI_BASE_URL=http://host:port/v1 을 주면 SDK 호출이 여기로 온다(부하 테스트용).
+
+단독 실행:
+    python -m benchmarks.stubs --port 8089 --latency-ms 50
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import math
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Tuple
+
+EMBED_DIM = 256
+
+
+def hash_embedding(text: str, dim: int = EMBED_DIM) -> List[float]:
+    vec = [0.0] * dim
+    s = text or " "
+    for i in range(max(len(s) - 1, 1)):
+        h = hashlib.blake2b(s[i : i + 2].encode("utf-8"), digest_size=4).digest()
+        n = int.from_bytes(h, "little")
+        vec[n % dim] += 1.0 if n & 0x80000000 else -1.0
+    norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+    return [v / norm for v in vec]
+
+
+class HashEmbedder:
+    """backend.vectorstore.OpenAIEmbedder 와 같은 생성자/메서드 시그니처."""
+
+    def __init__(self, api_key=None, model: str = "stub"):
+        self.model = model
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        return [hash_embedding(t) for t in texts]
+
+
+def install_stub_embedder():
+    """이 프로세스의 ChromaVS 가 OpenAI 대신 HashEmbedder 를 쓰게 한다."""
+    from backend import vectorstore
+
+    vectorstore.OpenAIEmbedder = HashEmbedder
+
+
+# ---------- OpenAI 호환 HTTP 스텁 ----------
+STUB_REPLY = "검증 결과 요약(스텁): PDF 파싱, 부서별 XLSX 병합, exists/sum_check 검증을 마쳤습니다."
+
+
+def _tokens(texts: List[str]) -> int:
+    # 대략치(한글 1자 ≈ 1토큰) — 과금 지표 경로만 태우면 된다
+    return sum(max(1, len(t)) for t in texts)
+
+
+class _OpenAIStubHandler(BaseHTTPRequestHandler):
+    latency_s = 0.0
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):  # 요청 로그 생략
+        pass
+
+    def _send(self, code: int, body: dict):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        n = int(self.headers.get("Content-Length") or 0)
+        req = json.loads(self.rfile.read(n) or b"{}")
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        path = self.path.rstrip("/")
+        if path.endswith("/embeddings"):
+            texts = req.get("input") or []
+            if isinstance(texts, str):
+                texts = [texts]
+            b64 = req.get("encoding_format") == "base64"
+            data = []
+            for i, t in enumerate(texts):
+                vec = hash_embedding(str(t))
+                if b64:  # SDK 기본값: float32 little-endian base64
+                    vec = base64.b64encode(struct.pack(f"<{len(vec)}f", *vec)).decode()
+                data.append({"object": "embedding", "index": i, "embedding": vec})
+            tok = _tokens([str(t) for t in texts])
+            self._send(
+                200,
+                {
+                    "object": "list",
+                    "data": data,
+                    "model": req.get("model", "stub"),
+                    "usage": {"prompt_tokens": tok, "total_tokens": tok},
+                },
+            )
+        elif path.endswith("/chat/completions"):
+            prompt = _tokens([str(m.get("content", "")) for m in req.get("messages") or []])
+            done = _tokens([STUB_REPLY])
+            self._send(
+                200,
+                {
+                    "id": "chatcmpl-stub",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": req.get("model", "stub"),
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": STUB_REPLY},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                    "usage": {
+                        "prompt_tokens": prompt,
+                        "completion_tokens": done,
+                        "total_tokens": prompt + done,
+                    },
+                },
+            )
+        else:
+            self._send(404, {"error": {"message": f"stub: unknown path {self.path}"}})
+
+
+def start_openai_stub(
+    host: str = "127.0.0.1", port: int = 0, latency_s: float = 0.0
+) -> Tuple[ThreadingHTTPServer, str]:
+    """백그라운드 스레드에서 스텁 서버 기동 → (server, base_url). 종료는 server.shutdown()."""
+    handler = type("OpenAIStubHandler", (_OpenAIStubHandler,), {"latency_s": latency_s})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="openai-stub", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+def main():
+    ap = argparse.ArgumentParser(description="OpenAI-compatible local stub (embeddings, chat)")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8089)
+    ap.add_argument("--latency-ms", type=float, default=0.0, help="요청당 인위적 지연")
+    args = ap.parse_args()
+    server, url = start_openai_stub(args.host, args.port, args.latency_ms / 1000)
+    print(f"OPENAI_BASE_URL={url}", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+벤치마크용 합성 예산서 생성기 (PDF + 부서별 XLSX).
+
+사용 예시:
+    python -m benchmarks.synth --tier medium --outdir /tmp/budget
+    python -m benchmarks.synth --pages 300 --depts 50 --rows 400 --outdir /tmp/budget
+
+생성물:
+ - budget.pdf     : 페이지마다 부서 하나의 세부사업 표 + "합계" 행 (한글 본문, PyMuPDF 내장 'korea' 폰트)
+ - splits/*.xlsx  : storage/splits 와 같은 형태(시트 '데이터', 문자열 8열 + 정수 10열)의 부서별 파일
+부서별 예산액 합계를 PDF 합계 행에 그대로 적으므로 validate_with_pdf 의 exists/sum_check 가 실제 경로를 탄다.
+같은 인자 + seed 면 항상 같은 파일이 나온다(릴리스 간 비교용).
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+from typing import Dict, List
+
+# 규모 단계: pages(PDF 쪽수) / depts(XLSX 파일 수) / rows(부서당 행 수)
+TIERS: Dict[str, Dict[str, int]] = {
+    "small": {"pages": 20, "depts": 8, "rows": 50},
+    "medium": {"pages": 200, "depts": 40, "rows": 250},
+    "large": {"pages": 1000, "depts": 80, "rows": 1000},
+}
+
+_DEPT_BASES = [
+    "가족복지", "건강증진", "건축", "감염병관리", "기획예산", "교통행정", "도시계획", "문화체육",
+    "보건행정", "복지정책", "산림녹지", "세무", "안전총괄", "여성보육", "일자리경제", "자원순환",
+    "재난안전", "정보통신", "주택", "청소행정", "토지정보", "평생교육", "환경정책", "회계",
+]
+_ITEMS = ["민간위탁금", "사회복지사업보조", "일반운영비", "시설비", "자치단체등이전", "행사운영비"]
+_NUM_COLS = ["예산액", "기정액", "비교증감", "국비", "시도비", "시군구비", "기금", "기타", "지방채", "자체"]
+
+
+def dept_names(n: int) -> List[str]:
+    out = []
+    for i in range(n):
+        base = _DEPT_BASES[i % len(_DEPT_BASES)]
+        out.append(f"{base}과" if i < len(_DEPT_BASES) else f"{base}{i // len(_DEPT_BASES) + 1}과")
+    return out
+
+
+def make_frames(depts: int, rows: int, seed: int = 42):
+    """부서명 → DataFrame(storage/splits 와 같은 18열)."""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    frames = {}
+    for d, dept in enumerate(dept_names(depts)):
+        idx = np.arange(rows)
+        data = {
+            "회계연도": np.full(rows, 2025),
+            "예산구분": ["추경3회"] * rows,
+            "회계": ["일반회계"] * rows,
+            "부서명": [dept] * rows,
+            "세부사업": [f"{dept} 세부사업 {i % 97 + 1}" for i in idx],
+            "통계목코드": [f"{301 + (i + d) % 9}-{i % 12:02d}" for i in idx],
+            "통계목": [_ITEMS[(i + d) % len(_ITEMS)] for i in idx],
+            "산출근거": [f"○{dept} 사업 산출근거 {i + 1}" for i in idx],
+        }
+        for col in _NUM_COLS:
+            data[col] = rng.integers(-500_000, 5_000_000, size=rows)
+        frames[dept] = pd.DataFrame(data)
+    return frames
+
+
+def write_xlsx(frames, outdir: str) -> List[str]:
+    import pandas as pd
+
+    os.makedirs(outdir, exist_ok=True)
+    paths = []
+    for dept, df in frames.items():
+        path = os.path.join(outdir, f"{dept}.xlsx")
+        with pd.ExcelWriter(path, engine="openpyxl") as w:
+            df.to_excel(w, index=False, sheet_name="데이터")
+        paths.append(path)
+    return paths
+
+
+def write_pdf(frames, pages: int, path: str, lines_per_page: int = 55) -> int:
+    """페이지 i 는 부서 (i % 부서수) 의 표 일부 + 부서 합계. 부서 표는 페이지를 넘기며 이어진다."""
+    import fitz  # PyMuPDF
+
+    depts = list(frames)
+    cursor = {d: 0 for d in depts}
+    doc = fitz.open()
+    for p in range(pages):
+        dept = depts[p % len(depts)]
+        df = frames[dept]
+        total = int(df["예산액"].sum())
+        start = cursor[dept]
+        part = df.iloc[start : start + lines_per_page]
+        cursor[dept] = (start + lines_per_page) % max(len(df), 1)
+        lines = [
+            "2025년도 제3회 일반 및 기타특별회계 추가경정 예산서",
+            f"{dept} 부서 예산 총괄 표  (단위: 천원)",
+            "세부사업 | 통계목 | 예산액 | 기정액 | 비교증감",
+        ]
+        for r in part.itertuples(index=False):
+            lines.append(f"{r.세부사업} | {r.통계목} | {r.예산액:,} | {r.기정액:,} | {r.비교증감:,}")
+        lines.append(f"{dept} 합계 {total:,}")
+        page = doc.new_page()  # A4
+        page.insert_text((36, 40), "\n".join(lines), fontname="korea", fontsize=7)
+    doc.save(path, garbage=3, deflate=True)
+    doc.close()
+    return pages
+
+
+def make_budget_books(outdir: str, pages: int, depts: int, rows: int, seed: int = 42) -> Dict:
+    """합성 예산서 한 벌 생성 → {"pdf", "xlsx": [...], 규모}."""
+    os.makedirs(outdir, exist_ok=True)
+    frames = make_frames(depts, rows, seed)
+    xlsx = write_xlsx(frames, os.path.join(outdir, "splits"))
+    pdf = os.path.join(outdir, "budget.pdf")
+    write_pdf(frames, pages, pdf)
+    return {
+        "pdf": pdf,
+        "xlsx": xlsx,
+        "pages": pages,
+        "depts": depts,
+        "rows": depts * rows,
+        "pdf_bytes": os.path.getsize(pdf),
+        "xlsx_bytes": sum(os.path.getsize(p) for p in xlsx),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="synthetic budget books (PDF + per-department XLSX)")
+    ap.add_argument("--tier", choices=list(TIERS), default="small")
+    ap.add_argument("--pages", type=int, default=None)
+    ap.add_argument("--depts", type=int, default=None)
+    ap.add_argument("--rows", type=int, default=None, help="부서당 행 수")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--outdir", required=True)
+    args = ap.parse_args()
+
+    size = dict(TIERS[args.tier])
+    for k in ("pages", "depts", "rows"):
+        if getattr(args, k) is not None:
+            size[k] = getattr(args, k)
+    info = make_budget_books(str(Path(args.outdir).resolve()), seed=args.seed, **size)
+    info["xlsx"] = len(info["xlsx"])
+    print(json.dumps(info, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
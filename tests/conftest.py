@@ -0,0 +1,16 @@
+"""
+backend.settings 는 import 시점의 cwd 아래에 storage/, chroma/ 를 만든다.
+테스트는 세션 전용 임시 디렉터리에서 import 해 저장소의 storage/ 를 건드리지 않는다.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+WORKDIR = tempfile.mkdtemp(prefix="backend-tests-")
+
+os.chdir(WORKDIR)
+os.environ.setdefault("EVENT_PACING_S", "0")
+sys.path.insert(0, str(ROOT))
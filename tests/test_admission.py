@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from backend.admission import AdmissionController
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def _start(ac, run_id, user="u", priority=0, positions=None):
+    async def on_position(pos):
+        if positions is not None:
+            positions.setdefault(run_id, []).append(pos)
+
+    task = asyncio.create_task(ac.acquire(run_id, user, priority, on_position))
+    await asyncio.sleep(0)
+    return task
+
+
+def test_global_cap_and_fifo_order():
+    async def main():
+        ac = AdmissionController(max_global=2, max_per_user=10)
+        positions = {}
+        tasks = {r: await _start(ac, r, user=r, positions=positions) for r in ("a", "b", "c", "d")}
+        assert tasks["a"].done() and tasks["b"].done()
+        assert ac.stats() == {"running": 2, "queued": 2}
+        assert (ac.position("c"), ac.position("d")) == (1, 2)
+        ac.release("a")
+        await asyncio.sleep(0)
+        assert await tasks["c"] and not tasks["d"].done()
+        assert positions["d"] == [2, 1]  # 순번이 바뀔 때마다 통지
+        ac.release("b")
+        assert await tasks["d"]
+        assert ac.stats() == {"running": 2, "queued": 0}
+
+    run(main())
+
+
+def test_per_user_cap_skips_blocked_head():
+    async def main():
+        ac = AdmissionController(max_global=3, max_per_user=1)
+        t1 = await _start(ac, "u1-a", user="u1")
+        t2 = await _start(ac, "u1-b", user="u1")  # u1 상한 → 대기
+        t3 = await _start(ac, "u2-a", user="u2")  # 앞 사람이 막혀 있어도 수락
+        assert t1.done() and t3.done() and not t2.done()
+        ac.release("u1-a")
+        assert await t2
+
+    run(main())
+
+
+def test_priority_policy():
+    async def main():
+        ac = AdmissionController(max_global=1, max_per_user=10, policy="priority")
+        await _start(ac, "first", user="a")
+        low = await _start(ac, "low", user="b", priority=0)
+        high = await _start(ac, "high", user="c", priority=5)
+        assert ac.position("high") == 1 and ac.position("low") == 2
+        ac.release("first")
+        assert await high and not low.done()
+        ac.release("high")
+        assert await low
+
+    run(main())
+
+
+def test_withdraw_and_cancel_while_queued():
+    async def main():
+        ac = AdmissionController(max_global=1, max_per_user=10)
+        await _start(ac, "run", user="a")
+        w = await _start(ac, "withdrawn", user="b")
+        c = await _start(ac, "cancelled", user="c")
+        last = await _start(ac, "last", user="d")
+        assert ac.withdraw("withdrawn") and not ac.withdraw("withdrawn")
+        assert await w is False
+        c.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await c
+        assert ac.position("last") == 1
+        ac.release("run")
+        assert await last
+        assert await ac.acquire("last")  # 이미 실행 중이면 즉시 True
+        assert ac.stats() == {"running": 1, "queued": 0}
+
+    run(main())
@@ -0,0 +1,159 @@
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app import app
+from backend.artifacts import ARTIFACT_FORMATS, artifact_path
+
+BODY = bytes(range(256)) * 40  # 10240 bytes
+
+
+@pytest.fixture(scope="module")
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture(scope="module")
+def art_id():
+    aid = "test-range-artifact"
+    path = artifact_path(aid, "xlsx")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(BODY)
+    return aid
+
+
+def get(client, art_id, **headers):
+    return client.get(f"/artifacts/{art_id}", headers=headers)
+
+
+def test_full_response_has_validators(client, art_id):
+    r = get(client, art_id)
+    assert r.status_code == 200
+    assert r.content == BODY
+    assert r.headers["etag"].startswith('"') and len(r.headers["etag"]) == 66
+    assert r.headers["accept-ranges"] == "bytes"
+    assert r.headers["content-type"] == ARTIFACT_FORMATS["xlsx"][1]
+
+
+def test_if_none_match_returns_304(client, art_id):
+    etag = get(client, art_id).headers["etag"]
+    r = get(client, art_id, **{"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.content == b""
+    assert r.headers["etag"] == etag
+    assert get(client, art_id, **{"If-None-Match": f"W/{etag}"}).status_code == 304
+    assert get(client, art_id, **{"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_if_modified_since_returns_304(client, art_id):
+    lm = get(client, art_id).headers["last-modified"]
+    assert get(client, art_id, **{"If-Modified-Since": lm}).status_code == 304
+
+
+@pytest.mark.parametrize(
+    "spec, start, end",
+    [("bytes=0-99", 0, 100), ("bytes=10000-", 10000, 10240), ("bytes=-40", 10200, 10240), ("bytes=10200-99999", 10200, 10240)],
+)
+def test_single_range_returns_206(client, art_id, spec, start, end):
+    r = get(client, art_id, Range=spec)
+    assert r.status_code == 206
+    assert r.content == BODY[start:end]
+    assert r.headers["content-range"] == f"bytes {start}-{end - 1}/{len(BODY)}"
+    assert r.headers["content-length"] == str(end - start)
+    assert "attachment" in r.headers["content-disposition"]
+
+
+def test_multi_range_is_ignored(client, art_id):
+    r = get(client, art_id, Range="bytes=0-9,100-109")
+    assert r.status_code == 200
+    assert r.content == BODY and "content-range" not in r.headers
+
+
+def test_unsatisfiable_range_returns_416(client, art_id):
+    r = get(client, art_id, Range="bytes=99999-")
+    assert r.status_code == 416
+    assert r.headers["content-range"] == f"bytes */{len(BODY)}"
+
+
+def test_malformed_range_is_ignored(client, art_id):
+    for spec in ("bytes=5-2", "items=0-5", "bytes=abc", "bytes=-", "bytes=--5"):
+        r = get(client, art_id, Range=spec)
+        assert r.status_code == 200 and r.content == BODY
+
+
+def test_parse_range():
+    from backend.artifacts import RangeNotSatisfiable, parse_range
+
+    assert parse_range("bytes=0-0", 10) == (0, 0)
+    assert parse_range("Bytes = 3 - ", 10) == (3, 9)
+    assert parse_range("bytes=-99", 10) == (0, 9)
+    assert parse_range(None, 10) is None and parse_range("bytes=+1-2", 10) is None
+    for spec, size in (("bytes=10-", 10), ("bytes=-0", 10), ("bytes=-5", 0)):
+        with pytest.raises(RangeNotSatisfiable):
+            parse_range(spec, size)
+
+
+def test_content_disposition_quotes_non_ascii_names():
+    from backend.artifacts import content_disposition
+
+    assert content_disposition("report.xlsx") == 'attachment; filename="report.xlsx"'
+    assert content_disposition("예산.xlsx") == "attachment; filename*=utf-8''%EC%98%88%EC%82%B0.xlsx"
+
+
+def test_if_range_with_current_validator_returns_206(client, art_id):
+    full = get(client, art_id)
+    for validator in (full.headers["etag"], full.headers["last-modified"]):
+        r = get(client, art_id, Range="bytes=0-9", **{"If-Range": validator})
+        assert r.status_code == 206
+        assert r.content == BODY[:10]
+
+
+def test_if_range_with_stale_validator_returns_full_body(client, art_id):
+    r = get(client, art_id, Range="bytes=0-9", **{"If-Range": '"stale-etag"'})
+    assert r.status_code == 200
+    assert r.content == BODY
+
+
+def test_unknown_artifact_and_format(client, art_id):
+    assert client.get("/artifacts/nope").status_code == 404
+    assert client.get(f"/artifacts/{art_id}?format=pdf").status_code == 406
+
+
+def test_content_hash_same_for_frame_and_parquet(tmp_path):
+    import pandas as pd
+
+    from backend.artifacts import content_hash, write_frame_parquet
+    from backend.engine import _iter_row_batches
+
+    df = pd.DataFrame({"부서": ["가", "나", None], "금액": [1.5, None, 3.0], "비고": [1, "x", None]})
+    path = str(tmp_path / "merged.parquet")
+    write_frame_parquet(df, path)  # 혼합 컬럼(비고)은 문자열로 저장됨
+    cfg = {"writer": "streaming", "sheet_name": "merged"}
+    a = content_hash(*_iter_row_batches(df, 2), cfg)
+    assert a == content_hash(*_iter_row_batches(path, 1), cfg)
+    assert a != content_hash(*_iter_row_batches(df.iloc[:2], 2), cfg)
+    assert a != content_hash(*_iter_row_batches(df, 2), {**cfg, "writer": "pandas"})
+
+
+def test_export_writes_extra_formats_lazily(tmp_path):
+    import pandas as pd
+
+    from backend.artifacts import blob_path, ensure_format, load_meta
+    from backend.engine import Ctx, node_export_xlsx
+
+    df = pd.DataFrame({"부서": ["가", "나"], "금액": [1, 2]})
+    ctx = Ctx("lazyfmt-0001", str(tmp_path), str(tmp_path))
+    out = node_export_xlsx({"formats": []}, {"merge_xlsx": {"merged_table": df}}, ctx)
+    meta = load_meta(out["artifact_id"], str(tmp_path))
+    assert meta["formats"] == ["xlsx"]
+    assert not os.path.exists(blob_path(meta["content_hash"], "parquet", str(tmp_path)))
+
+    csv = ensure_format(out["artifact_id"], "csv", str(tmp_path))
+    assert pd.read_csv(csv).equals(df)
+
+    ctx = Ctx("lazyfmt-0002", str(tmp_path), str(tmp_path))
+    out = node_export_xlsx({"formats": ["parquet"]}, {"merge_xlsx": {"merged_table": df}}, ctx)
+    assert load_meta(out["artifact_id"], str(tmp_path))["formats"] == ["xlsx", "parquet"]
+    assert out["artifact_reused"]  # 같은 데이터 → 같은 xlsx blob
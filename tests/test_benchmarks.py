@@ -0,0 +1,78 @@
+import json
+import math
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks.bench_pipeline import _compare
+from benchmarks.stubs import hash_embedding
+from benchmarks.synth import make_budget_books, make_frames
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_synth_is_deterministic(tmp_path):
+    a = make_frames(depts=3, rows=5, seed=7)
+    b = make_frames(depts=3, rows=5, seed=7)
+    assert list(a) == list(b) and len(a) == 3
+    assert all(a[k].equals(b[k]) for k in a)
+    assert not a[next(iter(a))].equals(make_frames(depts=3, rows=5, seed=8)[next(iter(a))])
+    books = make_budget_books(str(tmp_path), pages=2, depts=3, rows=5)
+    assert len(books["xlsx"]) == 3 and books["rows"] == 15 and books["pdf_bytes"] > 0
+
+
+def test_hash_embedding_is_unit_and_stable():
+    v = hash_embedding("가족복지과 예산")
+    assert v == hash_embedding("가족복지과 예산")
+    assert math.isclose(sum(x * x for x in v), 1.0, rel_tol=1e-9)
+
+
+def test_compare_flags_regressions_over_threshold():
+    base = {"results": [{"tier": "small", "target": "seq", "wall_s": 1.0, "peak_rss_mb": 100}]}
+    cur = [{"tier": "small", "target": "seq", "wall_s": 1.3, "peak_rss_mb": 110}]
+    regs = _compare(cur, base, 0.2)
+    assert [(r["metric"], r["ratio"]) for r in regs] == [("wall_s", 1.3)]
+    assert _compare(cur, base, 0.5) == []
+    assert _compare([{**cur[0], "target": "lg"}], base, 0.0) == []
+
+
+def test_pipeline_benchmark_runs_offline(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(
+        json.dumps({"results": [{"tier": "small", "target": "seq", "wall_s": 0.001, "peak_rss_mb": 1}]}),
+        encoding="utf-8",
+    )
+    out = tmp_path / "report.json"
+    proc = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_pipeline", "--tiers", "small", "--targets", "seq",
+         "--json-out", str(out), "--baseline", str(baseline)],
+        cwd=str(ROOT), capture_output=True, text=True, timeout=300,
+    )
+    assert proc.returncode == 1, proc.stderr[-2000:]  # 터무니없이 빠른 기준치 → 회귀
+    report = json.loads(out.read_text(encoding="utf-8"))
+    (r,) = report["results"]
+    assert r["target"] == "seq" and r["wall_s"] > 0
+    assert set(r["nodes"]) == {"parse_pdf", "embed_pdf", "merge_xlsx", "validate", "export"}
+    assert {x["metric"] for x in report["regressions"]} == {"wall_s", "peak_rss_mb"}
+
+
+def test_pct_and_dist():
+    from benchmarks.loadtest import _dist, _pct
+
+    samples = [float(i) for i in range(1, 101)]
+    assert _pct(samples, 0.5) == 51.0 and _pct(samples, 0.99) == 100.0
+    assert _pct([], 0.5) is None
+    assert _dist([]) == {"n": 0, "p50": None, "p90": None, "p99": None, "max": None}
+
+
+def test_loadtest_runs_concurrent_hitl_runs(tmp_path):
+    out = tmp_path / "loadtest.json"
+    proc = subprocess.run(
+        [sys.executable, "-m", "benchmarks.loadtest", "--concurrency", "2", "--runs", "2",
+         "--engine", "lg", "--json-out", str(out)],
+        cwd=str(ROOT), capture_output=True, text=True, timeout=300,
+    )
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    (stage,) = json.loads(out.read_text(encoding="utf-8"))["stages"]
+    assert stage["succeeded"] == 2 and stage["error_rate"] == 0.0
+    assert stage["hitl_resume_s"]["n"] == 2 and stage["events"] > 0
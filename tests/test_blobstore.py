@@ -0,0 +1,29 @@
+import os
+
+from backend import blobstore
+
+
+def test_put_get_handle():
+    chunks = [{"page": i, "text": "본문 " * 20} for i in range(100)]
+    h = blobstore.put("blob-run", "parse_pdf.pdf_chunks", chunks)
+    assert blobstore.is_handle(h)
+    assert h["count"] == 100 and h["bytes"] > 0
+    assert h[blobstore.HANDLE_KEY] == "blob-run/parse_pdf.pdf_chunks.json"
+    assert blobstore.get(h) == chunks
+    # 같은 이름은 덮어씀(재개 시 동일 핸들)
+    assert blobstore.put("blob-run", "parse_pdf.pdf_chunks", chunks[:1])[blobstore.HANDLE_KEY] == h[blobstore.HANDLE_KEY]
+    assert blobstore.get(h) == chunks[:1]
+
+
+def test_get_defaults_and_drop():
+    assert blobstore.get(None, []) == []
+    assert blobstore.get({"not": "a handle"}, "d") == "d"
+    h = blobstore.put("blob-drop", "x", {"a": 1})
+    blobstore.drop_run("blob-drop")
+    assert not os.path.exists(blobstore.run_blob_dir("blob-drop"))
+    assert blobstore.get(h, "gone") == "gone"
+
+
+def test_run_id_is_sanitized():
+    d = blobstore.run_blob_dir("../../etc")
+    assert os.path.dirname(d) == blobstore.RUN_BLOB_DIR
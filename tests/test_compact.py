@@ -0,0 +1,96 @@
+import copy
+import json
+
+import pytest
+
+from backend import compact
+from backend.compact import MAX_ARRAY_ITEMS, MAX_EVENT_BYTES, MAX_EVENT_TEXT_CHARS, encode_event
+
+
+def _ev(detail, message="진행 중", **kw):
+    return {"seq": 7, "type": "OBS", "nodeId": "hitl", "message": message, "detail": detail, "ts": "t", **kw}
+
+
+def _chunks(n, text_len=400):
+    return [{"page": i, "text": "가" * text_len, "chunk_index": i} for i in range(n)]
+
+
+def _checkpoint(n_chunks=2000, extra=0):
+    state = {
+        "pdf_chunks": _chunks(n_chunks),
+        "merged_path": "/tmp/m.parquet",
+        "validation_report": {"summary": {"ok": 1, "warn": 0, "fail": 0}, "items": [{"dept": "가"}] * 3},
+    }
+    for i in range(extra):
+        state[f"extra_{i}"] = "나" * 700
+    return _ev({"state": state}, "STATE_CHECKPOINT")
+
+
+CASES = {
+    "small": _ev({"done": 3, "total": 10, "unit": "pages"}),
+    "long_message": _ev({}, "x" * (MAX_EVENT_TEXT_CHARS * 3)),
+    "long_list": _ev({"items": [{"text": "t" * 500, "n": i} for i in range(50)]}),
+    "checkpoint": _checkpoint(),
+    "checkpoint_over_state_budget": _checkpoint(n_chunks=10, extra=80),
+    "many_keys": _ev({f"k{i}": "다" * 700 for i in range(400)}),
+    "odd_values": _ev({1: b"raw", "nested": {"t": ("a", "b"), "none": None, "f": 1.5}}),
+}
+
+
+@pytest.mark.parametrize("name", list(CASES))
+def test_bytes_match_json_dumps_of_compacted_event(name):
+    ev = CASES[name]
+    before = copy.deepcopy(ev)
+    cev, data = encode_event(ev)
+    assert data == json.dumps(cev, ensure_ascii=False, default=str).encode("utf-8")
+    assert json.loads(data) == json.loads(json.dumps(cev, ensure_ascii=False, default=str))
+    assert ev == before  # 원본은 바뀌지 않음
+
+
+def test_small_event_is_untouched():
+    cev, _ = encode_event(CASES["small"], payload_id="1")
+    assert cev == CASES["small"] and "__compact__" not in cev
+
+
+def test_text_and_list_truncation_notes():
+    cev, _ = encode_event(CASES["long_message"], payload_id="9")
+    assert len(cev["message"]) == MAX_EVENT_TEXT_CHARS and cev["message"].endswith("…")
+    assert cev["__compact__"] == {"applied": True, "notes": ["message text truncated"], "payloadId": "9"}
+
+    cev, _ = encode_event(CASES["long_list"])
+    assert len(cev["detail"]["items"]) == MAX_ARRAY_ITEMS
+    assert cev["detail"]["__items_meta__"] == {"total": 50, "shown": MAX_ARRAY_ITEMS, "truncated": True}
+    assert len(cev["detail"]["items"][0]["text"]) == compact.MAX_SNIPPET_CHARS
+    assert "payloadId" not in cev["__compact__"]
+
+
+def test_checkpoint_keeps_core_keys_and_chunk_count():
+    cev, data = encode_event(CASES["checkpoint"])
+    st = cev["detail"]["state"]
+    assert st["__pdf_chunks_meta__"] == {"total": 2000, "shown": MAX_ARRAY_ITEMS, "truncated": True}
+    assert st["merged_path"] == "/tmp/m.parquet"
+    assert st["validation_report"]["summary"]["ok"] == 1
+    assert len(data) < 10_000
+
+
+def test_state_budget_rolls_back_to_core_keys():
+    cev, data = encode_event(CASES["checkpoint_over_state_budget"])
+    st = cev["detail"]["state"]
+    assert st["__state_truncated__"] is True
+    assert set(st) == {"merged_path", "validation_report", "__pdf_chunks_meta__", "__state_truncated__"}
+    notes = cev["__compact__"]["notes"]
+    assert notes[-1] == "state size limit -> kept core keys"
+    assert not any("extra_" in n for n in notes)  # 버린 조각의 노트도 함께 되돌림
+    assert len(data) <= compact.MAX_STATE_BYTES + 2_000
+
+
+def test_event_byte_budget_omits_remaining_keys():
+    cev, data = encode_event(CASES["many_keys"])
+    assert cev["detail"]["__truncated__"] is True
+    assert len(cev["detail"]) < 400
+    assert MAX_EVENT_BYTES <= len(data) < MAX_EVENT_BYTES + 4_000
+    assert "detail byte budget -> remaining keys omitted" in cev["__compact__"]["notes"]
+
+
+def test_non_dict_event_passthrough():
+    assert encode_event(["a", 1]) == (["a", 1], b'["a", 1]')
@@ -0,0 +1,232 @@
+import threading
+import time
+
+import pytest
+
+from backend import engine
+from backend.engine import CancelToken, Ctx, RunCancelled, execute_stream
+
+
+@pytest.fixture
+def impls(monkeypatch):
+    def add(name, fn):
+        monkeypatch.setitem(engine.NODE_IMPLS, name, fn)
+
+    return add
+
+
+def _workflow(*nodes):
+    # (cfg, inputs, ctx) 를 받는 노드 타입을 테스트 구현으로 바꿔 씀
+    cfg = {"memo": False, "max_retries": 0, "timeout_s": 0}
+    return {"nodes": [{"id": n, "type": t, "config": dict(cfg)} for n, t in nodes], "edges": []}
+
+
+def test_failure_stops_siblings_before_terminal_event(impls, tmp_path):
+    sibling = {"started": threading.Event(), "stopped": None}
+
+    def slow(cfg, inputs, ctx):
+        sibling["started"].set()
+        for _ in range(500):
+            if ctx.cancel.cancelled:
+                sibling["stopped"] = time.monotonic()
+                ctx.cancel.check()
+            time.sleep(0.01)
+        return {"slow": 1}
+
+    def boom(cfg, inputs, ctx):
+        sibling["started"].wait(2)
+        raise ValueError("boom")
+
+    impls("merge_xlsx", slow)
+    impls("export_xlsx", boom)
+    run_tok = CancelToken()
+    ctx = Ctx("stream-fail", str(tmp_path), str(tmp_path), cancel=run_tok)
+    gen = execute_stream(_workflow(("a", "merge_xlsx"), ("b", "export_xlsx")), ctx, max_workers=2)
+    events = []
+    with pytest.raises(ValueError):
+        for e in gen:
+            events.append((e, time.monotonic()))
+    fail_ev, fail_at = events[-1]
+    assert fail_ev["nodeId"] == "b" and "실패" in fail_ev["message"]
+    # 형제 노드는 실패 SUMMARY 이전에 이미 멈춰 있어야 함
+    assert sibling["stopped"] is not None and sibling["stopped"] <= fail_at
+    # 실행 토큰은 건드리지 않음 → 앱은 FAILED 로 기록
+    assert not run_tok.cancelled
+
+
+def test_run_cancel_propagates_to_nodes(impls, tmp_path):
+    seen = threading.Event()
+
+    def wait_cancel(cfg, inputs, ctx):
+        seen.set()
+        while True:
+            ctx.cancel.check()
+            time.sleep(0.01)
+
+    impls("merge_xlsx", wait_cancel)
+    run_tok = CancelToken()
+    ctx = Ctx("stream-cancel", str(tmp_path), str(tmp_path), cancel=run_tok)
+    threading.Thread(target=lambda: (seen.wait(2), run_tok.cancel("사용자 요청"))).start()
+    with pytest.raises(RunCancelled):
+        list(execute_stream(_workflow(("a", "merge_xlsx")), ctx))
+
+
+def test_timeout_retry_waits_for_previous_attempt(impls, tmp_path):
+    live = {"now": 0, "max": 0, "calls": 0}
+    lock = threading.Lock()
+
+    def hang(cfg, inputs, ctx):
+        with lock:
+            live["now"] += 1
+            live["calls"] += 1
+            live["max"] = max(live["max"], live["now"])
+        try:
+            while True:
+                ctx.cancel.check()
+                time.sleep(0.05)  # 취소 확인 사이 간격
+        finally:
+            with lock:
+                live["now"] -= 1
+
+    impls("merge_xlsx", hang)
+    cfg = {"timeout_s": 0.1, "max_retries": 2, "retry_backoff_s": 0}
+    with pytest.raises(engine.NodeTimeout) as ei:
+        engine.run_limited("merge_xlsx", cfg, {}, Ctx("limits", str(tmp_path), str(tmp_path)))
+    assert live["calls"] == 3
+    assert live["max"] == 1  # 재시도가 이전 시도와 겹치지 않음
+    assert ei.value.limits["attempts"] == 3
+
+
+def test_timeout_without_exit_is_not_retried(impls, tmp_path, monkeypatch):
+    calls = []
+    release = threading.Event()
+
+    def stuck(cfg, inputs, ctx):
+        calls.append(1)
+        release.wait(5)  # 취소 토큰을 보지 않는 구현
+        return {}
+
+    impls("merge_xlsx", stuck)
+    cfg = {"timeout_s": 0.1, "timeout_grace_s": 0.1, "max_retries": 3, "retry_backoff_s": 0}
+    try:
+        with pytest.raises(engine.NodeTimeout) as ei:
+            engine.run_limited("merge_xlsx", cfg, {}, Ctx("limits", str(tmp_path), str(tmp_path)))
+    finally:
+        release.set()
+    assert ei.value.abandoned
+    assert calls == [1]
+    assert ei.value.limits["timeout_grace_s"] == 0.1 and ei.value.limits["attempts"] == 1
+
+
+def test_zero_grace_fails_at_the_deadline(impls, tmp_path):
+    release = threading.Event()
+
+    def stuck(cfg, inputs, ctx):
+        release.wait(5)
+        return {}
+
+    impls("merge_xlsx", stuck)
+    cfg = {"timeout_s": 0.1, "timeout_grace_s": 0, "max_retries": 1, "retry_backoff_s": 0}
+    t0 = time.monotonic()
+    try:
+        with pytest.raises(engine.NodeTimeout) as ei:
+            engine.run_limited("merge_xlsx", cfg, {}, Ctx("limits", str(tmp_path), str(tmp_path)))
+    finally:
+        release.set()
+    assert time.monotonic() - t0 < 1  # timeout_s 뒤 추가 대기 없음
+    assert ei.value.abandoned and ei.value.limits["timeout_grace_s"] == 0.0
+
+
+def test_cancel_token_parent_chain():
+    parent = CancelToken()
+    child = CancelToken(parent=parent)
+    assert not child.cancelled and child.wait(0.01) is False
+    threading.Timer(0.05, parent.cancel, args=("사용자 요청",)).start()
+    t0 = time.monotonic()
+    assert child.wait(5) is True and time.monotonic() - t0 < 1
+    with pytest.raises(RunCancelled, match="사용자 요청"):
+        child.check()
+    # 자식 취소는 부모에 영향 없음
+    p2 = CancelToken()
+    CancelToken(parent=p2).cancel("timeout")
+    assert not p2.cancelled
+
+
+def test_cancel_endpoint():
+    from fastapi.testclient import TestClient
+
+    from backend import app as app_mod
+    from backend.runstore import run_store
+
+    client = TestClient(app_mod.app)
+    run_store.create({"runId": "cancel-api", "status": "RUNNING"})
+    tok = CancelToken()
+    app_mod._cancel_tokens["cancel-api"] = tok
+    try:
+        r = client.post("/runs/cancel-api/cancel")
+        assert r.status_code == 200 and r.json() == {"status": "CANCELLED"}
+        assert tok.cancelled and run_store.get_status("cancel-api") == "CANCELLED"
+        assert client.post("/runs/cancel-api/cancel").status_code == 409
+    finally:
+        app_mod._cancel_tokens.pop("cancel-api", None)
+    assert client.post("/runs/cancel-missing/cancel").status_code == 404
+
+
+def test_node_limits_from_config():
+    lim = engine.NodeLimits.from_config({"timeout_s": 2, "max_retries": -1, "memory_mb": 64})
+    assert lim.timeout_s == 2 and lim.max_retries == 0 and lim.isolate
+    assert not engine.NodeLimits.from_config({"timeout_s": 0, "max_retries": 0}).isolate
+    assert engine.NodeLimits.from_config({"max_retries": 0}).report(1, []) == {}
+
+
+def test_retry_then_success_reports_attempts(impls, tmp_path):
+    left = {"fail": 2}
+
+    def flaky(cfg, inputs, ctx):
+        if left["fail"]:
+            left["fail"] -= 1
+            raise OSError("일시 오류")
+        return {"ok": True}
+
+    impls("merge_xlsx", flaky)
+    out, report = engine.run_limited(
+        "merge_xlsx", {"max_retries": 3, "retry_backoff_s": 0, "timeout_s": 0}, {}, Ctx("retry", str(tmp_path), str(tmp_path))
+    )
+    assert out == {"ok": True}
+    assert report["attempts"] == 3 and report["errors"] == ["OSError: 일시 오류"] * 2
+
+
+def test_isolated_worker_runs_node_and_returns_errors(tmp_path):
+    import pandas as pd
+
+    xlsx = tmp_path / "dept.xlsx"
+    pd.DataFrame({"부서": ["가", "나"], "금액": [1, 2]}).to_excel(xlsx, index=False)
+    ctx = Ctx("isolated-0001", str(tmp_path), str(tmp_path))
+    usage = {}
+    out, report = engine.run_limited(
+        "merge_xlsx", {"isolate": True, "max_retries": 0, "xlsx_paths": [str(xlsx)]}, {}, ctx, usage
+    )
+    assert out["merged_rows"] == 2 and report["isolated"] and report["attempts"] == 1
+    assert usage["cpu_s"] > 0
+
+    cfg = {"isolate": True, "max_retries": 1, "retry_backoff_s": 0, "xlsx_paths": [str(tmp_path / "missing.xlsx")]}
+    with pytest.raises(FileNotFoundError) as ei:
+        engine.run_limited("merge_xlsx", cfg, {}, ctx)
+    assert ei.value.limits["attempts"] == 2
+
+
+def test_summary_events_carry_node_metrics(impls, tmp_path):
+    def merge(cfg, inputs, ctx):
+        sum(i * i for i in range(200_000))  # CPU 사용
+        return {"merged_table": None, "merged_path": None, "merged_rows": 1000}
+
+    impls("merge_xlsx", merge)
+    ctx = Ctx("metrics-run", str(tmp_path), str(tmp_path))
+    events = list(execute_stream(_workflow(("m", "merge_xlsx")), ctx))
+    done = next(e for e in events if e["type"] == "SUMMARY" and e["nodeId"] == "m")
+    action = next(e for e in events if e["type"] == "ACTION" and e["nodeId"] == "m")
+    m = done["detail"]["metrics"]
+    assert set(m) >= {"mono_start", "mono_end", "duration_ms", "cpu_ms", "peak_rss_delta_kb"}
+    assert action["detail"]["mono"] <= m["mono_start"] <= m["mono_end"]
+    assert m["cpu_ms"] > 0 and m["duration_ms"] > 0
+    assert m["items"] == {"rows": 1000} and m["throughput"]["rows_per_s"] > 0
@@ -0,0 +1,104 @@
+import pytest
+
+from backend import engine
+from backend.engine import Ctx
+from backend.engine_lg import execute_stream_lg, get_compiled_graph
+
+NO_MEMO = {"memo": False, "max_retries": 0, "timeout_s": 0}
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    counts = {"parse_pdf": 0, "merge_xlsx": 0}
+    fail = {"merge_xlsx": 1}  # 처음 N번 실패
+
+    def parse(cfg, ctx):
+        counts["parse_pdf"] += 1
+        return {"pdf_chunks": [{"page": i, "text": f"chunk {i}"} for i in range(50)], "pdf_pages": 10}
+
+    def merge(cfg, inputs, ctx):
+        counts["merge_xlsx"] += 1
+        if fail["merge_xlsx"] > 0:
+            fail["merge_xlsx"] -= 1
+            raise OSError("xlsx 읽기 실패")
+        return {"merged_path": None, "merged_rows": 3}
+
+    monkeypatch.setitem(engine.NODE_IMPLS, "parse_pdf", parse)
+    monkeypatch.setitem(engine.NODE_IMPLS, "merge_xlsx", merge)
+    counts["fail"] = fail
+    return counts
+
+
+def _wf(tag="wf"):
+    return {
+        "id": tag,
+        "nodes": [
+            {"id": "parse_pdf", "type": "parse_pdf", "config": dict(NO_MEMO)},
+            {"id": "merge_xlsx", "type": "merge_xlsx", "config": dict(NO_MEMO)},
+        ],
+        "edges": [{"from": "parse_pdf", "to": "merge_xlsx"}],
+    }
+
+
+def _run(run_id, tmp_path, resume=False, wf=None):
+    ctx = Ctx(run_id, str(tmp_path), str(tmp_path))
+    events = []
+    try:
+        for ev in execute_stream_lg(wf or _wf(), ctx, resume=resume):
+            events.append(ev)
+    except Exception as e:
+        return events, e
+    return events, None
+
+
+def test_resume_runs_only_the_failed_node(calls, tmp_path):
+    events, err = _run("lg-resume", tmp_path)
+    assert isinstance(err, OSError)
+    assert [e["message"] for e in events if e["type"] == "SUMMARY"][-1].startswith("merge_xlsx 실패")
+    assert calls["parse_pdf"] == 1 and calls["merge_xlsx"] == 1
+
+    events, err = _run("lg-resume", tmp_path, resume=True)
+    assert err is None
+    plan = events[0]
+    assert plan["detail"]["resume"] and plan["detail"]["next"] == ["merge_xlsx"]
+    assert calls["parse_pdf"] == 1 and calls["merge_xlsx"] == 2  # 성공한 노드는 다시 돌지 않음
+
+
+def test_resume_without_checkpoint_starts_fresh(calls, tmp_path):
+    calls["fail"]["merge_xlsx"] = 0
+    events, err = _run("lg-fresh", tmp_path, resume=True)
+    assert err is None and not events[0]["detail"].get("resume")
+    assert calls["parse_pdf"] == 1 and calls["merge_xlsx"] == 1
+
+
+def test_state_carries_chunk_handle_not_chunks(calls, tmp_path):
+    from backend import blobstore
+
+    calls["fail"]["merge_xlsx"] = 0
+    _, err = _run("lg-state", tmp_path)
+    assert err is None
+    snap = get_compiled_graph(_wf()).get_state({"configurable": {"thread_id": "lg-state"}})
+    ref = snap.values["pdf_chunks_ref"]
+    assert blobstore.is_handle(ref) and ref["count"] == 50
+    assert "pdf_chunks" not in snap.values
+    assert len(blobstore.get(ref)) == 50
+
+
+def test_graph_cache_keys_on_structure_only():
+    from backend.engine_lg import graph_hash
+    from backend.metrics import GRAPH_CACHE
+
+    wf = _wf("cache")
+    labeled = {**_wf("cache-2"), "name": "다른 이름"}
+    labeled["nodes"] = [{**n, "label": "표시용"} for n in reversed(labeled["nodes"])]
+    assert graph_hash(wf) == graph_hash(labeled)
+
+    changed = _wf("cache")
+    changed["nodes"][1]["config"] = {**NO_MEMO, "sheet": "x"}
+    assert graph_hash(changed) != graph_hash(wf)
+
+    app = get_compiled_graph(wf)
+    hits = GRAPH_CACHE.value(result="hit")
+    assert get_compiled_graph(labeled) is app
+    assert GRAPH_CACHE.value(result="hit") == hits + 1
+    assert get_compiled_graph(changed) is not app
@@ -0,0 +1,51 @@
+import gc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.engine import CancelToken, RunCancelled, _write_xlsx_pandas, _write_xlsx_streaming
+
+DF = pd.DataFrame(
+    {
+        "부서": ["가족복지과", "갈매동", None, "감염병관리과", "세무과"],
+        "금액": [1200.5, np.nan, 30.0, 4.0, 5.25],
+        "건수": [1, 2, 3, 4, 5],
+    }
+)
+
+
+def _read(path):
+    return pd.read_excel(path, sheet_name="merged", engine="openpyxl")
+
+
+@pytest.mark.parametrize("source", ["frame", "parquet", "csv"])
+def test_streaming_matches_pandas_writer(tmp_path, source):
+    ref = DF
+    if source == "parquet":
+        ref = str(tmp_path / "m.parquet")
+        DF.to_parquet(ref, index=False)
+    elif source == "csv":
+        ref = str(tmp_path / "m.csv")
+        DF.to_csv(ref, index=False)
+    expected = str(tmp_path / "pandas.xlsx")
+    got = str(tmp_path / "stream.xlsx")
+    assert _write_xlsx_pandas(DF, expected) == len(DF)
+    assert _write_xlsx_streaming(ref, got, batch_rows=2) == len(DF)
+    pd.testing.assert_frame_equal(_read(got), _read(expected))
+
+
+def test_streaming_empty_table(tmp_path):
+    path = str(tmp_path / "empty.xlsx")
+    assert _write_xlsx_streaming(DF.iloc[:0], path) == 0
+    assert list(_read(path).columns) == list(DF.columns)
+
+
+@pytest.mark.filterwarnings("error::pytest.PytestUnraisableExceptionWarning")
+def test_streaming_checks_cancel_between_batches(tmp_path):
+    tok = CancelToken()
+    tok.cancel("사용자 요청")
+    with pytest.raises(RunCancelled):
+        _write_xlsx_streaming(DF, str(tmp_path / "x.xlsx"), batch_rows=2, cancel=tok)
+    gc.collect()  # 버려진 워크시트가 닫혀 있어야 GC 때 예외가 나지 않음
+    assert not (tmp_path / "x.xlsx").exists()
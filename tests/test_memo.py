@@ -0,0 +1,93 @@
+import logging
+import os
+
+import pandas as pd
+import pytest
+
+from backend import memo
+from backend.metrics import NODE_CACHE
+
+
+@pytest.fixture(autouse=True)
+def memo_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(memo, "MEMO_DIR", str(tmp_path / "memo"))
+    monkeypatch.setattr(memo, "MEMO_ENABLED", True)
+
+
+def _counting(out):
+    calls = []
+
+    def fn():
+        calls.append(1)
+        return out
+
+    return fn, calls
+
+
+def test_node_key_ignores_exec_only_keys():
+    base = memo.node_key("merge_xlsx", {"a": 1}, ["up"])
+    assert memo.node_key("merge_xlsx", {"a": 1, "timeout_s": 5, "profile": True}, ["up"]) == base
+    assert memo.node_key("merge_xlsx", {"a": 2}, ["up"]) != base
+    assert memo.node_key("merge_xlsx", {"a": 1}, ["other"]) != base
+    assert memo.node_key("validate_with_pdf", {"a": 1}, ["up"]) != base
+
+
+def test_node_key_tracks_input_file_changes(tmp_path):
+    src = tmp_path / "in.xlsx"
+    src.write_bytes(b"one")
+    k1 = memo.node_key("merge_xlsx", {"xlsx_paths": [str(src)]}, [])
+    src.write_bytes(b"three")
+    assert memo.node_key("merge_xlsx", {"xlsx_paths": [str(src)]}, []) != k1
+
+
+def test_miss_then_hit_preserves_mixed_column_types():
+    df = pd.DataFrame({"부서": ["가", "나"], "금액": [1, "미정"]})  # 혼합 컬럼 → parquet 불가
+    fn, calls = _counting({"merged_table": df, "merged_rows": 2})
+    out, key, cached = memo.run_memoized("merge_xlsx", {"x": 1}, [], fn)
+    assert not cached
+    out2, key2, cached2 = memo.run_memoized("merge_xlsx", {"x": 1}, [], fn)
+    assert cached2 and key2 == key and calls == [1]
+    pd.testing.assert_frame_equal(out2["merged_table"], df)
+    assert out2["merged_table"]["금액"].tolist() == [1, "미정"]
+    assert out2["merged_rows"] == 2
+
+
+def test_disabled_and_non_memoizable_always_run():
+    fn, calls = _counting({"v": 1})
+    for _ in range(2):
+        memo.run_memoized("merge_xlsx", {"memo": False}, [], fn)
+        memo.run_memoized("export_xlsx", {}, [], fn)
+    assert len(calls) == 4
+
+
+def test_missing_path_output_invalidates(tmp_path):
+    path = tmp_path / "merged.parquet"
+    path.write_bytes(b"x")
+    fn, calls = _counting({"merged_path": str(path)})
+    memo.run_memoized("merge_xlsx", {}, [], fn)
+    os.remove(path)
+    memo.run_memoized("merge_xlsx", {}, [], fn)
+    assert len(calls) == 2
+
+
+def test_side_effect_probe_mismatch_is_a_miss(monkeypatch):
+    state = {"v": 1}
+    monkeypatch.setitem(memo._SIDE_EFFECT_PROBES, "embed_pdf", lambda out: state["v"])
+    fn, calls = _counting({"vs_count": 3})
+    memo.run_memoized("embed_pdf", {}, [], fn)
+    assert memo.run_memoized("embed_pdf", {}, [], fn)[2]
+    state["v"] = 2  # 컬렉션이 바뀜
+    assert not memo.run_memoized("embed_pdf", {}, [], fn)[2]
+    assert len(calls) == 2
+
+
+def test_store_failure_is_counted_and_logged(caplog):
+    before = NODE_CACHE.value(type="validate_with_pdf", result="store_error")
+    fn, calls = _counting({"report": object()})  # JSON 직렬화 불가
+    with caplog.at_level(logging.WARNING, logger="backend.memo"):
+        out, _, cached = memo.run_memoized("validate_with_pdf", {}, [], fn)
+    assert not cached and "report" in out
+    assert NODE_CACHE.value(type="validate_with_pdf", result="store_error") == before + 1
+    assert "memo store failed" in caplog.text
+    memo.run_memoized("validate_with_pdf", {}, [], fn)
+    assert len(calls) == 2
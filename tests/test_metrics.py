@@ -0,0 +1,40 @@
+from fastapi.testclient import TestClient
+
+from backend.metrics import CONTENT_TYPE, Counter, Gauge, Histogram, PREFIX
+
+
+def test_counter_and_gauge_render():
+    c = Counter("t_requests_total", "요청 수", ["route"])
+    c.inc(route="/a")
+    c.inc(2, route='/b"x')
+    text = c.render()
+    assert f"# TYPE {PREFIX}t_requests_total counter" in text
+    assert f'{PREFIX}t_requests_total{{route="/a"}} 1' in text
+    assert f'{PREFIX}t_requests_total{{route="/b\\"x"}} 2' in text
+    assert c.value(route="/a") == 1
+
+    g = Gauge("t_depth", "깊이", fn=lambda: 3.5)
+    assert f"{PREFIX}t_depth 3.5" in g.render()
+    broken = Gauge("t_broken", "수집 실패", fn=lambda: 1 / 0)
+    assert broken.samples() == []
+
+
+def test_histogram_buckets_are_cumulative():
+    h = Histogram("t_seconds", "지연", ["op"], buckets=(0.1, 1))
+    for v in (0.05, 0.5, 0.5, 5):
+        h.observe(v, op="q")
+    lines = h.samples()
+    assert f'{PREFIX}t_seconds_bucket{{op="q",le="0.1"}} 1' in lines
+    assert f'{PREFIX}t_seconds_bucket{{op="q",le="1"}} 3' in lines
+    assert f'{PREFIX}t_seconds_bucket{{op="q",le="+Inf"}} 4' in lines
+    assert f'{PREFIX}t_seconds_count{{op="q"}} 4' in lines
+    assert f'{PREFIX}t_seconds_sum{{op="q"}} 6.05' in lines
+
+
+def test_metrics_endpoint():
+    from backend.app import app
+
+    r = TestClient(app).get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"] == CONTENT_TYPE
+    assert f"# TYPE {PREFIX}node_duration_seconds histogram" in r.text
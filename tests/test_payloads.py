@@ -0,0 +1,68 @@
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import payloads
+from backend.app import app
+
+RUN = "payload-test-run"
+FULL = {
+    "message": "STATE_CHECKPOINT",
+    "detail": {"state": {"pdf_chunks": [{"i": i} for i in range(250)], "vs_count": 250}},
+}
+
+
+@pytest.fixture(scope="module")
+def client():
+    payloads.put(RUN, "7", FULL)
+    return TestClient(app)
+
+
+def test_put_load_roundtrip_and_overwrite():
+    payloads.put("payload-rt", "1", {"a": 1})
+    assert payloads.load("payload-rt", "1") == {"a": 1}
+    payloads.put("payload-rt", "1", {"a": 2})  # 재개 시 같은 seq → 덮어씀
+    assert payloads.load("payload-rt", "1") == {"a": 2}
+    assert payloads.load("payload-rt", "missing") is None
+
+
+def test_payload_path_is_sanitized():
+    path = payloads.payload_path("../x", "../../etc/passwd")
+    assert os.path.dirname(path) == payloads.payload_dir("../x")
+    assert os.path.dirname(payloads.payload_dir("../x")) == payloads.RUN_DIR
+
+
+def test_resolve_paths():
+    assert payloads.resolve(FULL, "") == (True, FULL)
+    assert payloads.resolve(FULL, "detail.state.vs_count") == (True, 250)
+    assert payloads.resolve(FULL, "detail.state.pdf_chunks.3") == (True, {"i": 3})
+    assert payloads.resolve(FULL, "detail.state.pdf_chunks.-1") == (True, {"i": 249})
+    assert payloads.resolve(FULL, "detail.state.pdf_chunks.250") == (False, None)
+    assert payloads.resolve(FULL, "detail.nope") == (False, None)
+
+
+def test_paginate_list_pages():
+    items = FULL["detail"]["state"]["pdf_chunks"]
+    p = payloads.paginate(items, "x", 200, 100)
+    assert p["total"] == 250 and len(p["items"]) == 50 and p["nextOffset"] is None
+    p = payloads.paginate(items, "x", 0, 100)
+    assert p["items"][0] == {"i": 0} and p["nextOffset"] == 100
+
+
+def test_paginate_cuts_nested_lists():
+    p = payloads.paginate(FULL, "", 0, 10)
+    assert len(p["value"]["detail"]["state"]["pdf_chunks"]) == 10
+    assert p["pages"] == {"detail.state.pdf_chunks": {"total": 250, "nextOffset": 10}}
+
+
+def test_payload_endpoint(client):
+    r = client.get(f"/runs/{RUN}/payloads/7", params={"path": "detail.state.pdf_chunks", "offset": 100, "limit": 50})
+    assert r.status_code == 200
+    body = r.json()
+    assert body["payloadId"] == "7" and body["total"] == 250
+    assert body["items"][0] == {"i": 100} and body["nextOffset"] == 150
+
+    assert client.get(f"/runs/{RUN}/payloads/8").status_code == 404
+    assert client.get(f"/runs/{RUN}/payloads/7", params={"path": "detail.x"}).status_code == 404
+    assert client.get(f"/runs/{RUN}/payloads/7", params={"limit": 0}).status_code == 422
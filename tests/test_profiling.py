@@ -0,0 +1,59 @@
+import os
+import pstats
+import time
+
+from fastapi.testclient import TestClient
+
+from backend.profiling import list_profiles, profile_dir, profile_path, profiled
+from backend.settings import ART_DIR
+
+
+def _busy(seconds):
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        sum(range(1000))
+
+
+def test_profiled_writes_three_views_per_attempt():
+    for _ in range(2):  # 재시도: node, node.2
+        with profiled("prof-run", "merge"):
+            _busy(0.05)
+    names = [p["name"] for p in list_profiles("prof-run")]
+    assert names == sorted(
+        ["merge.pstats", "merge.txt", "merge.collapsed", "merge.2.pstats", "merge.2.txt", "merge.2.collapsed"]
+    )
+    stats = pstats.Stats(profile_path("prof-run", "merge.pstats"))
+    assert any(fn[2] == "_busy" for fn in stats.stats)
+    collapsed = open(profile_path("prof-run", "merge.collapsed"), encoding="utf-8").read()
+    assert "_busy (test_profiling.py" in collapsed
+
+
+def test_unlabeled_block_is_not_profiled():
+    with profiled("prof-none", None):
+        _busy(0.01)
+    assert list_profiles("prof-none") == []
+
+
+def test_profile_path_rejects_traversal_and_unknown_kinds():
+    with profiled("prof-path", "n"):
+        pass
+    assert profile_path("prof-path", "n.txt")
+    assert profile_path("prof-path", "../n.txt") is None
+    assert profile_path("prof-path", "n.json") is None
+    assert profile_path("prof-path", "missing.txt") is None
+    assert os.path.dirname(profile_dir("../x")) == os.path.join(ART_DIR, "profiles")
+
+
+def test_profile_endpoints():
+    from backend.app import app
+
+    with profiled("prof-api", "parse"):
+        _busy(0.01)
+    client = TestClient(app)
+    r = client.get("/artifacts/profiles/prof-api")
+    assert r.status_code == 200
+    assert {i["kind"] for i in r.json()["items"]} == {"pstats", "txt", "collapsed"}
+    r = client.get("/artifacts/profiles/prof-api/parse.txt")
+    assert r.status_code == 200 and r.headers["content-type"].startswith("text/plain")
+    assert client.get("/artifacts/profiles/prof-none/parse.txt").status_code == 404
+    assert client.get("/artifacts/profiles/prof-missing").status_code == 404
@@ -0,0 +1,209 @@
+import asyncio
+
+from backend.runner import RunChannel, Subscriber
+
+
+def _ev(seq, type_="OBS", node="embed_pdf", **kw):
+    return {"seq": seq, "type": type_, "nodeId": node, "message": "", "detail": {}, "has_more": True, **kw}
+
+
+def _seqs(sub):
+    return [ev["seq"] for ev, _ in sub.buf]
+
+
+def test_offer_coalesces_to_tail_keeping_seqs_increasing():
+    sub = Subscriber(maxsize=3)
+    sub.offer(_ev(1), 0)
+    sub.offer(_ev(2, node="parse_pdf"), 1)
+    sub.offer(_ev(3, "SUMMARY", "parse_pdf"), 2)
+    sub.offer(_ev(4), 3)  # embed_pdf 진행: 1 을 빼고 맨 뒤에
+    assert _seqs(sub) == [2, 3, 4]
+    sub.offer(_ev(5, node="parse_pdf"), 4)  # parse_pdf 진행: 2 를 빼고 맨 뒤에
+    assert _seqs(sub) == [3, 4, 5]
+    assert sub.dropped == 2 and not sub.overflowed
+
+
+def test_offer_drops_progress_without_match():
+    sub = Subscriber(maxsize=2)
+    sub.offer(_ev(1, "SUMMARY", "a"), 0)
+    sub.offer(_ev(2, "SUMMARY", "b"), 1)
+    sub.offer(_ev(3, node="c"), 2)
+    assert _seqs(sub) == [1, 2] and sub.dropped == 1
+
+
+def test_essential_event_evicts_oldest_progress_then_overflows():
+    sub = Subscriber(maxsize=2)
+    sub.offer(_ev(1), 0)
+    sub.offer(_ev(2, "SUMMARY", "a"), 1)
+    sub.offer(_ev(3, "SUMMARY", "b"), 2)
+    assert _seqs(sub) == [2, 3] and sub.dropped == 1
+    sub.offer(_ev(4, "SUMMARY", "c"), 3)
+    assert sub.overflowed
+
+
+def test_channel_replays_and_streams(tmp_path, monkeypatch):
+    import backend.runner as runner
+
+    monkeypatch.setattr(runner, "RUN_DIR", str(tmp_path))
+
+    async def main():
+        ch = RunChannel("runner-test")
+        await ch.publish(_ev(1, "PLAN", "plan"))
+        await ch.publish(_ev(2))
+        got = []
+
+        async def consume():
+            async for frame in ch.subscribe(after_seq=1):
+                got.append(frame)
+
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0)
+        await ch.publish(_ev(3, "SUMMARY", "embed_pdf", has_more=False))
+        await ch.close()
+        await asyncio.wait_for(task, 2)
+        return got, runner.read_event_log("runner-test")
+
+    got, log = asyncio.run(main())
+    assert [f.split(b"\n", 1)[0] for f in got] == [b"id: 2", b"id: 3"]
+    assert [e["seq"] for e in log] == [1, 2, 3]
+
+
+def test_reconnect_after_last_delivered_id_gets_every_summary(tmp_path, monkeypatch):
+    import backend.runner as runner
+
+    monkeypatch.setattr(runner, "RUN_DIR", str(tmp_path))
+    monkeypatch.setattr(runner, "Subscriber", lambda: Subscriber(maxsize=3))
+
+    def ids(frames):
+        return [int(f.split(b"\n", 1)[0][4:]) for f in frames if f.startswith(b"id: ")]
+
+    async def main():
+        ch = RunChannel("runner-reconnect")
+        first = []
+
+        async def slow_consumer():
+            agen = ch.subscribe()
+            try:
+                async for frame in agen:
+                    first.append(frame)
+                    if frame.startswith(b"id: "):
+                        return  # 첫 id 를 받은 직후 연결 끊김
+            finally:
+                await agen.aclose()
+
+        task = asyncio.create_task(slow_consumer())
+        await asyncio.sleep(0)
+        # 구독자가 읽기 전에 한꺼번에 발행 → 큐(3) 가 넘쳐 병합/밀어내기 발생
+        await ch.publish(_ev(1))
+        await ch.publish(_ev(2, node="parse_pdf"))
+        await ch.publish(_ev(3, "SUMMARY", "parse_pdf"))
+        await ch.publish(_ev(4))
+        await ch.publish(_ev(5, node="parse_pdf"))
+        await ch.publish(_ev(6, "SUMMARY", "embed_pdf", has_more=False))
+        await ch.close()
+        await asyncio.wait_for(task, 2)
+        second = [f async for f in ch.subscribe(after_seq=max(ids(first)))]
+        return ids(first), ids(second)
+
+    first, second = asyncio.run(main())
+    for stream in (first, second):
+        assert stream == sorted(set(stream))  # 구독자별 id 는 엄격히 증가
+    assert {3, 6} <= set(first) | set(second)
+
+
+def _write_log(run_id, n, torn=True):
+    import json
+
+    from backend.runner import event_log_path
+
+    with open(event_log_path(run_id), "w", encoding="utf-8") as f:
+        for seq in range(1, n + 1):
+            f.write(json.dumps(_ev(seq, "SUMMARY", "n", has_more=seq < n), ensure_ascii=False) + "\n")
+        if torn:
+            f.write('{"seq": %d, "type": "OB' % (n + 1))  # 기록 도중 중단된 마지막 줄
+
+
+def test_read_event_log_skips_torn_tail_and_filters():
+    from backend.runner import read_event_log
+
+    _write_log("log-read", 5)
+    assert [e["seq"] for e in read_event_log("log-read")] == [1, 2, 3, 4, 5]
+    assert [e["seq"] for e in read_event_log("log-read", after_seq=3)] == [4, 5]
+    assert read_event_log("log-missing") == []
+
+
+def test_reopened_channel_appends_and_replays_after_seq():
+    _write_log("log-resume", 3, torn=False)
+
+    async def main():
+        ch = RunChannel("log-resume")  # 재개된 실행: 기존 로그를 이어서 사용
+        assert ch.last_seq == 3
+        await ch.publish(_ev(4, "SUMMARY", "n", has_more=False))
+        await ch.close()
+        return [f async for f in ch.subscribe(after_seq=2)]
+
+    frames = asyncio.run(main())
+    assert [f.split(b"\n", 1)[0] for f in frames] == [b"id: 3", b"id: 4"]
+    from backend.runner import read_event_log
+
+    assert [e["seq"] for e in read_event_log("log-resume")] == [1, 2, 3, 4]
+
+
+def test_events_endpoint_resumes_finished_run_from_log():
+    from fastapi.testclient import TestClient
+
+    from backend.app import app
+    from backend.runstore import run_store
+
+    run_store.create({"runId": "log-http", "status": "SUCCEEDED", "engine": "seq"})
+    _write_log("log-http", 5)
+    client = TestClient(app)
+
+    def ids(**kw):
+        r = client.get("/runs/log-http/events", **kw)
+        assert r.status_code == 200
+        return [int(l[4:]) for l in r.text.splitlines() if l.startswith("id: ")]
+
+    assert ids() == [1, 2, 3, 4, 5]
+    assert ids(headers={"Last-Event-ID": "3"}) == [4, 5]
+    assert ids(params={"lastEventId": "4"}) == [5]
+    assert ids(headers={"Last-Event-ID": "5"}) == []
+    assert client.get("/runs/log-nope/events").status_code == 404
+
+
+def test_signal_armed_before_wait_is_not_lost():
+    from backend.runner import RunManager
+
+    async def main():
+        m = RunManager()
+        assert not m.notify("sig")  # 대기자 없음
+        m.arm("sig")
+        assert m.notify("sig")  # 대기 시작 전에 온 신호
+        assert await m.wait_signal("sig", timeout=1)
+        assert not await m.wait_signal("sig", timeout=0.05)  # 소비됨 → 시간 초과
+
+    asyncio.run(main())
+
+
+def test_hitl_waiter_wakes_on_notify(monkeypatch):
+    import time
+
+    from backend import app as app_mod
+    from backend.runstore import run_store
+
+    monkeypatch.setattr(app_mod, "HITL_FALLBACK_S", 30)  # 폴링으로는 깨지 않음
+    run_store.create({"runId": "hitl-wake", "status": "WAITING_HITL"})
+
+    async def main():
+        app_mod.runs.arm("hitl-wake")
+        waiter = asyncio.create_task(app_mod._wait_hitl_decision("hitl-wake"))
+        await asyncio.sleep(0.05)
+        assert not waiter.done()
+        t0 = time.monotonic()
+        run_store.update("hitl-wake", status="RUNNING")
+        app_mod.runs.notify("hitl-wake")
+        decision = await asyncio.wait_for(waiter, 2)
+        return decision, time.monotonic() - t0
+
+    decision, waited = asyncio.run(main())
+    assert decision == "RUNNING" and waited < 0.5
@@ -0,0 +1,140 @@
+import json
+import sqlite3
+import threading
+
+import pytest
+
+from backend.runstore import RunStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return RunStore(str(tmp_path / "runs.db"), legacy_dir=None)
+
+
+def _run(i, status="SUCCEEDED", **kw):
+    return {"runId": f"r{i:03d}", "status": status, "startedAt": f"2025-10-22T10:{i:02d}:00", **kw}
+
+
+def test_create_get_update_roundtrip(store):
+    wf = {"id": "wf-1", "nodes": [{"id": "a"}]}
+    store.create(_run(1, "PLANNING", workflow=wf, metrics={"a": {"duration_ms": 1.5}}))
+    got = store.get("r001")
+    assert got["workflowId"] == "wf-1" and got["workflow"] == wf
+    assert got["metrics"] == {"a": {"duration_ms": 1.5}}
+    assert "workflow" not in store.get("r001", with_workflow=False)
+    assert store.update("r001", status="RUNNING")
+    assert store.get_status("r001") == "RUNNING"
+    assert not store.update("missing", status="RUNNING")
+    with pytest.raises(KeyError):
+        store.update("r001", bogus=1)
+
+
+def test_transition_is_atomic_under_races(store):
+    store.create(_run(1, "WAITING_HITL"))
+    wins = []
+
+    def decide(to):
+        if store.transition("r001", to, ["WAITING_HITL"]):
+            wins.append(to)
+
+    threads = [threading.Thread(target=decide, args=("RUNNING" if i % 2 else "CANCELLED",)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(wins) == 1 and store.get_status("r001") == wins[0]
+
+
+def test_list_runs_keyset_pages(store):
+    for i in range(7):
+        store.create(_run(i, "FAILED" if i % 3 == 0 else "SUCCEEDED"))
+    seen, cursor = [], None
+    while True:
+        items, cursor = store.list_runs(limit=3, cursor=cursor)
+        seen += [r["runId"] for r in items]
+        if cursor is None:
+            break
+    assert seen == [f"r{i:03d}" for i in range(6, -1, -1)]
+    failed, nxt = store.list_runs(status="FAILED", limit=10)
+    assert [r["runId"] for r in failed] == ["r006", "r003", "r000"] and nxt is None
+
+
+def test_imports_legacy_json_once(tmp_path):
+    legacy = tmp_path / "runs"
+    legacy.mkdir()
+    (legacy / "old-1.json").write_text(
+        json.dumps({"runId": "old-1", "status": "SUCCEEDED", "workflow": {"id": "wf"}, "startedAt": "x"}),
+        encoding="utf-8",
+    )
+    (legacy / "broken.json").write_text("{", encoding="utf-8")
+    (legacy / "old-1.events.jsonl").write_text("", encoding="utf-8")
+    db = str(tmp_path / "runs.db")
+    store = RunStore(db, legacy_dir=str(legacy))
+    assert store.get("old-1")["workflowId"] == "wf"
+    store.update("old-1", status="FAILED")
+    # 기존 DB 가 있으면 다시 이관하지 않음
+    assert RunStore(db, legacy_dir=str(legacy)).get_status("old-1") == "FAILED"
+
+
+def test_adds_missing_columns_to_old_schema(tmp_path):
+    db = str(tmp_path / "old.db")
+    conn = sqlite3.connect(db)
+    conn.execute(
+        "CREATE TABLE runs (run_id TEXT PRIMARY KEY, status TEXT NOT NULL, engine TEXT, workflow_id TEXT,"
+        " started_at TEXT, ended_at TEXT, artifact_id TEXT, checkpoint TEXT, workflow TEXT, updated_at REAL NOT NULL)"
+    )
+    conn.execute("INSERT INTO runs (run_id, status, updated_at) VALUES ('legacy', 'SUCCEEDED', 0)")
+    conn.commit()
+    conn.close()
+    store = RunStore(db, legacy_dir=None)
+    assert store.update("legacy", user="u1", priority=5, metrics={"n": 1})
+    got = store.get("legacy")
+    assert (got["user"], got["priority"], got["metrics"]) == ("u1", 5, {"n": 1})
+
+
+def test_stale_transition_and_claim_need_a_lapsed_heartbeat(store, monkeypatch):
+    import backend.runstore as runstore
+
+    store.create(_run(1, "RUNNING"))
+    store.create(_run(2, "FAILED"))
+    # 살아 있는 워커(방금 하트비트)가 가진 실행은 가져갈 수 없음
+    assert not store.transition("r001", "RUNNING", from_=("FAILED",), stale_from=("RUNNING",))
+    assert not store.claim("r001", stale_from=("RUNNING",))
+    assert store.transition("r002", "RUNNING", from_=("FAILED",), stale_from=("RUNNING",))
+
+    monkeypatch.setattr(runstore, "RUN_STALE_S", 0.0)
+    store._conn().execute("UPDATE runs SET heartbeat_at = NULL WHERE run_id = 'r001'")
+    assert not store.claim("r001", stale_from=("QUEUED",))  # 상태 조건도 함께 확인
+    assert store.claim("r001", stale_from=("RUNNING",))
+    # 가져간 쪽이 같은 UPDATE 로 하트비트를 갱신 → 곧바로 다른 워커가 다시 가져갈 수 없음
+    monkeypatch.setattr(runstore, "RUN_STALE_S", 30.0)
+    assert not store.claim("r001", stale_from=("RUNNING",))
+    assert store.heartbeat("r001") and not store.heartbeat("missing")
+
+
+def test_resume_and_events_skip_runs_owned_by_live_workers(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import backend.runstore as runstore
+    from backend import app as app_mod
+    from backend.runstore import run_store
+
+    submitted = []
+    monkeypatch.setattr(app_mod.runs, "submit", lambda run_id, fn: submitted.append(run_id))
+    client = TestClient(app_mod.app)
+    for rid, status in (("own-running", "RUNNING"), ("own-hitl", "WAITING_HITL"), ("own-failed", "FAILED")):
+        run_store.create({"runId": rid, "status": status, "engine": "seq"})
+    run_store.create({"runId": "own-queued", "status": "QUEUED", "engine": "seq"})
+
+    assert client.post("/runs/own-running/resume").status_code == 409
+    assert client.post("/runs/own-hitl/resume").status_code == 409
+    assert client.post("/runs/own-failed/resume").json()["status"] == "RUNNING"
+    assert client.get("/runs/own-queued/events").status_code == 200  # 로그만 재생
+    assert submitted == ["own-failed"]
+    assert run_store.get_status("own-running") == "RUNNING"
+
+    monkeypatch.setattr(runstore, "RUN_STALE_S", -1.0)  # 모든 하트비트가 끊긴 것으로 간주
+    assert client.post("/runs/own-hitl/resume").status_code == 200
+    client.get("/runs/own-queued/events")
+    assert submitted == ["own-failed", "own-hitl", "own-queued"]
@@ -0,0 +1,102 @@
+import threading
+
+import pytest
+
+from backend import engine, vectorstore
+from backend.vectorstore import REF_PREFIX, VSDoc, collection_for, collection_state, ref_collection
+from backend.settings import CHROMA_COLLECTION
+
+
+class FakeEmbedder:
+    """OpenAI 대신 결정적 벡터(텍스트 길이/코드포인트 기반)."""
+
+    calls = 0
+    lock = threading.Lock()
+
+    def __init__(self, api_key=None, model="fake-embed"):
+        self.model = model
+
+    def embed(self, texts):
+        with FakeEmbedder.lock:
+            FakeEmbedder.calls += 1
+        return [[float(len(t)), float(sum(map(ord, t)) % 997), 1.0, 0.5] for t in texts]
+
+
+@pytest.fixture(autouse=True)
+def fake_embedder(monkeypatch):
+    monkeypatch.setattr(vectorstore, "OpenAIEmbedder", FakeEmbedder)
+    FakeEmbedder.calls = 0
+
+
+def _chunks(tag, n=12):
+    return [{"page": i // 3 + 1, "text": f"{tag} 세출예산 항목 {i}"} for i in range(n)]
+
+
+def _docs(tag):
+    return [VSDoc(id=f"pdf-{i}", text=c["text"], metadata={"page": c["page"]}) for i, c in enumerate(_chunks(tag), 1)]
+
+
+def test_collection_name_depends_on_content_and_model():
+    a = collection_for(_docs("A"), FakeEmbedder())
+    assert a == collection_for(_docs("A"), FakeEmbedder())
+    assert a.startswith(f"{CHROMA_COLLECTION}-")
+    assert a != collection_for(_docs("B"), FakeEmbedder())
+    assert a != collection_for(_docs("A"), FakeEmbedder(model="other"))
+
+
+def test_ref_collection():
+    assert ref_collection(f"{REF_PREFIX}budget-abc") == "budget-abc"
+    # 이름 없는 ref 는 기본 컬렉션으로 대체하지 않음
+    assert ref_collection(REF_PREFIX) is None
+    assert ref_collection(None) is None
+    assert collection_state(None) is None
+
+
+def _embed(tag, results, i):
+    results[i] = engine.node_embed_pdf_to_chroma({"batch": 4}, {"parse_pdf": {"pdf_chunks": _chunks(tag)}})
+
+
+def test_concurrent_runs_share_one_build_per_pdf():
+    results = [None] * 6
+    threads = [threading.Thread(target=_embed, args=("AB"[i % 2], results, i)) for i in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(30)
+    refs = {r["vs_ref"] for r in results}
+    assert len(refs) == 2  # PDF 별 컬렉션 하나씩
+    for ref in refs:
+        assert collection_state(ref_collection(ref))[1] == 12
+    assert FakeEmbedder.calls == 2 * 3  # PDF 당 1회 구축(배치 4개씩 3번), 나머지 실행은 재사용
+
+    # 다른 PDF 를 다시 임베딩해도 기존 컬렉션은 그대로
+    before = collection_state(ref_collection(results[0]["vs_ref"]))
+    engine.node_embed_pdf_to_chroma({}, {"parse_pdf": {"pdf_chunks": _chunks("C")}})
+    assert collection_state(ref_collection(results[0]["vs_ref"])) == before
+
+
+def test_validate_without_index_reports_it_instead_of_querying():
+    import pandas as pd
+
+    table = pd.DataFrame({"부서": ["총무과", "재무과"], "금액": [100, 200]})
+    for ref in (None, REF_PREFIX):
+        out = engine.node_validate_with_pdf({}, {"merge_xlsx": {"merged_table": table}, "embed_pdf": {"vs_ref": ref}})
+        report = out["validation_report"]
+        assert report["error"].startswith("no vector index")
+        assert report["summary"] == {"ok": 0, "warn": 0, "fail": 2}
+        assert {i["status"] for i in report["items"]} == {"miss"}
+    assert FakeEmbedder.calls == 0
+    assert engine._obs_for("validate_with_pdf", out)[0][1]["error"] == report["error"]
+
+
+def test_new_collections_prune_the_oldest(monkeypatch):
+    monkeypatch.setattr(engine, "CHROMA_MAX_COLLECTIONS", 2)
+    refs = [
+        engine.node_embed_pdf_to_chroma({}, {"parse_pdf": {"pdf_chunks": _chunks(tag)}})["vs_ref"]
+        for tag in ("P1", "P2", "P3")
+    ]
+    names = {c.name for c in vectorstore.get_client().list_collections() if c.name.startswith(f"{CHROMA_COLLECTION}-")}
+    assert names == {ref_collection(r) for r in refs[1:]}
+    assert collection_state(ref_collection(refs[0])) is None
+    # 무제한(0)이면 아무것도 지우지 않음
+    assert vectorstore.prune_collections(0) == []
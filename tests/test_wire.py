@@ -0,0 +1,107 @@
+import json
+import struct
+import zlib
+
+import ormsgpack
+import pytest
+
+from backend.wire import StreamCompressor, coalesced_frame, msgpack_frame, negotiate, render, sse_frame
+
+
+def _ev(seq):
+    return {"seq": seq, "type": "OBS", "nodeId": "parse_pdf", "message": "진행 중", "detail": {"done": seq, 1: "k"}}
+
+
+def _unframe(buf):
+    out, i = [], 0
+    while i < len(buf):
+        (n,) = struct.unpack(">I", buf[i : i + 4])
+        out.append(ormsgpack.unpackb(buf[i + 4 : i + 4 + n], option=ormsgpack.OPT_NON_STR_KEYS))
+        i += 4 + n
+    return out
+
+
+@pytest.mark.parametrize(
+    "args, expected",
+    [
+        ((None, None), ("sse", "identity")),
+        (("text/event-stream", "gzip, deflate, br"), ("sse", "gzip")),
+        (("application/x-msgpack", "deflate"), ("msgpack", "deflate")),
+        ((None, "gzip;q=0, deflate;q=0.5"), ("sse", "deflate")),
+        ((None, "br, *;q=0.1"), ("sse", "gzip")),
+        ((None, "gzip;q=0, *;q=0"), ("sse", "identity")),
+        ((None, "gzip;q=abc"), ("sse", "identity")),
+        (("application/x-msgpack", "gzip", "sse", "identity"), ("sse", "identity")),  # 쿼리가 헤더보다 우선
+        (("text/event-stream", None, "MSGPACK", "deflate"), ("msgpack", "deflate")),
+        ((None, "gzip", "xml", "br"), ("sse", "gzip")),  # 모르는 값은 헤더로 협상
+    ],
+)
+def test_negotiate(args, expected):
+    assert negotiate(*args) == expected
+
+
+def test_sse_frame_uses_seq_as_id_and_given_bytes():
+    ev = {"seq": 3, "message": "가"}
+    assert sse_frame(ev) == 'id: 3\nevent: message\ndata: {"seq": 3, "message": "가"}\n\n'.encode("utf-8")
+    assert sse_frame(ev, b"{}") == b"id: 3\nevent: message\ndata: {}\n\n"
+    assert render("sse", ev, b"{}") == sse_frame(ev, b"{}")
+
+
+def test_msgpack_frames_round_trip():
+    buf = b"".join(render("msgpack", _ev(s)) for s in (1, 2)) + coalesced_frame("msgpack", 5)
+    frames = _unframe(buf)
+    assert [f["id"] for f in frames] == [1, 2, None]
+    assert frames[0] == {"id": 1, "event": "message", "data": _ev(1)}
+    assert frames[2] == {"id": None, "event": "coalesced", "data": {"dropped": 5}}
+    assert msgpack_frame(_ev(1))[4:] == ormsgpack.packb(frames[0], option=ormsgpack.OPT_NON_STR_KEYS)
+    assert coalesced_frame("sse", 5) == b'event: coalesced\ndata: {"dropped": 5}\n\n'
+
+
+@pytest.mark.parametrize("encoding, wbits", [("gzip", 31), ("deflate", 15)])
+def test_stream_compressor_flushes_every_event(encoding, wbits):
+    z = StreamCompressor(encoding)
+    d = zlib.decompressobj(wbits)
+    frames = [sse_frame(_ev(s)) for s in range(1, 20)]
+    wire = []
+    for f in frames:
+        chunk = z.feed(f)
+        assert d.decompress(chunk) == f  # 이벤트 단위로 바로 풀림(버퍼링 없음)
+        wire.append(chunk)
+    wire.append(z.finish())
+    assert zlib.decompress(b"".join(wire), wbits) == b"".join(frames)
+
+
+def test_identity_compressor_is_passthrough():
+    z = StreamCompressor("identity")
+    assert z.feed(b"abc") == b"abc" and z.finish() == b""
+
+
+def test_events_endpoint_msgpack_gzip():
+    from fastapi.testclient import TestClient
+
+    from backend.app import app
+    from backend.runner import event_log_path
+    from backend.runstore import run_store
+
+    run_store.create({"runId": "wire-http", "status": "SUCCEEDED", "engine": "seq"})
+    with open(event_log_path("wire-http"), "w", encoding="utf-8") as f:
+        for s in (1, 2, 3):
+            f.write(json.dumps(_ev(s) | {"detail": {"done": s}}, ensure_ascii=False) + "\n")
+    client = TestClient(app)
+
+    with client.stream(
+        "GET", "/runs/wire-http/events", params={"format": "msgpack"}, headers={"Accept-Encoding": "gzip"}
+    ) as r:
+        assert r.status_code == 200
+        assert r.headers["content-type"] == "application/x-msgpack"
+        assert r.headers["content-encoding"] == "gzip"
+        assert r.headers["vary"] == "Accept, Accept-Encoding"
+        raw = b"".join(r.iter_raw())
+    frames = _unframe(zlib.decompress(raw, 31))
+    assert [f["id"] for f in frames] == [1, 2, 3]
+    assert frames[2]["data"]["detail"] == {"done": 3}
+
+    r = client.get("/runs/wire-http/events", headers={"Accept-Encoding": "identity", "Last-Event-ID": "2"})
+    assert "content-encoding" not in r.headers
+    assert r.headers["content-type"].startswith("text/event-stream")
+    assert [l for l in r.text.splitlines() if l.startswith("id: ")] == ["id: 3"]